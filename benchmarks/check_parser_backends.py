@@ -0,0 +1,104 @@
+from benchmarks.generators import generate_photo_roll
+from html_parser_backends import get_available_backends
+from utilities import Utilities
+from bs4 import BeautifulSoup
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+# hand written pages covering markup which parsers are known to treat differently
+EDGE_CASE_PAGES = [
+    '<ul><li><h3>Messier 31 (Andromeda Galaxy)</h3><a style="background-image: url(&quot;https://images.slooh.com/e/1.png&quot;);"></a>'
+    '<p>12/01/2020</p><p>Telescope: Canary One</p></li></ul>',
+    '<ul><li><h3>NGC 224 <span>(M31 / 32)</span></h3><div><a class="x" style=\'background-image: url("https://images.slooh.com/e/2.png");\'></a></div>'
+    '<p>Instrument:  Half Meter : Luminance </p><p><b>Mission:</b> 7</p></li>'
+    '<li><h3>Jupiter &amp; Moons</h3><a style="background-image: url(&quot;https://images.slooh.com/e/3.png&quot;);"></a></li></ul>',
+    '<ul><li><h3>No Link</h3><p>Date</p></li><li><p>No Heading</p></li><li><h3>Messier</h3><a style="x"></a></li></ul>',
+    '<div class="roll"><ul>\t<li>  <h3>\n  Sun </h3> <a style="background-image: url(&quot;https://images.slooh.com/e/4.png&quot;);"></a>'
+    '<p>Telescope: Solar</p></li>  </ul></div>',
+]
+
+def parse_with_reference(path_to_photo_roll_raw_info):
+    """Parses given raw photo roll data the way it was parsed before page by page parsing - whole capture at once,
+    using BeautifulSoup with html.parser. Returns photos info json file content."""
+    with open(path_to_photo_roll_raw_info, 'r') as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    json_photos_info = {}
+    for list_element in soup.find_all("li"):
+        heading = list_element.find('h3')
+        if(heading):
+            try:
+                object_names_in_heading = [x.strip() for x in heading.text.split('(')]
+                object_name_primary = object_names_in_heading[0]
+                object_names = [object_name_primary]
+                if("Messier" in object_name_primary):
+                    object_names.append("M" + re.search(r'\d+', object_name_primary).group())
+                if(len(object_names_in_heading) > 1):
+                    secondary_names = [x.strip() for x in object_names_in_heading[1].strip(')').split('/')]
+                    if len(secondary_names) > 1:
+                        if "NGC" in secondary_names[0] and "NGC" not in secondary_names[1]:
+                            secondary_names[1] = "NGC " + secondary_names[1]
+                    object_names += secondary_names
+                photo_url = re.search('(http.*)\"', list_element.find('a').get('style')).group(1)
+                curr_photo_info = {"photo_url": photo_url, "photo_desc": {}}
+                for desc in list_element.find_all('p'):
+                    curr_desc = [x.strip() for x in desc.text.split(':', 1)]
+                    if(len(curr_desc) > 1):
+                        curr_photo_info["photo_desc"][curr_desc[0]] = curr_desc[1]
+                    else:
+                        curr_photo_info["photo_desc"]["Date"] = curr_desc[0]
+                if object_name_primary in json_photos_info:
+                    if curr_photo_info not in json_photos_info[object_name_primary]["photos"]:
+                        json_photos_info[object_name_primary]["photos"].append(curr_photo_info)
+                else:
+                    json_photos_info[object_name_primary] = {"object_names": object_names, "photos": [curr_photo_info]}
+            except Exception:
+                pass
+    return json.dumps(json_photos_info, indent = 4)
+
+def parse_with_backend(path_to_photo_roll_raw_info, backend_name, work_dir):
+    """Parses given raw photo roll data with given backend in given directory. Returns photos info json file content."""
+    cwd = os.getcwd()
+    shutil.copyfile(path_to_photo_roll_raw_info, os.path.join(work_dir, 'photo_roll_info.txt'))
+    try:
+        os.chdir(work_dir)
+        Utilities(html_parser_backend = backend_name).parse_photo_roll_raw_info('photo_roll_info.txt')
+        with open('photos_info.json', 'r') as f:
+            return f.read()
+    finally:
+        os.chdir(cwd)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Check that every installed html parser backend produces the same photos info as "
+                                                   "the whole capture parsed at once (as before page by page parsing)")
+    parser.add_argument("--photo-roll", help = "path to captured raw photo roll data (synthetic data is generated if not given)")
+    parser.add_argument("--photos", type = int, default = 10000, help = "number of synthetic photos to generate")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp(prefix = "slooh_parser_check_")
+    try:
+        path_to_photo_roll_raw_info = args.photo_roll
+        if(path_to_photo_roll_raw_info is None):
+            path_to_photo_roll_raw_info = os.path.join(temp_dir, 'photo_roll_info.txt')
+            generate_photo_roll(path_to_photo_roll_raw_info, args.photos)
+            with open(path_to_photo_roll_raw_info, 'a') as f:
+                f.write('\n'.join(EDGE_CASE_PAGES) + '\n')
+        backends = get_available_backends()
+        photos_infos = {}
+        for backend_name in backends:
+            work_dir = os.path.join(temp_dir, backend_name)
+            os.makedirs(work_dir)
+            photos_infos[backend_name] = parse_with_backend(os.path.abspath(path_to_photo_roll_raw_info), backend_name, work_dir)
+        reference_photos_info = parse_with_reference(path_to_photo_roll_raw_info)
+        mismatched_backends = [backend_name for backend_name in backends if photos_infos[backend_name] != reference_photos_info]
+        print(f"{'reference':<12} {str(len(json.loads(reference_photos_info)))} objects")
+        for backend_name in backends:
+            print(f"{backend_name:<12} {'identical' if backend_name not in mismatched_backends else 'DIFFERENT'}")
+        if mismatched_backends:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors = True)
@@ -0,0 +1,60 @@
+from html import escape
+import json
+import random
+
+CATALOGS = ["Messier", "NGC", "IC", "Caldwell", "Sharpless"]
+TELESCOPES = ["Canary One", "Canary Two", "Canary Three", "Canary Four", "Chile One", "Chile Two"]
+INSTRUMENTS = ["Half Meter", "High-Mag", "Wide-Field", "Solar"]
+
+def generate_object_names(object_count, seed = 0):
+    """Returns list of (primary object name, secondary object names) of given number of synthetic objects"""
+    rng = random.Random(seed)
+    object_names = []
+    for i in range(object_count):
+        catalog = CATALOGS[i % len(CATALOGS)]
+        primary_name = f"{catalog} {i // len(CATALOGS) + 1}"
+        # some objects are also known by (one or two) NGC/IC numbers, as shown in photo roll headings
+        secondary_names = []
+        if rng.random() < 0.3:
+            secondary_names.append(f"NGC {rng.randint(1, 7840)}")
+            if rng.random() < 0.3:
+                secondary_names.append(str(rng.randint(1, 7840)))
+        object_names.append((primary_name, secondary_names))
+    return object_names
+
+def render_photo(object_name, secondary_names, photo_id, rng):
+    """Returns 'li' element of a photo in the html format of photo roll page in website"""
+    heading = object_name + (f" ({' / '.join(secondary_names)})" if secondary_names else "")
+    photo_url = f"https://images.slooh.com/synthetic/{photo_id:08d}.png"
+    photo_desc = (f"<p>{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/20{rng.randint(15, 26)}</p>"
+                  f"<p>Telescope: {escape(rng.choice(TELESCOPES))}</p>"
+                  f"<p>Instrument: {escape(rng.choice(INSTRUMENTS))}</p>"
+                  f"<p>Mission: {photo_id}</p>")
+    return (f'<li><h3>{escape(heading)}</h3>'
+            f'<a style="background-image: url(&quot;{photo_url}&quot;);"></a>{photo_desc}</li>')
+
+def generate_photo_roll(path, photo_count, object_count = None, photos_per_page = 20, seed = 0):
+    """Writes raw photo roll data (one html page per line) with given number of photos of synthetic objects to given path"""
+    rng = random.Random(seed)
+    object_names = generate_object_names(object_count or max(1, photo_count // 10), seed)
+    with open(path, 'w') as f:
+        for page_start in range(0, photo_count, photos_per_page):
+            list_elements = []
+            for photo_id in range(page_start, min(page_start + photos_per_page, photo_count)):
+                object_name, secondary_names = rng.choice(object_names)
+                list_elements.append(render_photo(object_name, secondary_names, photo_id, rng))
+            f.write('<ul>' + ''.join(list_elements) + '</ul>\n')
+
+def generate_object_info(path, object_count, seed = 0):
+    """Writes object info json file (in the format written by search parser) with given number of synthetic objects to given path.
+    Object names are the same as the ones used by photo roll generator with the same seed."""
+    rng = random.Random(seed)
+    object_info = {}
+    for object_name, secondary_names in generate_object_names(object_count, seed):
+        object_info[object_name] = {
+            "object_url": "https://slooh.com/object/" + object_name.lower().replace(' ', '-'),
+            "parent": [f"Parent {rng.randint(1, 50)}"],
+            "grandparent": [f"Grandparent {rng.randint(1, 8)}"],
+        }
+    with open(path, 'w') as f:
+        json.dump(object_info, f, indent = 4)
@@ -0,0 +1,173 @@
+from benchmarks.generators import generate_photo_roll, generate_object_info
+from utilities import Utilities
+from page_archive import PageArchive
+import numpy as np
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+def measure(func, repeats):
+    """Returns (best wall time in seconds over given repeats, peak traced memory in bytes) of calling given function.
+    Memory is traced in a separate call, so that tracing overhead doesn't affect timings."""
+    seconds = min(_time_call(func) for _ in range(repeats))
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak_memory
+
+def _time_call(func):
+    start_time = time.perf_counter()
+    func()
+    return time.perf_counter() - start_time
+
+def parse_photo_roll_scenario(size, html_parser_backend = "auto"):
+    """Parse raw photo roll with 'size' photos into photos info json file from scratch"""
+    generate_photo_roll('photo_roll_info.txt', size)
+    def run():
+        for path in ('photos_info.json', 'photos_info.json.checkpoint'):
+            if os.path.exists(path):
+                os.remove(path)
+        Utilities(html_parser_backend = html_parser_backend).parse_photo_roll_raw_info('photo_roll_info.txt')
+    return run
+
+def parse_photo_roll_fallback_scenario(size):
+    """Parse raw photo roll with 'size' photos from scratch, using pure python html parser"""
+    return parse_photo_roll_scenario(size, "html.parser")
+
+def parse_photo_roll_parallel_scenario(size):
+    """Parse raw photo roll with 'size' photos into photos info json file from scratch, using all cores"""
+    generate_photo_roll('photo_roll_info.txt', size)
+    def run():
+        for path in ('photos_info.json', 'photos_info.json.checkpoint'):
+            if os.path.exists(path):
+                os.remove(path)
+        Utilities().parse_photo_roll_raw_info('photo_roll_info.txt', workers = os.cpu_count())
+    return run
+
+def parse_photo_roll_incremental_scenario(size):
+    """Parse a page appended to raw photo roll with 'size' photos already ingested"""
+    generate_photo_roll('photo_roll_info.txt', size)
+    Utilities().parse_photo_roll_raw_info('photo_roll_info.txt', incremental = True)
+    generate_photo_roll('new_page.txt', 20, seed = 1)
+    with open('new_page.txt', 'r') as f:
+        new_page = f.read()
+    raw_info_size = os.path.getsize('photo_roll_info.txt')
+    shutil.copyfile('photos_info.json', 'photos_info.bak')
+    shutil.copyfile('photos_info.json.checkpoint', 'checkpoint.bak')
+    def run():
+        with open('photo_roll_info.txt', 'a') as f:
+            f.write(new_page)
+        Utilities().parse_photo_roll_raw_info('photo_roll_info.txt', incremental = True)
+        # restore state, so that every repeat parses the same appended page and adds the same photos
+        with open('photo_roll_info.txt', 'r+') as f:
+            f.truncate(raw_info_size)
+        shutil.copyfile('photos_info.bak', 'photos_info.json')
+        shutil.copyfile('checkpoint.bak', 'photos_info.json.checkpoint')
+    return run
+
+def parse_photo_roll_archive_incremental_scenario(size):
+    """Parse a page added to photo roll archive with 'size' photos already ingested (archived pages are skipped by hash)"""
+    generate_photo_roll('photo_roll_info.txt', size)
+    PageArchive('photo_roll_archive', 'photo_roll_info.txt').close()
+    Utilities().parse_photo_roll_archive('photo_roll_archive', incremental = True)
+    generate_photo_roll('new_page.txt', 20, seed = 1)
+    with open('new_page.txt', 'r') as f:
+        new_page = f.read()
+    def run():
+        shutil.copytree('photo_roll_archive', 'archive.bak')
+        shutil.copyfile('photos_info.json.pages', 'pages.bak')
+        shutil.copyfile('photos_info.json', 'photos_info.bak')
+        with PageArchive('photo_roll_archive') as page_archive:
+            page_archive.add_page(new_page)
+        Utilities().parse_photo_roll_archive('photo_roll_archive', incremental = True)
+        # restore state, so that every repeat parses the same added page and adds the same photos
+        shutil.rmtree('photo_roll_archive')
+        os.rename('archive.bak', 'photo_roll_archive')
+        os.replace('pages.bak', 'photos_info.json.pages')
+        os.replace('photos_info.bak', 'photos_info.json')
+    return run
+
+def objects_with_no_photos_scenario(size):
+    """Find objects with no photos in a catalog of 'size' objects, a tenth of which have photos (name index built every call)"""
+    generate_object_info('slooh_object_info.json', size)
+    generate_photo_roll('photo_roll_info.txt', size, object_count = max(1, size // 10))
+    Utilities().parse_photo_roll_raw_info('photo_roll_info.txt')
+    return lambda: Utilities().extract_urls_to_objects_with_no_photos('slooh_object_info.json', 'photos_info.json')
+
+# scenario name -> (function returning the function to measure for given size, name of the unit of size)
+SCENARIOS = {
+    "parse_photo_roll": (parse_photo_roll_scenario, "photos"),
+    "parse_photo_roll_fallback": (parse_photo_roll_fallback_scenario, "photos"),
+    "parse_photo_roll_parallel": (parse_photo_roll_parallel_scenario, "photos"),
+    "parse_photo_roll_incremental": (parse_photo_roll_incremental_scenario, "photos"),
+    "parse_photo_roll_archive_incremental": (parse_photo_roll_archive_incremental_scenario, "photos"),
+    "objects_with_no_photos": (objects_with_no_photos_scenario, "objects"),
+}
+
+def run_scenario(name, sizes, repeats):
+    """Runs given scenario at every given size (each in an empty working directory).
+    Returns dict with results at every size and scaling exponent (slope of log time vs log size)."""
+    create_run, unit = SCENARIOS[name]
+    results = {}
+    cwd = os.getcwd()
+    for size in sizes:
+        work_dir = tempfile.mkdtemp(prefix = "slooh_benchmark_")
+        try:
+            os.chdir(work_dir)
+            seconds, peak_memory = measure(create_run(size), repeats)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(work_dir, ignore_errors = True)
+        results[str(size)] = {
+            "seconds": round(seconds, 4),
+            "throughput": round(size / seconds, 1),
+            "peak_memory_mb": round(peak_memory / 2 ** 20, 2),
+        }
+        print(f"{name:<30} {size:>9} {unit:<8} {seconds:>9.3f}s {size / seconds:>12.0f} {unit}/s {peak_memory / 2 ** 20:>9.1f} MB", flush = True)
+    scaling_exponent = None
+    if len(sizes) > 1:
+        scaling_exponent = round(float(np.polyfit(np.log(sizes), np.log([results[str(size)]["seconds"] for size in sizes]), 1)[0]), 2)
+        print(f"{name:<30} scaling exponent {scaling_exponent} (1.0 is linear)", flush = True)
+    return {"unit": unit, "results": results, "scaling_exponent": scaling_exponent}
+
+def find_regressions(report, baseline, threshold):
+    """Returns list of (scenario, size, seconds, baseline seconds) slower than baseline by more than given fraction"""
+    regressions = []
+    for name, scenario_report in report.items():
+        baseline_results = baseline.get(name, {}).get("results", {})
+        for size, result in scenario_report["results"].items():
+            if size in baseline_results and result["seconds"] > baseline_results[size]["seconds"] * (1 + threshold):
+                regressions.append((name, size, result["seconds"], baseline_results[size]["seconds"]))
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Benchmark photo roll parsing and catalog matching on synthetic slooh data")
+    parser.add_argument("--scenarios", nargs = "+", choices = list(SCENARIOS), default = list(SCENARIOS), help = "scenarios to run")
+    parser.add_argument("--sizes", nargs = "+", type = int, default = [1000, 10000, 100000], help = "number of photos/objects to run every scenario with (1k to 1M)")
+    parser.add_argument("--repeats", type = int, default = 3, help = "number of timed runs per size (best one is reported)")
+    parser.add_argument("--output", help = "path to write results json file to (can be used as baseline later)")
+    parser.add_argument("--baseline", help = "path to results json file of an earlier run to compare against")
+    parser.add_argument("--threshold", type = float, default = 0.2, help = "fail if any scenario is slower than baseline by more than given fraction")
+    args = parser.parse_args()
+
+    report = {name: run_scenario(name, sorted(args.sizes), args.repeats) for name in args.scenarios}
+    if(args.output):
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent = 4)
+    if(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.threshold)
+        for name, size, seconds, baseline_seconds in regressions:
+            print(f"REGRESSION: {name} at size {size} took {seconds:.3f}s (baseline {baseline_seconds:.3f}s)")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
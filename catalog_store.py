@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import sqlite3
+
+class CatalogStore():
+    """Class that stores object info and photos info in a SQLite database.
+    Object info and photos info json files used by the rest of the parser can be exported from the store."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS objects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            object_url TEXT
+        );
+        CREATE TABLE IF NOT EXISTS object_parents (
+            object_id INTEGER NOT NULL REFERENCES objects(id),
+            parent TEXT NOT NULL,
+            UNIQUE (object_id, parent)
+        );
+        CREATE TABLE IF NOT EXISTS object_grandparents (
+            object_id INTEGER NOT NULL REFERENCES objects(id),
+            grandparent TEXT NOT NULL,
+            UNIQUE (object_id, grandparent)
+        );
+        CREATE TABLE IF NOT EXISTS object_coordinates (
+            object_id INTEGER PRIMARY KEY REFERENCES objects(id),
+            ra REAL NOT NULL,
+            dec REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS failed_coordinate_lookups (
+            object_id INTEGER PRIMARY KEY REFERENCES objects(id),
+            checked_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS photo_objects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS photo_object_aliases (
+            photo_object_id INTEGER NOT NULL REFERENCES photo_objects(id),
+            position INTEGER NOT NULL,
+            alias TEXT NOT NULL,
+            UNIQUE (photo_object_id, position)
+        );
+        CREATE TABLE IF NOT EXISTS photos (
+            id INTEGER PRIMARY KEY,
+            photo_object_id INTEGER NOT NULL REFERENCES photo_objects(id),
+            photo_url TEXT NOT NULL,
+            photo_desc TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS photos_photo_url ON photos (photo_url);
+        CREATE INDEX IF NOT EXISTS photos_photo_object_id ON photos (photo_object_id);
+    """
+
+    def __init__(self, path_to_db_file):
+        """Open (and create if required) catalog database at given path"""
+        self.path_to_db_file = path_to_db_file
+        # wait for writes from other connections (e.g. concurrently running jobs) instead of failing immediately
+        self.connection = sqlite3.connect(path_to_db_file, timeout = 60)
+        self.connection.executescript(self.SCHEMA)
+
+    def transaction(self):
+        """Returns context manager that commits all writes made inside it as a single transaction (rolled back on error)"""
+        return self.connection
+
+    def commit(self):
+        """Commit pending writes"""
+        self.connection.commit()
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def is_empty(self):
+        """Returns True if store contains neither objects nor photos"""
+        return (self.connection.execute("SELECT NOT EXISTS (SELECT 1 FROM objects) AND NOT EXISTS (SELECT 1 FROM photo_objects)").fetchone()[0] == 1)
+
+    def has_photos(self):
+        """Returns True if store contains any photos"""
+        return self.connection.execute("SELECT EXISTS (SELECT 1 FROM photos)").fetchone()[0] == 1
+
+    def has_object(self, object_name):
+        """Returns True if object with given name exists in the store"""
+        return self.connection.execute("SELECT 1 FROM objects WHERE name = ?", (object_name,)).fetchone() is not None
+
+    def upsert_object(self, object_name, object_url, parent_name, grandparent_name):
+        """Adds object (or parent/grandparent of an existing object) to the store.
+        Returns 'added' if object is new, 'modified' if parent/grandparent were added to existing object, None otherwise."""
+        row = self.connection.execute("SELECT id FROM objects WHERE name = ?", (object_name,)).fetchone()
+        # if object doesn't exist yet, add it along with its parent and grandparent
+        if row is None:
+            object_id = self.connection.execute("INSERT INTO objects (name, object_url) VALUES (?, ?)", (object_name, object_url)).lastrowid
+            self._add_parents(object_id, [parent_name], [grandparent_name])
+            return "added"
+        # else add parent/grandparent if they are not already present for the object
+        return "modified" if self._add_parents(row[0], [parent_name], [grandparent_name]) else None
+
+    def set_object_coordinates(self, object_url, ra, dec):
+        """Sets right ascension/declination (degrees) of object(s) with given url"""
+        self.connection.execute("INSERT OR REPLACE INTO object_coordinates (object_id, ra, dec) SELECT id, ?, ? FROM objects WHERE object_url = ?",
+                                (ra, dec, object_url))
+        self.connection.execute("DELETE FROM failed_coordinate_lookups WHERE object_id IN (SELECT id FROM objects WHERE object_url = ?)", (object_url,))
+
+    def set_failed_coordinate_lookup(self, object_url, checked_at):
+        """Records that coordinates of object(s) with given url could not be found at given time (iso format)"""
+        self.connection.execute("INSERT OR REPLACE INTO failed_coordinate_lookups (object_id, checked_at) SELECT id, ? FROM objects WHERE object_url = ?",
+                                (checked_at, object_url))
+
+    def _add_parents(self, object_id, parent_names, grandparent_names):
+        """Adds parents and grandparents missing for given object. Returns True if any were added."""
+        rows_added = self.connection.executemany("INSERT OR IGNORE INTO object_parents (object_id, parent) VALUES (?, ?)",
+                                                 [(object_id, parent_name) for parent_name in parent_names]).rowcount
+        rows_added += self.connection.executemany("INSERT OR IGNORE INTO object_grandparents (object_id, grandparent) VALUES (?, ?)",
+                                                  [(object_id, grandparent_name) for grandparent_name in grandparent_names]).rowcount
+        return rows_added > 0
+
+    def add_photo(self, object_name_primary, object_names, photo_info):
+        """Adds photo for given object to the store, unless a photo with the same url already exists (under any object).
+        Returns (new objects added, new photos added)."""
+        # photo already stored - its object (if new) isn't added either, so that no object is left without photos
+        if self.connection.execute("SELECT 1 FROM photos WHERE photo_url = ?", (photo_info["photo_url"],)).fetchone() is not None:
+            return 0, 0
+        objects_added = 0
+        row = self.connection.execute("SELECT id FROM photo_objects WHERE name = ?", (object_name_primary,)).fetchone()
+        # if no photos are present for the current object, add the object along with its names
+        if row is None:
+            photo_object_id = self.connection.execute("INSERT INTO photo_objects (name) VALUES (?)", (object_name_primary,)).lastrowid
+            self.connection.executemany("INSERT INTO photo_object_aliases (photo_object_id, position, alias) VALUES (?, ?, ?)",
+                                        [(photo_object_id, position, alias) for position, alias in enumerate(object_names)])
+            objects_added = 1
+        else:
+            photo_object_id = row[0]
+        self.connection.execute("INSERT INTO photos (photo_object_id, photo_url, photo_desc) VALUES (?, ?, ?)",
+                                (photo_object_id, photo_info["photo_url"], json.dumps(photo_info["photo_desc"])))
+        return objects_added, 1
+
+    def get_object_info(self):
+        """Returns object info in the same format as object info json file"""
+        object_info = {}
+        objects = {}
+        for object_id, name, object_url in self.connection.execute("SELECT id, name, object_url FROM objects ORDER BY id"):
+            object_info[name] = objects[object_id] = {"object_url": object_url, "parent": [], "grandparent": []}
+        for object_id, parent in self.connection.execute("SELECT object_id, parent FROM object_parents ORDER BY rowid"):
+            objects[object_id]["parent"].append(parent)
+        for object_id, grandparent in self.connection.execute("SELECT object_id, grandparent FROM object_grandparents ORDER BY rowid"):
+            objects[object_id]["grandparent"].append(grandparent)
+        for object_id, checked_at in self.connection.execute("SELECT object_id, checked_at FROM failed_coordinate_lookups"):
+            objects[object_id]["coordinates"] = None
+            objects[object_id]["coordinates_checked_at"] = checked_at
+        for object_id, ra, dec in self.connection.execute("SELECT object_id, ra, dec FROM object_coordinates"):
+            objects[object_id]["coordinates"] = [ra, dec]
+        return object_info
+
+    def get_photos_info(self):
+        """Returns photos info in the same format as photos info json file"""
+        photos_info = {}
+        photo_objects = {}
+        for photo_object_id, name in self.connection.execute("SELECT id, name FROM photo_objects ORDER BY id"):
+            photos_info[name] = photo_objects[photo_object_id] = {"object_names": [], "photos": []}
+        for photo_object_id, alias in self.connection.execute("SELECT photo_object_id, alias FROM photo_object_aliases ORDER BY photo_object_id, position"):
+            photo_objects[photo_object_id]["object_names"].append(alias)
+        for photo_object_id, photo_url, photo_desc in self.connection.execute("SELECT photo_object_id, photo_url, photo_desc FROM photos ORDER BY id"):
+            photo_objects[photo_object_id]["photos"].append({"photo_url": photo_url, "photo_desc": json.loads(photo_desc)})
+        return photos_info
+
+    def export_object_info(self, path_to_object_info_json_file):
+        """Writes object info json file from the store"""
+        self._write_json_file(path_to_object_info_json_file, self.get_object_info())
+
+    def export_photos_info(self, path_to_photos_json_file):
+        """Writes photos info json file from the store"""
+        self._write_json_file(path_to_photos_json_file, self.get_photos_info())
+
+    def import_object_info(self, path_to_object_info_json_file):
+        """Adds objects from existing object info json file to the store"""
+        with open(path_to_object_info_json_file, 'r') as f:
+            object_info = json.load(f)
+        with self.transaction():
+            for object_name, info in object_info.items():
+                row = self.connection.execute("SELECT id FROM objects WHERE name = ?", (object_name,)).fetchone()
+                object_id = row[0] if row else self.connection.execute("INSERT INTO objects (name, object_url) VALUES (?, ?)", (object_name, info["object_url"])).lastrowid
+                self._add_parents(object_id, info["parent"], info["grandparent"])
+                if info.get("coordinates") is not None:
+                    self.connection.execute("INSERT OR REPLACE INTO object_coordinates (object_id, ra, dec) VALUES (?, ?, ?)", (object_id, *info["coordinates"]))
+                elif "coordinates_checked_at" in info:
+                    self.connection.execute("INSERT OR REPLACE INTO failed_coordinate_lookups (object_id, checked_at) VALUES (?, ?)",
+                                            (object_id, info["coordinates_checked_at"]))
+
+    def import_photos_info(self, path_to_photos_json_file):
+        """Adds photos from existing photos info json file to the store"""
+        with open(path_to_photos_json_file, 'r') as f:
+            photos_info = json.load(f)
+        with self.transaction():
+            for object_name_primary, info in photos_info.items():
+                for photo_info in info["photos"]:
+                    self.add_photo(object_name_primary, info["object_names"], photo_info)
+
+    def _write_json_file(self, path, data):
+        """Atomically replace json file at given path with given data"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent = 4)
+        os.replace(temp_path, path)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Import/export slooh catalog json files to/from SQLite catalog store")
+    parser.add_argument("command", choices = ["import", "export"])
+    parser.add_argument("--db", default = "slooh_catalog.db", help = "path to catalog database")
+    parser.add_argument("--object-info", default = "slooh_object_info.json", help = "path to object info json file")
+    parser.add_argument("--photos-info", default = "photos_info.json", help = "path to photos info json file")
+    args = parser.parse_args()
+
+    catalog_store = CatalogStore(args.db)
+    if(args.command == "import"):
+        if(os.path.exists(args.object_info)):
+            catalog_store.import_object_info(args.object_info)
+        if(os.path.exists(args.photos_info)):
+            catalog_store.import_photos_info(args.photos_info)
+    else:
+        catalog_store.export_object_info(args.object_info)
+        catalog_store.export_photos_info(args.photos_info)
+    catalog_store.close()
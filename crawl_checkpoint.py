@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+
+class CrawlCheckpoint():
+    """Class that records progress of a catalog crawl (one line per grand-parent crawled, appended as soon as it is done),
+    so that a crawl which fails halfway can be resumed, and fingerprints (item counts shown in labels) of collapsed parents in
+    search window, so that later crawls can skip expanding parents whose item count hasn't changed."""
+
+    def __init__(self, path_to_object_info_json_file, max_fingerprint_age_days = 7, max_resume_age_hours = 24):
+        """Initialize required variables. Progress and fingerprints are kept in files next to object info json file."""
+        self.progress_path = path_to_object_info_json_file + '.crawl'
+        self.fingerprints_path = path_to_object_info_json_file + '.fingerprints'
+        self.max_fingerprint_age = max_fingerprint_age_days * 86400
+        self.max_resume_age = max_resume_age_hours * 3600
+        self.progress_file = None
+        # grand-parent name -> parent name -> {"fingerprint", "crawled_at"}
+        self.fingerprints = {}
+        if(os.path.exists(self.fingerprints_path)):
+            try:
+                with open(self.fingerprints_path, 'r') as f:
+                    self.fingerprints = json.load(f)
+            except Exception:
+                self.fingerprints = {}
+        # grand-parents may be reported by multiple crawl workers at once
+        self.lock = threading.Lock()
+
+    def start(self, grandparents_count, resume = True):
+        """Starts crawl of given number of grand-parents, resuming an earlier unfinished crawl of the same search window if any.
+        Returns dict of grand-parent index to grand-parent tree (None if its objects were already saved) for grand-parents
+        completed by the earlier crawl."""
+        header, completed = self._read_progress()
+        if(not resume or header is None or header["grandparents_count"] != grandparents_count
+                or time.time() - header["started_at"] > self.max_resume_age):
+            completed = {}
+            with open(self.progress_path, 'w') as f:
+                f.write(json.dumps({"grandparents_count": grandparents_count, "started_at": time.time()}) + '\n')
+        self.progress_file = open(self.progress_path, 'a')
+        return completed
+
+    def _read_progress(self):
+        """Returns (header, dict of grand-parent index to tree) recorded in progress file ((None, {}) if there is none).
+        A partially written last line (e.g. if the process was killed while writing it) is ignored."""
+        header = None
+        completed = {}
+        if(os.path.exists(self.progress_path)):
+            with open(self.progress_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    if header is None:
+                        header = entry
+                    else:
+                        completed[entry["index"]] = entry["tree"]
+        return header, completed
+
+    def add_grandparent(self, grandparent_index, grandparent_tree = None):
+        """Records grand-parent at given index as crawled, along with its tree (None if its objects have already been saved).
+        Fingerprints of parents expanded in the tree are updated."""
+        with self.lock:
+            self.progress_file.write(json.dumps({"index": grandparent_index, "tree": grandparent_tree}) + '\n')
+            self.progress_file.flush()
+            os.fsync(self.progress_file.fileno())
+            if grandparent_tree is not None:
+                parent_fingerprints = self.fingerprints.setdefault(grandparent_tree["name"], {})
+                for parent in grandparent_tree["parents"]:
+                    # parents skipped (unchanged) keep their old crawl time, so that they are refreshed once it gets too old
+                    if parent.get("fingerprint") and parent["items"] and not parent.get("skipped"):
+                        parent_fingerprints[parent["name"]] = {"fingerprint": parent["fingerprint"], "crawled_at": time.time()}
+
+    def get_known_fingerprints(self):
+        """Returns dict of grand-parent name -> parent name -> fingerprint, for parents crawled within max fingerprint age"""
+        now = time.time()
+        return {
+            grandparent_name: {parent_name: parent["fingerprint"] for parent_name, parent in parents.items()
+                               if now - parent["crawled_at"] <= self.max_fingerprint_age}
+            for grandparent_name, parents in self.fingerprints.items()
+        }
+
+    def finish(self):
+        """Ends crawl successfully - progress is dropped and fingerprints are saved"""
+        self.close()
+        if(os.path.exists(self.progress_path)):
+            os.remove(self.progress_path)
+
+    def close(self):
+        """Closes progress file (kept, so that crawl can be resumed) and saves fingerprints"""
+        if self.progress_file is not None:
+            self.progress_file.close()
+            self.progress_file = None
+        temp_path = self.fingerprints_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.fingerprints, f, indent = 4)
+        os.replace(temp_path, self.fingerprints_path)
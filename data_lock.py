@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+import threading
+
+# fcntl is only available on POSIX - elsewhere data files are locked within this process only
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_process_locks = {}
+_process_locks_guard = threading.Lock()
+
+@contextmanager
+def data_lock(path_to_data_file):
+    """Holds an exclusive lock of given data file (on a '.lock' file next to it) while in the block.
+    Stages running at the same time (in threads or processes) take it around every read-modify-write of the file."""
+    lock_path = path_to_data_file + '.lock'
+    if fcntl is None:
+        with _process_locks_guard:
+            process_lock = _process_locks.setdefault(lock_path, threading.Lock())
+        with process_lock:
+            yield
+        return
+    # every call opens its own file, so that threads of the same process exclude each other as well
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
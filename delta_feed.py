@@ -0,0 +1,92 @@
+from datetime import datetime
+from data_lock import data_lock
+import json
+import os
+import time
+
+class DeltaFeed():
+    """Class that writes an append-only json lines log of objects and photos added/modified by every ingestion, one numbered
+    entry per change ({"seq", "at", "kind", "action", "key", "data"}), so that consumers can process only what changed.
+    Entries are buffered and appended once the ingested data has been saved (see 'commit'), so that the feed never contains
+    changes which were lost. Any number of feeds (in threads or processes) may append to the same file - sequence numbers are
+    assigned on commit, under an exclusive lock of the file."""
+
+    def __init__(self, path_to_feed_file):
+        """Initialize required variables. Sequence numbers continue from the last entry in given feed file."""
+        self.path_to_feed_file = path_to_feed_file
+        self.pending_entries = []
+        self.last_seq = 0
+        if os.path.exists(self.path_to_feed_file):
+            with data_lock(self.path_to_feed_file), open(self.path_to_feed_file, 'rb+') as f:
+                self.last_seq = self._recover(f)
+
+    def _recover(self, f):
+        """Drops a partially written last line (e.g. if the process was killed while writing it) of given feed file (opened in
+        binary mode for reading and writing, with the file locked). Returns last sequence number."""
+        # read backwards till the last complete line (and the line break before it) is found
+        position = f.seek(0, os.SEEK_END)
+        tail = b''
+        while position > 0 and tail.count(b'\n') < 2:
+            chunk_size = min(65536, position)
+            position -= chunk_size
+            f.seek(position)
+            tail = f.read(chunk_size) + tail
+        complete_length = tail.rfind(b'\n') + 1
+        if(complete_length < len(tail)):
+            f.truncate(position + complete_length)
+            tail = tail[:complete_length]
+        lines = tail.splitlines()
+        return json.loads(lines[-1])["seq"] if lines else 0
+
+    def add(self, kind, action, key, data):
+        """Adds entry for given change ('kind' is 'object' or 'photo', 'action' is 'added' or 'modified') to be appended on commit"""
+        self.pending_entries.append({"kind": kind, "action": action, "key": key, "data": data})
+
+    def commit(self):
+        """Appends pending entries to feed file with sequence numbers following the last entry in the file (re-read under
+        the lock, as other feeds may have appended entries since). Returns number of entries appended."""
+        if not self.pending_entries:
+            return 0
+        now = datetime.now().isoformat(timespec = "seconds")
+        with data_lock(self.path_to_feed_file), open(self.path_to_feed_file, 'ab+') as f:
+            self.last_seq = self._recover(f)
+            lines = []
+            for entry in self.pending_entries:
+                self.last_seq += 1
+                lines.append(json.dumps(dict(seq = self.last_seq, at = now, **entry)) + '\n')
+            f.write(''.join(lines).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        entries_count = len(self.pending_entries)
+        self.pending_entries = []
+        return entries_count
+
+    def discard(self):
+        """Drops pending entries (e.g. if ingested data could not be saved)"""
+        self.pending_entries = []
+
+def iter_deltas(path_to_feed_file, offset = 0):
+    """Yields (entry, byte offset after the entry) for every complete entry in given feed file from given byte offset.
+    Consumers store the last offset and pass it again to read only newer entries."""
+    if not os.path.exists(path_to_feed_file):
+        return
+    with open(path_to_feed_file, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            # entry still being written
+            if not line.endswith(b'\n'):
+                return
+            offset += len(line)
+            yield json.loads(line), offset
+
+def tail_deltas(path_to_feed_file, offset = 0, poll_interval = 1.0, timeout = None):
+    """Yields (entry, byte offset after the entry) for every entry from given byte offset, waiting for new entries to be appended.
+    Stops once no new entry is appended for 'timeout' seconds (never, if None)."""
+    last_entry_time = time.monotonic()
+    while True:
+        for entry, offset in iter_deltas(path_to_feed_file, offset):
+            last_entry_time = time.monotonic()
+            yield entry, offset
+        if timeout is not None and time.monotonic() - last_entry_time >= timeout:
+            return
+        time.sleep(poll_interval)
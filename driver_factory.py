@@ -0,0 +1,88 @@
+from selenium import webdriver
+from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+import copy
+import os
+
+# url patterns of resources which the parser never reads (only text and urls in the DOM are used)
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",     # images
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",                      # fonts
+    "*.mp4", "*.webm", "*.m3u8", "*.ts", "*.mp3", "*.ogg", "*.wav",      # media
+]
+
+class DriverFactory():
+    """Class that creates chrome drivers with a resource light browser profile - headless, images/fonts/media blocked,
+    disk cache reused across runs, 'eager' page load strategy (pages are ready for parsing once DOM is loaded) and memory flags.
+    Shared by the parser and crawl worker pools."""
+
+    def __init__(self, chrome_driver_path, headless = True, block_resources = True, cache_dir = None, page_load_strategy = "eager",
+                 max_js_heap_mb = None, window_size = "1920,1080", extra_arguments = ()):
+        """Initialize required variables"""
+        self.chrome_driver_path = chrome_driver_path
+        self.headless = headless
+        self.block_resources = block_resources
+        self.cache_dir = cache_dir
+        self.page_load_strategy = page_load_strategy
+        self.max_js_heap_mb = max_js_heap_mb
+        self.window_size = window_size
+        self.extra_arguments = list(extra_arguments)
+
+    def with_options(self, **options):
+        """Returns copy of this factory with given options changed"""
+        driver_factory = copy.copy(self)
+        for option, value in options.items():
+            if not hasattr(driver_factory, option):
+                raise ValueError(f"Unknown driver option {option}")
+            setattr(driver_factory, option, value)
+        return driver_factory
+
+    def create_options(self, cache_subdir = None):
+        """Returns chrome options of the browser profile. Drivers running at the same time should use different 'cache_subdir's."""
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument("--headless")
+            options.add_argument("--disable-gpu")
+        options.add_argument(f"--window-size={self.window_size}")
+        # reduce memory used by browser
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--mute-audio")
+        if self.max_js_heap_mb:
+            options.add_argument(f"--js-flags=--max-old-space-size={str(self.max_js_heap_mb)}")
+        # reuse disk cache (scripts, stylesheets) across runs
+        if self.cache_dir:
+            cache_dir = os.path.abspath(os.path.join(self.cache_dir, cache_subdir) if cache_subdir else self.cache_dir)
+            os.makedirs(cache_dir, exist_ok = True)
+            options.add_argument(f"--disk-cache-dir={cache_dir}")
+        # don't download images (in any tab)
+        if self.block_resources:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        for argument in self.extra_arguments:
+            options.add_argument(argument)
+        return options
+
+    def create_capabilities(self):
+        """Returns desired capabilities with configured page load strategy"""
+        capabilities = DesiredCapabilities.CHROME.copy()
+        capabilities["pageLoadStrategy"] = self.page_load_strategy
+        return capabilities
+
+    def create_driver(self, cache_subdir = None):
+        """Create chrome driver with the browser profile"""
+        driver = webdriver.Chrome(executable_path = self.chrome_driver_path, options = self.create_options(cache_subdir),
+                                  desired_capabilities = self.create_capabilities())
+        if self.block_resources:
+            self.block_urls(driver)
+        return driver
+
+    @staticmethod
+    def block_urls(driver, url_patterns = BLOCKED_URL_PATTERNS):
+        """Blocks requests to given url patterns (images, fonts and media by default) in driver's current tab"""
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": url_patterns})
+        except Exception:
+            # blocking is best effort, e.g. if devtools protocol is not supported by the driver
+            pass
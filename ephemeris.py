@@ -0,0 +1,80 @@
+import numpy as np
+import re
+import time
+
+# latitude, longitude (degrees, east positive) of slooh telescope sites
+TELESCOPE_SITES = {
+    "canary_islands": (28.30, -16.51),    # Teide Observatory, Tenerife
+    "chile": (-30.47, -70.76),            # Observatorio El Sauce, Chile
+}
+
+RA_PATTERN = re.compile(r'(?:RA|Right Ascension)\s*[:=]?\s*(\d{1,2})\s*[h:\s]\s*(\d{1,2})\s*[m:\s]\s*(\d{1,2}(?:\.\d+)?)', re.IGNORECASE)
+DEC_PATTERN = re.compile(r'(?:Dec|Declination)\s*[:=]?\s*([+\-\u2212]?)\s*(\d{1,2})\s*[\u00b0d:\s]\s*(\d{1,2})\s*[\'\u2032m:\s]\s*(\d{1,2}(?:\.\d+)?)', re.IGNORECASE)
+
+def parse_coordinates(text):
+    """Parses right ascension (hh mm ss) and declination (dd mm ss) from given text.
+    Returns (ra, dec) in degrees, or None if either could not be found."""
+    ra_match = RA_PATTERN.search(text)
+    dec_match = DEC_PATTERN.search(text)
+    if ra_match is None or dec_match is None:
+        return None
+    hours, minutes, seconds = (float(x) for x in ra_match.groups())
+    ra = 15 * (hours + minutes / 60 + seconds / 3600)
+    sign = -1 if dec_match.group(1) in ('-', '\u2212') else 1
+    degrees, arcminutes, arcseconds = (float(x) for x in dec_match.groups()[1:])
+    dec = sign * (degrees + arcminutes / 60 + arcseconds / 3600)
+    return ra, dec
+
+def get_slot_times(start_time = None, hours = 24, step_minutes = 10):
+    """Returns julian dates of upcoming mission slot times from given unix time (now, if not given)"""
+    start_time = time.time() if start_time is None else start_time
+    unix_times = start_time + np.arange(0, hours * 3600, step_minutes * 60)
+    return unix_times / 86400.0 + 2440587.5
+
+def get_local_sidereal_times(julian_dates, longitude):
+    """Returns local sidereal times (degrees) at given julian dates and longitude"""
+    return (280.46061837 + 360.98564736629 * (julian_dates - 2451545.0) + longitude) % 360
+
+def get_altitudes(ras, decs, latitude, longitude, julian_dates):
+    """Returns altitudes (degrees) of objects with given right ascensions/declinations (degrees) at given julian dates,
+    as an array of shape (objects, times)."""
+    hour_angles = np.radians(get_local_sidereal_times(julian_dates, longitude)[np.newaxis, :] - np.asarray(ras, dtype = float)[:, np.newaxis])
+    decs = np.radians(np.asarray(decs, dtype = float))[:, np.newaxis]
+    latitude = np.radians(latitude)
+    sin_altitudes = np.sin(decs) * np.sin(latitude) + np.cos(decs) * np.cos(latitude) * np.cos(hour_angles)
+    return np.degrees(np.arcsin(np.clip(sin_altitudes, -1, 1)))
+
+def get_sun_altitudes(latitude, longitude, julian_dates):
+    """Returns altitudes (degrees) of the sun at given julian dates (low precision solar coordinates)"""
+    days = julian_dates - 2451545.0
+    mean_longitude = np.radians((280.460 + 0.9856474 * days) % 360)
+    mean_anomaly = np.radians((357.528 + 0.9856003 * days) % 360)
+    ecliptic_longitude = mean_longitude + np.radians(1.915) * np.sin(mean_anomaly) + np.radians(0.020) * np.sin(2 * mean_anomaly)
+    obliquity = np.radians(23.439 - 0.0000004 * days)
+    ras = np.degrees(np.arctan2(np.cos(obliquity) * np.sin(ecliptic_longitude), np.cos(ecliptic_longitude))) % 360
+    decs = np.degrees(np.arcsin(np.sin(obliquity) * np.sin(ecliptic_longitude)))
+    hour_angles = np.radians(get_local_sidereal_times(julian_dates, longitude) - ras)
+    latitude = np.radians(latitude)
+    sin_altitudes = np.sin(np.radians(decs)) * np.sin(latitude) + np.cos(np.radians(decs)) * np.cos(latitude) * np.cos(hour_angles)
+    return np.degrees(np.arcsin(np.clip(sin_altitudes, -1, 1)))
+
+def rank_candidates(candidates, site = "canary_islands", min_altitude = 30, max_sun_altitude = -12, julian_dates = None):
+    """Ranks candidate objects by their highest altitude during upcoming dark slot times at given telescope site.
+    'candidates' is a list of (object url, (ra, dec) in degrees or None if coordinates are unknown).
+    Objects which never rise above 'min_altitude' during dark slots are pruned.
+    Returns list of object urls - observable objects (highest altitude first) followed by objects with unknown coordinates."""
+    latitude, longitude = TELESCOPE_SITES[site]
+    julian_dates = get_slot_times() if julian_dates is None else julian_dates
+    # only slots when the sun is below 'max_sun_altitude' (astronomical darkness) are considered
+    dark_julian_dates = julian_dates[get_sun_altitudes(latitude, longitude, julian_dates) < max_sun_altitude]
+    known_candidates = [(object_url, coordinates) for object_url, coordinates in candidates if coordinates is not None]
+    unknown_candidates = [object_url for object_url, coordinates in candidates if coordinates is None]
+    if not known_candidates or len(dark_julian_dates) == 0:
+        return unknown_candidates
+
+    # compute altitude curves of all candidates at once and rank them by their highest altitude
+    ras, decs = np.array([coordinates for object_url, coordinates in known_candidates], dtype = float).T
+    max_altitudes = get_altitudes(ras, decs, latitude, longitude, dark_julian_dates).max(axis = 1)
+    order = np.argsort(-max_altitudes, kind = "stable")
+    observable_candidates = [known_candidates[i][0] for i in order if max_altitudes[i] >= min_altitude]
+    return observable_candidates + unknown_candidates
@@ -0,0 +1,71 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml and selectolax are optional, faster alternatives to python's html.parser
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    # older selectolax versions only have the modest backend
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+# only 'li' elements (one per photo) are parsed from photo roll pages
+LIST_ELEMENT_STRAINER = SoupStrainer("li")
+
+def iter_photo_elements_html_parser(raw_page):
+    """Yields (heading text, photo link style, paragraph texts) of every 'li' element with a heading in given photo roll page,
+    using BeautifulSoup with python's html.parser (always available)"""
+    soup = BeautifulSoup(raw_page, "html.parser", parse_only = LIST_ELEMENT_STRAINER)
+    for list_element in soup.find_all("li"):
+        heading = list_element.find('h3')
+        if(heading):
+            link = list_element.find('a')
+            yield heading.text, (link.get('style') if link else None), [desc.text for desc in list_element.find_all('p')]
+
+def iter_photo_elements_lxml(raw_page):
+    """Yields (heading text, photo link style, paragraph texts) of every 'li' element with a heading in given photo roll page, using lxml"""
+    if not raw_page.strip():
+        return
+    root = lxml.html.fragment_fromstring(raw_page, create_parent = "div")
+    for list_element in root.iter("li"):
+        heading = list_element.find(".//h3")
+        if(heading is not None):
+            link = list_element.find(".//a")
+            yield (heading.text_content(), (link.get('style') if link is not None else None),
+                   [desc.text_content() for desc in list_element.iterfind(".//p")])
+
+def iter_photo_elements_selectolax(raw_page):
+    """Yields (heading text, photo link style, paragraph texts) of every 'li' element with a heading in given photo roll page, using selectolax"""
+    for list_element in HTMLParser(raw_page).css("li"):
+        heading = list_element.css_first("h3")
+        if(heading is not None):
+            link = list_element.css_first("a")
+            yield heading.text(), (link.attributes.get('style') if link is not None else None), [desc.text() for desc in list_element.css("p")]
+
+# backend name -> (function yielding photo elements of a page, whether the backend is installed), fastest first
+PARSER_BACKENDS = {
+    "selectolax": (iter_photo_elements_selectolax, HTMLParser is not None),
+    "lxml": (iter_photo_elements_lxml, lxml is not None),
+    "html.parser": (iter_photo_elements_html_parser, True),
+}
+
+def get_available_backends():
+    """Returns names of installed html parser backends, fastest first"""
+    return [backend_name for backend_name, (_, is_available) in PARSER_BACKENDS.items() if is_available]
+
+def resolve_backend_name(backend_name = "auto"):
+    """Returns name of given html parser backend ('auto' resolves to the fastest installed one)"""
+    if(backend_name == "auto"):
+        return get_available_backends()[0]
+    if(backend_name not in PARSER_BACKENDS or not PARSER_BACKENDS[backend_name][1]):
+        raise ValueError(f"HTML parser backend {backend_name} is not available")
+    return backend_name
+
+def iter_photo_elements(raw_page, backend_name = "html.parser"):
+    """Yields (heading text, photo link style, paragraph texts) of every photo in given photo roll page using given backend"""
+    return PARSER_BACKENDS[backend_name][0](raw_page)
@@ -0,0 +1,222 @@
+from contextlib import contextmanager
+import cProfile
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+# only one profiler can be active at a time (enabling a second one raises on Python 3.12+), so stages overlapping
+# in scheduler threads are profiled one at a time
+PROFILER_LOCK = threading.Lock()
+
+class Instrumentation():
+    """Class that collects timing spans (call count, total duration, errors) and counters of a run.
+    Methods of existing objects can be wrapped in spans. Collected metrics are exported as a Prometheus textfile
+    (for node exporter's textfile collector) and/or a json run summary."""
+
+    def __init__(self, run_name, profile_dir = None):
+        """Initialize required variables. If 'profile_dir' is given, profile of every stage is dumped to it."""
+        self.run_name = run_name
+        self.profile_dir = profile_dir
+        self.started_at = time.time()
+        # span name -> [call count, total seconds, error count]
+        self.spans = {}
+        self.counters = {}
+        # stage name -> {count name -> value counted during the stage}
+        self.stage_counts = {}
+        # spans are recorded from multiple threads (e.g. crawl pool, scheduled jobs)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, span_name):
+        """Context manager that records duration of the code inside it under given span name"""
+        start_time = time.perf_counter()
+        is_error = False
+        try:
+            yield
+        except BaseException:
+            is_error = True
+            raise
+        finally:
+            self.record_span(span_name, time.perf_counter() - start_time, is_error)
+
+    def record_span(self, span_name, elapsed, errors = 0, count = 1):
+        """Adds given duration (of 'count' calls, 'errors' of which failed) to given span"""
+        with self.lock:
+            span = self.spans.setdefault(span_name, [0, 0.0, 0])
+            span[0] += count
+            span[1] += elapsed
+            span[2] += int(errors)
+
+    def increment(self, counter_name, value = 1):
+        """Increments given counter by given value"""
+        with self.lock:
+            self.counters[counter_name] = self.counters.get(counter_name, 0) + value
+
+    def instrument_object(self, obj, prefix = None):
+        """Wraps every method of given object in a span named '<prefix>.<method name>' (prefix defaults to class name)"""
+        prefix = prefix or type(obj).__name__
+        for method_name, _ in inspect.getmembers(type(obj), predicate = inspect.isfunction):
+            if method_name.startswith('__'):
+                continue
+            setattr(obj, method_name, self._wrap(getattr(obj, method_name), f"{prefix}.{method_name}"))
+        return obj
+
+    def _wrap(self, method, span_name):
+        """Returns given method wrapped in given span (only time spent producing items is recorded for generators)"""
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def generator_wrapper(*args, **kwargs):
+                generator = method(*args, **kwargs)
+                elapsed = 0.0
+                try:
+                    while True:
+                        start_time = time.perf_counter()
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += time.perf_counter() - start_time
+                        yield item
+                finally:
+                    self.record_span(span_name, elapsed)
+            return generator_wrapper
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.span(span_name):
+                return method(*args, **kwargs)
+        return wrapper
+
+    def add_wait_summary(self, wait_summary, prefix = "wait"):
+        """Adds page readiness waits (summary returned by PageWaiter.get_wait_summary) as spans, timeouts counted as errors"""
+        for wait_name, (wait_count, total_elapsed, timeouts) in wait_summary.items():
+            self.record_span(f"{prefix}.{wait_name}", total_elapsed, timeouts, wait_count)
+
+    @contextmanager
+    def stage(self, stage_name, count_sources = ()):
+        """Context manager that records given stage as a span, profiling it too if 'profile_dir' is set.
+        Increase of 'counts' (a Counter) of every object in 'count_sources' during the stage is recorded as its stage counts,
+        from which per second rates are derived in the summary. A stage is not profiled if another stage is being profiled."""
+        counts_before = [source.counts.copy() for source in count_sources]
+        try:
+            with self.span(f"stage.{stage_name}"), self._profile(stage_name):
+                yield
+        finally:
+            for source, source_counts_before in zip(count_sources, counts_before):
+                self.add_stage_counts(stage_name, source.counts - source_counts_before)
+
+    def add_stage_counts(self, stage_name, counts):
+        """Adds given {count name -> value} to counts of given stage"""
+        with self.lock:
+            stage_counts = self.stage_counts.setdefault(stage_name, {})
+            for count_name, value in counts.items():
+                stage_counts[count_name] = stage_counts.get(count_name, 0) + value
+
+    @contextmanager
+    def _profile(self, stage_name):
+        """Context manager that profiles the code inside it into '<profile_dir>/<stage name>.prof', if no other stage is being profiled"""
+        if self.profile_dir is None:
+            yield
+            return
+        if not PROFILER_LOCK.acquire(blocking = False):
+            self.increment("profiles_skipped")
+            yield
+            return
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            # another profiler (not started by a stage) is active
+            except ValueError:
+                profiler = None
+                self.increment("profiles_skipped")
+            try:
+                yield
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    os.makedirs(self.profile_dir, exist_ok = True)
+                    profiler.dump_stats(os.path.join(self.profile_dir, f"{stage_name}.prof"))
+        finally:
+            PROFILER_LOCK.release()
+
+    def get_summary(self):
+        """Returns json serializable summary of the run"""
+        with self.lock:
+            spans = {
+                span_name: {
+                    "calls": count,
+                    "total_seconds": round(total_elapsed, 6),
+                    "mean_seconds": round(total_elapsed / count, 6) if count else 0.0,
+                    "calls_per_second": round(count / total_elapsed, 2) if total_elapsed else None,
+                    "errors": errors,
+                }
+                for span_name, (count, total_elapsed, errors) in sorted(self.spans.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+            # counts of a stage are reported as '<stage name>.<count name>' counters, along with their rate over the stage duration
+            rates = {}
+            for stage_name, stage_counts in sorted(self.stage_counts.items()):
+                stage_elapsed = self.spans.get(f"stage.{stage_name}", [0, 0.0, 0])[1]
+                for count_name, value in sorted(stage_counts.items()):
+                    counters[f"{stage_name}.{count_name}"] = value
+                    rates[f"{stage_name}.{count_name}_per_second"] = round(value / stage_elapsed, 2) if stage_elapsed else None
+        return {"run": self.run_name, "started_at": self.started_at, "finished_at": time.time(), "spans": spans, "counters": counters,
+                "rates": rates}
+
+    def write_json_summary(self, path):
+        """Atomically writes json run summary to given path"""
+        self._write_file(path, json.dumps(self.get_summary(), indent = 4))
+
+    def write_prometheus_textfile(self, path, metric_prefix = "slooh"):
+        """Atomically writes metrics of the run in Prometheus text exposition format to given path.
+        Metrics are gauges, as the file is rewritten with the metrics of every new run."""
+        summary = self.get_summary()
+        run_label = f'run="{self._escape_label(self.run_name)}"'
+        lines = [
+            f"# HELP {metric_prefix}_span_calls Number of calls of an instrumented span in the last run.",
+            f"# TYPE {metric_prefix}_span_calls gauge",
+        ]
+        lines += [f'{metric_prefix}_span_calls{{{run_label},span="{self._escape_label(name)}"}} {span["calls"]}' for name, span in summary["spans"].items()]
+        lines += [
+            f"# HELP {metric_prefix}_span_seconds Total duration of an instrumented span in the last run.",
+            f"# TYPE {metric_prefix}_span_seconds gauge",
+        ]
+        lines += [f'{metric_prefix}_span_seconds{{{run_label},span="{self._escape_label(name)}"}} {span["total_seconds"]}' for name, span in summary["spans"].items()]
+        lines += [
+            f"# HELP {metric_prefix}_span_errors Number of failed calls (or wait timeouts) of an instrumented span in the last run.",
+            f"# TYPE {metric_prefix}_span_errors gauge",
+        ]
+        lines += [f'{metric_prefix}_span_errors{{{run_label},span="{self._escape_label(name)}"}} {span["errors"]}' for name, span in summary["spans"].items()]
+        lines += [
+            f"# HELP {metric_prefix}_events Number of events counted during the last run.",
+            f"# TYPE {metric_prefix}_events gauge",
+        ]
+        lines += [f'{metric_prefix}_events{{{run_label},event="{self._escape_label(name)}"}} {value}' for name, value in summary["counters"].items()]
+        lines += [
+            f"# HELP {metric_prefix}_event_rate Events counted during a stage per second of the stage in the last run.",
+            f"# TYPE {metric_prefix}_event_rate gauge",
+        ]
+        lines += [f'{metric_prefix}_event_rate{{{run_label},event="{self._escape_label(name)}"}} {value}'
+                  for name, value in summary["rates"].items() if value is not None]
+        lines += [
+            f"# HELP {metric_prefix}_last_run_timestamp_seconds Time when the run finished.",
+            f"# TYPE {metric_prefix}_last_run_timestamp_seconds gauge",
+            f"{metric_prefix}_last_run_timestamp_seconds{{{run_label}}} {summary['finished_at']:.0f}",
+        ]
+        self._write_file(path, '\n'.join(lines) + '\n')
+
+    @staticmethod
+    def _escape_label(value):
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    @staticmethod
+    def _write_file(path, data):
+        """Atomically replace file at given path with given data"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(data)
+        os.replace(temp_path, path)
@@ -0,0 +1,110 @@
+from collections import Counter
+import logging
+import random
+import schedule
+import threading
+import time
+
+class JobScheduler():
+    """Class that runs named jobs on their own cadence.
+    Sleeps till the next job is due (instead of busy-waiting), runs every job in its own thread so that a slow job
+    doesn't block the others, adds random jitter to start times and skips a run if the previous run of the same job is still going on.
+    A job may depend on other jobs - its run waits till runs of those jobs (started or waiting for their jitter) are done."""
+
+    def __init__(self, max_idle_sleep = 3600):
+        """Initialize required variables"""
+        # code to setup logging obj
+        self.logger = logging.getLogger("JobScheduler")
+        self.logger.setLevel(level=logging.DEBUG)
+        for hdlr in self.logger.handlers[:]:    # remove all old handlers
+            self.logger.removeHandler(hdlr)
+
+        # create and add file handler to logging obj
+        fileh = logging.FileHandler('JobScheduler.log')
+        formatter = logging.Formatter("%(asctime)s;%(levelname)s;%(message)s", "%Y-%m-%d %H:%M:%S")
+        fileh.setFormatter(formatter)
+        self.logger.addHandler(fileh)
+
+        self.scheduler = schedule.Scheduler()
+        self.jobs = {}
+        self.job_locks = {}
+        self.job_dependencies = {}
+        # number of runs of every job started (incl. those still waiting for their jitter) and not yet done
+        self.active_runs = Counter()
+        self.active_runs_changed = threading.Condition()
+        # upper bound on a single sleep, so that clock changes (e.g. suspend/resume) are picked up
+        self.max_idle_sleep = max_idle_sleep
+
+    def add_job(self, job_name, job_func, at = None, every_minutes = None, jitter_seconds = 0, depends_on = ()):
+        """Schedule given function daily 'at' given time (HH:MM) or 'every_minutes' minutes.
+        Start of every run is delayed by a random jitter of up to 'jitter_seconds'.
+        Runs wait for runs of jobs named in 'depends_on' which are in progress to be done."""
+        self.jobs[job_name] = job_func
+        self.job_locks[job_name] = threading.Lock()
+        self.job_dependencies[job_name] = tuple(depends_on)
+        if at is not None:
+            job = self.scheduler.every().day.at(at)
+        else:
+            job = self.scheduler.every(every_minutes).minutes
+        job.do(self._start_job, job_name, jitter_seconds).tag(job_name)
+
+    def run_now(self, job_name):
+        """Run given job immediately in the current thread. Returns False if the job is already running."""
+        self._add_active_run(job_name, 1)
+        return self._run_job(job_name)
+
+    def run_forever(self):
+        """Run scheduled jobs forever, sleeping till the next job is due"""
+        self.logger.debug(f"Scheduler started with jobs - {', '.join(self.jobs)}")
+        while True:
+            idle_seconds = self.scheduler.idle_seconds
+            if idle_seconds is None:
+                idle_seconds = self.max_idle_sleep
+            if idle_seconds > 0:
+                time.sleep(min(idle_seconds, self.max_idle_sleep))
+            self.scheduler.run_pending()
+
+    def _start_job(self, job_name, jitter_seconds):
+        """Start given job in a separate thread"""
+        self._add_active_run(job_name, 1)
+        threading.Thread(target = self._run_job, args = (job_name, jitter_seconds), name = job_name, daemon = True).start()
+
+    def _add_active_run(self, job_name, count):
+        """Adds given count to active runs of given job and wakes up runs waiting for it"""
+        with self.active_runs_changed:
+            self.active_runs[job_name] += count
+            self.active_runs_changed.notify_all()
+
+    def _wait_for_dependencies(self, job_name):
+        """Blocks till no run of any job given job depends on is in progress"""
+        dependencies = self.job_dependencies.get(job_name, ())
+        with self.active_runs_changed:
+            pending_dependencies = [dependency for dependency in dependencies if self.active_runs[dependency] > 0]
+            if pending_dependencies:
+                self.logger.debug(f"{job_name} waiting for {', '.join(pending_dependencies)} to finish")
+            self.active_runs_changed.wait_for(lambda: all(self.active_runs[dependency] == 0 for dependency in dependencies))
+
+    def _run_job(self, job_name, jitter_seconds = 0):
+        """Run given (active) job after random jitter and after jobs it depends on, unless it is already running.
+        Returns False if the run was skipped."""
+        try:
+            if jitter_seconds:
+                time.sleep(random.uniform(0, jitter_seconds))
+            job_lock = self.job_locks[job_name]
+            # skip current run if previous run of the same job is still going on
+            if not job_lock.acquire(blocking = False):
+                self.logger.debug(f"Skipping {job_name} as its previous run is still in progress")
+                return False
+            try:
+                self._wait_for_dependencies(job_name)
+                self.logger.debug(f"Starting {job_name}")
+                start_time = time.monotonic()
+                self.jobs[job_name]()
+                self.logger.debug(f"Finished {job_name} in {time.monotonic() - start_time:.1f}s")
+            except Exception as err:
+                self.logger.debug(f"{job_name} failed - {str(err)}")
+            finally:
+                job_lock.release()
+            return True
+        finally:
+            self._add_active_run(job_name, -1)
@@ -1,61 +1,210 @@
 from utilities import Utilities
 from slooh_website_parser import SloohWebsiteParser
+from catalog_store import CatalogStore
+from job_scheduler import JobScheduler
+from reservation_pipeline import MissionReservationPipeline
+from mission_ledger import MissionLedger
+from ephemeris import TELESCOPE_SITES, rank_candidates
+from instrumentation import Instrumentation
+from html_parser_backends import PARSER_BACKENDS
+from record_replay_driver import RecordingDriver, ReplayDriver
+from driver_factory import DriverFactory
+from delta_feed import DeltaFeed
 
-import sys
+import argparse
 import os
-import schedule
-import time
 import getpass
 
 username = getpass.getuser()
 
-global slooh_web_parser_obj
-global util_obj
+global args
 
-def parse_slooh_photo_roll():
+def parse_slooh_catalog(slooh_web_parser_obj, util_obj, instrumentation):
+    """Parse object catalog from search option in https://slooh.com/"""
+    slooh_web_parser_obj.search_parser(differential = args.differential_catalog, max_fingerprint_age_days = args.fingerprint_max_age_days)
+
+def parse_slooh_photo_roll(slooh_web_parser_obj, util_obj, instrumentation):
     """Parse photo roll from https://slooh.com/"""
-    slooh_web_parser_obj.search_parser()
     if(slooh_web_parser_obj.login()):
-        photo_roll_parsing_status = slooh_web_parser_obj.photo_roll_parser()
+        # crawl only pages with photos not ingested yet, unless full recrawl is requested
+        known_photo_urls = util_obj.extract_known_photo_urls('photos_info.json')
+        instrumentation.increment("known_photos", len(known_photo_urls))
+        photo_roll_parsing_status = slooh_web_parser_obj.photo_roll_parser(known_photo_urls, args.full_recrawl)
         if(photo_roll_parsing_status):
-            slooh_web_parser_obj.logout()
-            util_obj.parse_photo_roll_raw_info('photo_roll_info.txt')
+            util_obj.parse_photo_roll_archive('photo_roll_archive', incremental = True, workers = args.parse_workers or os.cpu_count())
     else:
         print("Login failed!! Please try again...")
 
-def reserve_missions():
+def reserve_missions(slooh_web_parser_obj, util_obj, instrumentation):
     """Reserve missions in https://slooh.com/ for objects with no images yet"""
-    objects_without_photos = util_obj.extract_urls_to_objects_with_no_photos('slooh_object_info.json', 'photos_info.json')
-    active_missions = []
-    if(os.path.exists('ActiveMissions.txt')):
-        with open('ActiveMissions.txt', 'r') as f:
-            active_missions = f.readlines()
-    for object_url in objects_without_photos:
-        if (object_url + '\n') not in active_missions:
-            mission_booking_status, active_mission_count = slooh_web_parser_obj.reserve_mission_using_object_url(object_url)
-            if(mission_booking_status):
-                active_missions.append(object_url + '\n')
-            if(active_mission_count >= 5):
-                break
-    with open('ActiveMissions.txt', 'a') as f:
-        f.writelines(active_missions)
-        
-def dispose_slooh_obj():
+    # load missions ledger (migrated from active missions file on first use), completing missions whose objects now have photos
+    mission_ledger = MissionLedger('MissionLedger.json', 'ActiveMissions.txt')
+    instrumentation.increment("missions_completed", mission_ledger.complete_missions(util_obj.extract_urls_to_objects_with_photos(
+        'slooh_object_info.json', 'photos_info.json', mission_ledger.get_booked_object_urls())))
+    instrumentation.increment("missions_expired", mission_ledger.expire_missions())
+    # objects with missions already booked are not candidates
+    candidate_object_urls = util_obj.extract_urls_to_objects_with_no_photos('slooh_object_info.json', 'photos_info.json',
+                                                                            exclude_urls = mission_ledger.get_booked_object_urls())
+    # capture coordinates of a few candidates which don't have them yet (each object page is visited only once,
+    # objects whose pages showed no coordinates are skipped till their lookup is 'coordinate_retry_days' old)
+    object_coordinates = util_obj.extract_object_coordinates('slooh_object_info.json')
+    failed_lookup_urls = util_obj.extract_urls_with_failed_coordinate_lookups('slooh_object_info.json', args.coordinate_retry_days)
+    object_urls_without_coordinates = [object_url for object_url in candidate_object_urls
+                                       if object_url not in object_coordinates and object_url not in failed_lookup_urls]
+    looked_up_coordinates = slooh_web_parser_obj.extract_objects_coordinates(object_urls_without_coordinates[:args.max_coordinate_lookups])
+    util_obj.update_object_coordinates('slooh_object_info.json', looked_up_coordinates)
+    new_object_coordinates = {object_url: coordinates for object_url, coordinates in looked_up_coordinates.items() if coordinates is not None}
+    object_coordinates.update(new_object_coordinates)
+    instrumentation.increment("coordinates_captured", len(new_object_coordinates))
+    instrumentation.increment("coordinate_lookups_failed", len(looked_up_coordinates) - len(new_object_coordinates))
+    # rank candidates by their altitude during upcoming slots, skipping objects which are never observable
+    candidate_object_urls = rank_candidates([(object_url, object_coordinates.get(object_url)) for object_url in candidate_object_urls],
+                                            site = args.telescope_site, min_altitude = args.min_altitude)
+    instrumentation.increment("mission_candidates", len(candidate_object_urls))
+    # reserve missions (prefetching missions pages of next candidates) till active missions quota is reached,
+    # recording every booked mission in the ledger as soon as it is booked
+    def record_booked_mission(result):
+        instrumentation.increment("missions_attempted")
+        if(result["booked"]):
+            instrumentation.increment("missions_booked")
+            mission_ledger.add_booked_mission(result["object_url"])
+            mission_ledger.save()
+    reservation_pipeline = MissionReservationPipeline(slooh_web_parser_obj, prefetch_count = args.reservation_prefetch)
+    try:
+        reservation_pipeline.run(candidate_object_urls, on_result = record_booked_mission)
+    finally:
+        mission_ledger.save()
+
+# stages of daily work, each of which can be run/scheduled independently
+STAGES = {
+    "catalog": parse_slooh_catalog,         # parse object catalog to extract latest objects info
+    "photo_roll": parse_slooh_photo_roll,   # parse photo roll to extract latest photos info
+    "reservations": reserve_missions,       # reserve missions for objects with no photos
+}
+
+def create_catalog_store():
+    """Create catalog store (seeded from existing json files on first use), if enabled"""
+    if(not args.catalog_db):
+        return None
+    catalog_store = CatalogStore(args.catalog_db)
+    if(catalog_store.is_empty()):
+        if(os.path.exists('slooh_object_info.json')):
+            catalog_store.import_object_info('slooh_object_info.json')
+        if(os.path.exists('photos_info.json')):
+            catalog_store.import_photos_info('photos_info.json')
+    return catalog_store
+
+def create_slooh_obj(catalog_store, delta_feed, run_name):
+    """Create slooh website parser object (recording/replaying browser interactions if requested).
+    Browsers of every run use their own cache folder (named after the run), as runs of different stages may overlap."""
+    # crawl pool drivers can't be recorded/replayed, so a single driver is used while recording/replaying
+    crawl_workers = 1 if (args.record or args.replay) else args.crawl_workers
+    if(args.replay):
+        replay_driver = ReplayDriver(args.replay)
+        slooh_web_parser_obj = SloohWebsiteParser(args.email, args.password, None, catalog_store, crawl_workers, args.session_file, driver = replay_driver,
+                                                  delta_feed = delta_feed)
+        replay_driver.disable_sleeps(slooh_web_parser_obj)
+        return slooh_web_parser_obj
+    driver_factory = DriverFactory(args.chrome_driver_path, headless = not args.headed, block_resources = not args.load_resources,
+                                   cache_dir = os.path.join(args.browser_cache_dir, run_name), page_load_strategy = args.page_load_strategy,
+                                   max_js_heap_mb = args.max_js_heap_mb, extra_arguments = args.chrome_flag)
+    slooh_web_parser_obj = SloohWebsiteParser(args.email, args.password, args.chrome_driver_path, catalog_store, crawl_workers, args.session_file,
+                                              driver_factory = driver_factory, delta_feed = delta_feed)
+    if(args.record):
+        slooh_web_parser_obj.driver = RecordingDriver(slooh_web_parser_obj.driver, args.record)
+    return slooh_web_parser_obj
+
+def dispose_slooh_obj(slooh_web_parser_obj):
     """Dispose slooh object"""
-    slooh_web_parser_obj.logout()
+    # keep the session alive for the next run if it is persisted, else logout
+    if(args.session_file):
+        slooh_web_parser_obj.save_session()
+    else:
+        slooh_web_parser_obj.logout()
+    slooh_web_parser_obj.log_wait_summary()
+    slooh_web_parser_obj.close()
+
+def run_stages(*stages):
+    """Run given stages in order using their own slooh object (and catalog store), disposed once the stages are done.
+    Every stage and every method of slooh/utilities objects is timed, metrics are written to metrics dir (if given)."""
+    run_name = "all" if len(stages) == len(STAGES) else "_".join(stages)
+    instrumentation = Instrumentation(run_name, args.profile_dir)
+    catalog_store = create_catalog_store()
+    # objects and photos added by the stages are appended to delta feed (if requested)
+    delta_feed = DeltaFeed(args.delta_feed) if args.delta_feed else None
+    slooh_web_parser_obj = instrumentation.instrument_object(create_slooh_obj(catalog_store, delta_feed, run_name))
+    util_obj = instrumentation.instrument_object(Utilities(catalog_store, args.html_parser, delta_feed))
+    try:
+        with instrumentation.span("run"):
+            for stage in stages:
+                # pages crawled and objects/photos added by the stage are counted by the slooh/utilities objects
+                with instrumentation.stage(stage, count_sources = (slooh_web_parser_obj, util_obj)):
+                    STAGES[stage](slooh_web_parser_obj, util_obj, instrumentation)
+    finally:
+        dispose_slooh_obj(slooh_web_parser_obj)
+        if(catalog_store is not None):
+            catalog_store.close()
+        instrumentation.add_wait_summary(slooh_web_parser_obj.waiter.get_wait_summary())
+        if(args.metrics_dir):
+            os.makedirs(args.metrics_dir, exist_ok = True)
+            instrumentation.write_prometheus_textfile(os.path.join(args.metrics_dir, f"slooh_{run_name}.prom"))
+            instrumentation.write_json_summary(os.path.join(args.metrics_dir, f"slooh_{run_name}.json"))
 
 def work():
-    """Perform slooh photo roll parsing and mission reservation"""
-    parse_slooh_photo_roll()    # parse photo roll to extract latest photos info
-    reserve_missions()          # reserve missions for objects with no photos
-    dispose_slooh_obj()         # dispose slooh object
+    """Perform slooh catalog parsing, photo roll parsing and mission reservation"""
+    run_stages(*STAGES)
 
 if __name__ == '__main__':
-    # Create slooh website parser object - sys.argv[1] = email, sys.argv[2] = password, sys.argv[3] = chromedriver path
-    slooh_web_parser_obj = SloohWebsiteParser(sys.argv[1], sys.argv[2], sys.argv[3])
-    # Create utilities object
-    util_obj = Utilities()
-    
-    schedule.every().day.at("09:30").do(work)   # schedule 'work' at 09:30 AM local time every day
-    while(True):
-        schedule.run_pending()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description = "Parse https://slooh.com/ photo roll and book missions for objects with no images")
+    parser.add_argument("email", help = "slooh account email")
+    parser.add_argument("password", help = "slooh account password")
+    parser.add_argument("chrome_driver_path", nargs = "?", help = "path to chromedriver executable (not required with --replay)")
+    parser.add_argument("--full-recrawl", action = "store_true", help = "crawl the entire photo roll instead of stopping at already ingested photos")
+    parser.add_argument("--html-parser", choices = ["auto"] + list(PARSER_BACKENDS), default = "auto", help = "html parser used for photo roll pages (auto picks the fastest installed one)")
+    parser.add_argument("--parse-workers", type = int, default = 1, help = "number of processes used to parse captured photo roll pages (0 uses all cores)")
+    parser.add_argument("--crawl-workers", type = int, default = 1, help = "number of headless browsers used to crawl object catalog in parallel")
+    parser.add_argument("--differential-catalog", action = "store_true", help = "skip expanding catalog categories whose item count (shown in their label) hasn't changed since they were last crawled")
+    parser.add_argument("--fingerprint-max-age-days", type = float, default = 7, help = "re-crawl unchanged catalog categories anyway once they were last crawled more than given days ago")
+    parser.add_argument("--headed", action = "store_true", help = "show browser window instead of running chrome headless")
+    parser.add_argument("--load-resources", action = "store_true", help = "load images, fonts and media in browser (blocked by default)")
+    parser.add_argument("--browser-cache-dir", default = "browser_cache", help = "directory of browser disk cache reused across runs (one folder per stage)")
+    parser.add_argument("--page-load-strategy", choices = ["normal", "eager", "none"], default = "eager", help = "when page loads are considered done (eager waits for DOM only)")
+    parser.add_argument("--max-js-heap-mb", type = int, help = "cap javascript heap of browser pages to given MB (crawl drivers are recycled once page heap, not chrome process memory, nears it)")
+    parser.add_argument("--chrome-flag", action = "append", default = [], help = "extra chrome command line flag (e.g. memory flags), can be repeated")
+    parser.add_argument("--session-file", help = "path to encrypted file used to persist login session across runs")
+    parser.add_argument("--catalog-db", help = "path to SQLite catalog store (json files are exported from it)")
+    parser.add_argument("--reservation-prefetch", type = int, default = 3, help = "number of missions pages of next candidate objects to load in background tabs while booking (0 books in the current tab)")
+    parser.add_argument("--telescope-site", choices = list(TELESCOPE_SITES), default = "canary_islands", help = "telescope site used to rank mission candidates by visibility")
+    parser.add_argument("--min-altitude", type = float, default = 30, help = "skip mission candidates which never rise above given altitude (degrees) in the next 24 hours")
+    parser.add_argument("--max-coordinate-lookups", type = int, default = 10, help = "max number of object pages visited per run to capture coordinates of mission candidates")
+    parser.add_argument("--coordinate-retry-days", type = float, default = 7, help = "days before object pages which showed no coordinates are visited again")
+    parser.add_argument("--delta-feed", help = "path to append-only json lines log of objects and photos added/modified by every run")
+    parser.add_argument("--metrics-dir", help = "directory to write Prometheus textfile and json summary of every run to")
+    parser.add_argument("--profile-dir", help = "directory to write cProfile dump of every stage to")
+    parser.add_argument("--record", help = "record browser interactions of the run to given archive (requires --run-now)")
+    parser.add_argument("--replay", help = "replay browser interactions from given archive instead of using a browser (requires --run-now)")
+    parser.add_argument("--run-now", choices = list(STAGES) + ["all"], help = "run given stage (or all stages) once and exit instead of running as a daemon")
+    parser.add_argument("--catalog-at", default = "09:00", help = "daily time (HH:MM, local time) to parse object catalog")
+    parser.add_argument("--photo-roll-at", default = "09:30", help = "daily time (HH:MM, local time) to parse photo roll")
+    parser.add_argument("--reservations-at", default = "10:00", help = "daily time (HH:MM, local time) to reserve missions")
+    parser.add_argument("--jitter-minutes", type = float, default = 0, help = "delay start of every scheduled stage by a random amount of up to given minutes")
+    args = parser.parse_args()
+    if(args.chrome_driver_path is None and not args.replay):
+        parser.error("chrome_driver_path is required unless browser interactions are replayed")
+    # a recording/replay archive holds a single run
+    if((args.record or args.replay) and not args.run_now):
+        parser.error("--record and --replay can only be used with --run-now")
+
+    # run once and exit if requested
+    if(args.run_now == "all"):
+        work()
+    elif(args.run_now):
+        run_stages(args.run_now)
+    # else run as a daemon, scheduling every stage at its own time every day (reservations wait for a photo roll run in progress)
+    else:
+        job_scheduler = JobScheduler()
+        job_scheduler.add_job("catalog", lambda: run_stages("catalog"), at = args.catalog_at, jitter_seconds = args.jitter_minutes * 60)
+        job_scheduler.add_job("photo_roll", lambda: run_stages("photo_roll"), at = args.photo_roll_at, jitter_seconds = args.jitter_minutes * 60)
+        job_scheduler.add_job("reservations", lambda: run_stages("reservations"), at = args.reservations_at, jitter_seconds = args.jitter_minutes * 60,
+                              depends_on = ["photo_roll"])
+        job_scheduler.run_forever()
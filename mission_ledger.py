@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+import json
+import os
+
+class MissionLedger():
+    """Class that keeps track of missions booked for objects, keyed by object url.
+    Every mission is 'booked' till photos of its object show up ('completed') or it gets too old ('expired').
+    Completed/expired missions are dropped from the ledger file after a retention period. Ledger file is written atomically."""
+
+    BOOKED = "booked"
+    COMPLETED = "completed"
+    EXPIRED = "expired"
+
+    def __init__(self, path_to_ledger_file, path_to_legacy_missions_file = None, expiry_days = 7, retention_days = 30):
+        """Load ledger from given file (migrated from legacy active missions file, one object url per line, if ledger doesn't exist yet)"""
+        self.path_to_ledger_file = path_to_ledger_file
+        self.expiry = timedelta(days = expiry_days)
+        self.retention = timedelta(days = retention_days)
+        self.missions = {}
+        if(os.path.exists(path_to_ledger_file)):
+            with open(path_to_ledger_file, 'r') as f:
+                self.missions = json.load(f)
+        elif(path_to_legacy_missions_file and os.path.exists(path_to_legacy_missions_file)):
+            self._import_legacy_missions(path_to_legacy_missions_file)
+
+    def _import_legacy_missions(self, path_to_legacy_missions_file):
+        """Adds object urls in legacy active missions file as missions booked when the file was last modified"""
+        booked_at = datetime.fromtimestamp(os.path.getmtime(path_to_legacy_missions_file))
+        with open(path_to_legacy_missions_file, 'r') as f:
+            for line in f:
+                object_url = line.strip()
+                if object_url:
+                    self.missions[object_url] = self._create_entry(self.BOOKED, booked_at)
+
+    @staticmethod
+    def _create_entry(state, booked_at, updated_at = None):
+        return {
+            "state": state,
+            "booked_at": booked_at.isoformat(timespec = "seconds"),
+            "updated_at": (updated_at or booked_at).isoformat(timespec = "seconds"),
+        }
+
+    def is_booked(self, object_url):
+        """Returns True if a mission is currently booked for object with given url"""
+        mission = self.missions.get(object_url)
+        return mission is not None and mission["state"] == self.BOOKED
+
+    def get_booked_object_urls(self):
+        """Returns set of urls to objects with a mission currently booked"""
+        return {object_url for object_url, mission in self.missions.items() if mission["state"] == self.BOOKED}
+
+    def add_booked_mission(self, object_url, now = None):
+        """Records a mission booked for object with given url"""
+        self.missions[object_url] = self._create_entry(self.BOOKED, now or datetime.now())
+
+    def complete_missions(self, object_urls, now = None):
+        """Marks missions booked for objects with given urls as completed. Returns number of missions completed."""
+        return self._set_state(object_urls, self.COMPLETED, now or datetime.now())
+
+    def expire_missions(self, now = None):
+        """Marks missions booked more than 'expiry_days' ago as expired. Returns number of missions expired."""
+        now = now or datetime.now()
+        expired_object_urls = [object_url for object_url in self.get_booked_object_urls()
+                               if now - datetime.fromisoformat(self.missions[object_url]["booked_at"]) > self.expiry]
+        return self._set_state(expired_object_urls, self.EXPIRED, now)
+
+    def _set_state(self, object_urls, state, now):
+        """Moves booked missions of given objects to given state. Returns number of missions updated."""
+        updated_count = 0
+        for object_url in object_urls:
+            if self.is_booked(object_url):
+                self.missions[object_url]["state"] = state
+                self.missions[object_url]["updated_at"] = now.isoformat(timespec = "seconds")
+                updated_count += 1
+        return updated_count
+
+    def compact(self, now = None):
+        """Drops completed/expired missions last updated more than 'retention_days' ago. Returns number of missions dropped."""
+        now = now or datetime.now()
+        stale_object_urls = [object_url for object_url, mission in self.missions.items()
+                             if mission["state"] != self.BOOKED and now - datetime.fromisoformat(mission["updated_at"]) > self.retention]
+        for object_url in stale_object_urls:
+            del self.missions[object_url]
+        return len(stale_object_urls)
+
+    def save(self):
+        """Compacts and atomically writes ledger file"""
+        self.compact()
+        temp_path = self.path_to_ledger_file + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.missions, f, indent = 4)
+        os.replace(temp_path, self.path_to_ledger_file)
+
+    def __len__(self):
+        return len(self.missions)
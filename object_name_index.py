@@ -0,0 +1,76 @@
+from collections import deque
+
+class ObjectNameIndex():
+    """Class that indexes photographed object names for fast lookup against catalog object names.
+    Names are normalized to upper case and compiled into a multi-pattern substring automaton (Aho-Corasick),
+    so that every catalog object name can be checked against all photographed names in a single scan."""
+
+    def __init__(self, names = ()):
+        """Build the automaton for given names"""
+        # automaton is stored as parallel lists indexed by node id (node 0 is the root)
+        self.transitions = [{}]
+        self.failure_links = [0]
+        self.is_terminal = [False]
+        self.names_count = 0
+        for name in names:
+            self._add_name(name)
+        self._build_failure_links()
+
+    @classmethod
+    def from_photos_info(cls, photos_info):
+        """Build index from photos info json data (all names of every photographed object)"""
+        return cls(name for photos_obj in photos_info.values() for name in photos_obj["object_names"])
+
+    @staticmethod
+    def normalize_name(name):
+        """Return normalized name used by the index"""
+        return name.upper()
+
+    def _add_name(self, name):
+        """Add given name to the automaton trie"""
+        node = 0
+        for char in self.normalize_name(name):
+            next_node = self.transitions[node].get(char)
+            # if no transition exists for the current char, create a new node
+            if next_node is None:
+                next_node = len(self.transitions)
+                self.transitions[node][char] = next_node
+                self.transitions.append({})
+                self.failure_links.append(0)
+                self.is_terminal.append(False)
+            node = next_node
+        self.is_terminal[node] = True
+        self.names_count += 1
+
+    def _build_failure_links(self):
+        """Compute failure links breadth-first so that matching never backtracks over the scanned text"""
+        queue = deque(self.transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self.transitions[node].items():
+                # follow failure links of the current node till a node with a transition for char is found
+                fallback = self.failure_links[node]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.failure_links[fallback]
+                self.failure_links[next_node] = self.transitions[fallback].get(char, 0)
+                # a node is terminal if any of its suffixes is a complete name
+                self.is_terminal[next_node] = self.is_terminal[next_node] or self.is_terminal[self.failure_links[next_node]]
+                queue.append(next_node)
+
+    def matches(self, object_name):
+        """Return True if any of the indexed names is a substring of given object name (case insensitive)"""
+        # empty name is a substring of every object name
+        if self.is_terminal[0]:
+            return True
+        node = 0
+        for char in self.normalize_name(object_name):
+            while node and char not in self.transitions[node]:
+                node = self.failure_links[node]
+            node = self.transitions[node].get(char, 0)
+            # stop scanning as soon as a match is found
+            if self.is_terminal[node]:
+                return True
+        return False
+
+    def __len__(self):
+        return self.names_count
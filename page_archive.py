@@ -0,0 +1,159 @@
+from datetime import datetime
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+
+# zstandard is optional, faster (and smaller) alternative to gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# opening/closing tags of elements of a photo roll page, which browsers always serialize with both tags
+PAGE_ELEMENT_TAG_PATTERN = re.compile(rb'<(/?)(?:ul|li|h3|p|a)[\s>]', re.IGNORECASE)
+
+def iter_raw_info_pages(f, start_offset = 0):
+    """Yields (raw page html, byte offset after the page) for every page in given raw info file (opened in binary mode)
+    from given offset. Every page is written on its own line, but a page may itself contain line breaks - lines are
+    joined till every element opened in the page is closed (or the file ends).
+    Raw info files have no page separator, so page boundaries are found heuristically by counting ul/li/h3/p/a tags
+    (a line break inside an attribute or text which looks like one of these tags could merge or split pages).
+    Pages are no longer written to raw info files (see 'PageArchive'), such files are only read to import legacy captures."""
+    f.seek(start_offset)
+    offset = start_offset
+    page_lines = []
+    open_elements = 0
+    for line in f:
+        offset += len(line)
+        page_lines.append(line)
+        for tag in PAGE_ELEMENT_TAG_PATTERN.finditer(line):
+            open_elements += -1 if tag.group(1) else 1
+        if open_elements <= 0:
+            raw_page = b''.join(page_lines).decode('utf-8', errors = 'replace').strip()
+            page_lines = []
+            open_elements = 0
+            if raw_page:
+                yield raw_page, offset
+    if page_lines:
+        raw_page = b''.join(page_lines).decode('utf-8', errors = 'replace').strip()
+        if raw_page:
+            yield raw_page, offset
+
+def _compress(data, codec):
+    if(codec == "zstd"):
+        return zstandard.ZstdCompressor(level = 10).compress(data)
+    return gzip.compress(data, compresslevel = 6)
+
+def _decompress(data, codec):
+    if(codec == "zstd"):
+        if zstandard is None:
+            raise ValueError("Page is compressed with zstd but 'zstandard' package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+class PageArchive():
+    """Class that stores raw captured pages content addressed (by sha256 of page html), each unique page stored once.
+    Pages are compressed one at a time (zstd if installed, else gzip) and appended to a pack file. Index file has one json line
+    per page (hash, offset & length in pack file, codec) in capture order. Index is the source of truth - pack bytes not in index
+    (e.g. if the process was killed between writing the two) are ignored."""
+
+    def __init__(self, path_to_archive_dir, path_to_legacy_raw_info_file = None, codec = "auto"):
+        """Load archive index from given directory (created, with pages imported from legacy raw info file, one page per line, if
+        archive doesn't exist yet)"""
+        self.pack_path = os.path.join(path_to_archive_dir, 'pages.pack')
+        self.index_path = os.path.join(path_to_archive_dir, 'index.jsonl')
+        self.codec = ("zstd" if zstandard is not None else "gzip") if codec == "auto" else codec
+        # page hash -> index entry, in capture order
+        self.entries = {}
+        self.pack_file = None
+        self.index_file = None
+        is_new_archive = not os.path.exists(self.index_path)
+        os.makedirs(path_to_archive_dir, exist_ok = True)
+        if not is_new_archive:
+            self._load_index()
+        elif(path_to_legacy_raw_info_file and os.path.exists(path_to_legacy_raw_info_file)):
+            self.import_raw_info_file(path_to_legacy_raw_info_file)
+
+    def _load_index(self):
+        """Loads index entries. A partially written last line (e.g. if the process was killed while writing it) is ignored."""
+        with open(self.index_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self.entries[entry["sha256"]] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, page_hash):
+        return page_hash in self.entries
+
+    @staticmethod
+    def hash_page(raw_page):
+        """Returns content address (sha256 hex digest) of given raw page"""
+        return hashlib.sha256(raw_page.encode('utf-8')).hexdigest()
+
+    def add_page(self, raw_page):
+        """Adds given raw page to archive unless an identical (or empty) page is already stored.
+        Returns (page hash, whether page was added)."""
+        raw_page = raw_page.strip()
+        if not raw_page:
+            return None, False
+        page_hash = self.hash_page(raw_page)
+        if page_hash in self.entries:
+            return page_hash, False
+        if self.pack_file is None:
+            self.pack_file = open(self.pack_path, 'ab')
+            self.index_file = open(self.index_path, 'a')
+        data = _compress(raw_page.encode('utf-8'), self.codec)
+        # append to pack file first, so that index never points to missing bytes
+        self.pack_file.seek(0, os.SEEK_END)
+        offset = self.pack_file.tell()
+        self.pack_file.write(data)
+        self.pack_file.flush()
+        entry = {"sha256": page_hash, "offset": offset, "length": len(data), "size": len(raw_page), "codec": self.codec,
+                 "archived_at": datetime.now().isoformat(timespec = "seconds")}
+        self.index_file.write(json.dumps(entry) + '\n')
+        self.index_file.flush()
+        self.entries[page_hash] = entry
+        return page_hash, True
+
+    def import_raw_info_file(self, path_to_raw_info_file):
+        """Adds every page of given raw info file (see 'iter_raw_info_pages') to archive. Returns number of pages added."""
+        pages_added = 0
+        with open(path_to_raw_info_file, 'rb') as f:
+            for raw_page, _ in iter_raw_info_pages(f):
+                pages_added += self.add_page(raw_page)[1]
+        return pages_added
+
+    def iter_pages(self, skip_hashes = None):
+        """Yields (raw page html, page hash) for every page in archive, in capture order, except pages with given hashes.
+        Pages are decompressed one at a time from the memory mapped pack file."""
+        entries = [entry for entry in self.entries.values() if not skip_hashes or entry["sha256"] not in skip_hashes]
+        if not entries:
+            return
+        if self.pack_file is not None:
+            self.pack_file.flush()
+        with open(self.pack_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as pack:
+            for entry in entries:
+                data = pack[entry["offset"]:entry["offset"] + entry["length"]]
+                yield _decompress(data, entry["codec"]).decode('utf-8'), entry["sha256"]
+
+    def close(self):
+        """Closes pack and index files"""
+        if self.pack_file is not None:
+            self.pack_file.close()
+            self.index_file.close()
+            self.pack_file = None
+            self.index_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,62 @@
+import time
+
+class PageWaiter():
+    """Class that waits for explicit page readiness conditions (instead of fixed sleeps) and records how long each wait took"""
+
+    def __init__(self, logger, initial_poll_interval = 0.1, max_poll_interval = 2, backoff_factor = 2, sleep = time.sleep, clock = time.monotonic):
+        """Initialize required variables"""
+        self.logger = logger
+        self.initial_poll_interval = initial_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff_factor = backoff_factor
+        self.sleep = sleep
+        self.clock = clock
+        # list of (wait name, seconds waited, whether condition was met) for every wait so far
+        self.wait_timings = []
+
+    def wait_until(self, wait_name, condition, timeout):
+        """Polls given condition with exponential backoff till it returns a truthy value or timeout (in seconds) expires.
+        Exceptions raised by the condition are treated as condition not met.
+        Returns the value returned by the condition, or None if timeout expired."""
+        start_time = self.clock()
+        poll_interval = self.initial_poll_interval
+        while True:
+            try:
+                result = condition()
+            except Exception:
+                result = None
+            elapsed = self.clock() - start_time
+            # if condition is met, record the wait and return condition result
+            if result:
+                self.wait_timings.append((wait_name, elapsed, True))
+                return result
+            # if timeout expired, record the wait and return None
+            if elapsed >= timeout:
+                self.wait_timings.append((wait_name, elapsed, False))
+                self.logger.debug(f"Timed out after {elapsed:.1f}s waiting for {wait_name}")
+                return None
+            # else wait before polling again, doubling the poll interval every time
+            self.sleep(min(poll_interval, timeout - elapsed))
+            poll_interval = min(poll_interval * self.backoff_factor, self.max_poll_interval)
+
+    def wait_for_class(self, driver, wait_name, class_name, timeout, min_count = 1):
+        """Waits till at least 'min_count' elements with given class name are present.
+        Returns list of elements found, or None if timeout expired."""
+        return self.wait_until(wait_name, lambda: self._elements_if_enough(driver.find_elements_by_class_name(class_name), min_count), timeout)
+
+    def wait_for_name(self, driver, wait_name, name, timeout):
+        """Waits till an element with given name attribute is present.
+        Returns list of elements found, or None if timeout expired."""
+        return self.wait_until(wait_name, lambda: driver.find_elements_by_name(name), timeout)
+
+    def get_wait_summary(self):
+        """Returns dict of wait name to (wait count, total seconds waited, timeouts count)"""
+        wait_summary = {}
+        for wait_name, elapsed, is_condition_met in self.wait_timings:
+            wait_count, total_elapsed, timeouts = wait_summary.get(wait_name, (0, 0.0, 0))
+            wait_summary[wait_name] = (wait_count + 1, total_elapsed + elapsed, timeouts + (0 if is_condition_met else 1))
+        return wait_summary
+
+    @staticmethod
+    def _elements_if_enough(elements, min_count):
+        return elements if len(elements) >= min_count else None
@@ -0,0 +1,208 @@
+from collections import deque
+from selenium.webdriver.remote.webelement import WebElement
+import selenium.common.exceptions
+import gzip
+import json
+
+class ReplayError(Exception):
+    """Raised when replayed code makes a driver call which was never recorded"""
+
+def _make_key(target, name, args = None, kwargs = None, is_property = False):
+    """Returns archive key of a call (or property access) on given target (driver, element or other driver object)"""
+    if is_property:
+        return json.dumps([target, name])
+    return json.dumps([target, name, args, kwargs], sort_keys = True)
+
+class _RecordingProxy():
+    """Proxy that forwards attribute accesses/calls to a real driver object, recording every response"""
+
+    def __init__(self, target, obj, recorder):
+        self._target = target
+        self._obj = obj
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        try:
+            value = getattr(self._obj, name)
+        except Exception as err:
+            self._recorder._record(_make_key(self._target, name, is_property = True), self._recorder._encode_exception(err))
+            raise
+        if not callable(value):
+            return self._recorder._record_value(_make_key(self._target, name, is_property = True), value, f"{self._target}.{name}")
+        def method(*args, **kwargs):
+            key = _make_key(self._target, name, self._recorder._encode_value(list(args)), self._recorder._encode_value(kwargs))
+            try:
+                result = value(*[self._recorder._unwrap(arg) for arg in args], **{k: self._recorder._unwrap(v) for k, v in kwargs.items()})
+            except Exception as err:
+                self._recorder._record(key, self._recorder._encode_exception(err))
+                raise
+            return self._recorder._record_value(key, result, f"{self._target}.{name}()")
+        return method
+
+class RecordingDriver(_RecordingProxy):
+    """Class that wraps a selenium driver and records every call made on it (and on elements/objects returned by it)
+    along with its response, i.e. page transitions and DOM snapshots seen during a run.
+    Recording is written to a gzip compressed json archive (identical responses stored once) when the driver quits."""
+
+    def __init__(self, driver, path_to_archive):
+        """Initialize required variables"""
+        super().__init__("driver", driver, self)
+        self._path_to_archive = path_to_archive
+        self._calls = []
+        # unique responses, indexed by their json text
+        self._values = []
+        self._value_indexes = {}
+        # selenium element id -> archive element id
+        self._element_ids = {}
+        self._elements = {}
+        self._objects = {}
+
+    def _record(self, key, encoded_value):
+        value_text = json.dumps(encoded_value, sort_keys = True)
+        if value_text not in self._value_indexes:
+            self._value_indexes[value_text] = len(self._values)
+            self._values.append(encoded_value)
+        self._calls.append([key, self._value_indexes[value_text]])
+
+    def _record_value(self, key, value, object_target):
+        """Records given response and returns it (with elements/driver objects in it wrapped in recording proxies)"""
+        self._record(key, self._encode_value(value, object_target))
+        return self._wrap(value, object_target)
+
+    def _encode_value(self, value, object_target = None):
+        """Returns json serializable form of given value, elements and other driver objects replaced by references"""
+        if isinstance(value, (_RecordingProxy,)):
+            value = value._obj
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [self._encode_value(item, object_target) for item in value]
+        if isinstance(value, dict):
+            return {str(k): self._encode_value(v, object_target) for k, v in value.items()}
+        if isinstance(value, WebElement):
+            return {"__element__": self._element_ids.setdefault(value.id, len(self._element_ids))}
+        return {"__object__": object_target}
+
+    def _wrap(self, value, object_target):
+        """Wraps elements/driver objects in given value in recording proxies"""
+        if isinstance(value, list):
+            return [self._wrap(item, object_target) for item in value]
+        if isinstance(value, WebElement):
+            element_id = self._element_ids[value.id]
+            if element_id not in self._elements:
+                self._elements[element_id] = _RecordingProxy(f"element:{element_id}", value, self)
+            return self._elements[element_id]
+        if value is not None and not isinstance(value, (bool, int, float, str, tuple, dict)):
+            if object_target not in self._objects:
+                self._objects[object_target] = _RecordingProxy(object_target, value, self)
+            return self._objects[object_target]
+        return value
+
+    @staticmethod
+    def _unwrap(value):
+        """Returns real driver object behind given (possibly proxied) argument"""
+        if isinstance(value, _RecordingProxy):
+            return value._obj
+        if isinstance(value, list):
+            return [RecordingDriver._unwrap(item) for item in value]
+        return value
+
+    @staticmethod
+    def _encode_exception(err):
+        # selenium exceptions keep their own message in 'msg' (str() adds a prefix and stack trace)
+        return {"__exception__": [type(err).__name__, getattr(err, "msg", None) or str(err)]}
+
+    def save(self):
+        """Writes recorded calls to archive"""
+        with gzip.open(self._path_to_archive, 'wt', encoding = 'utf-8') as f:
+            json.dump({"version": 1, "values": self._values, "calls": self._calls}, f)
+
+    def quit(self):
+        """Saves recording and quits real driver"""
+        self.save()
+        self._obj.quit()
+
+class _ReplayProxy():
+    """Proxy that answers attribute accesses/calls on a driver object from a recording"""
+
+    def __init__(self, target, replay):
+        self._target = target
+        self._replay = replay
+
+    def __getattr__(self, name):
+        if (self._target, name) in self._replay._properties:
+            return self._replay._respond(_make_key(self._target, name, is_property = True))
+        def method(*args, **kwargs):
+            return self._replay._respond(_make_key(self._target, name, self._replay._encode_value(list(args)), self._replay._encode_value(kwargs)))
+        return method
+
+class ReplayDriver(_ReplayProxy):
+    """Class that implements the driver api used by the parser from an archive written by RecordingDriver - no browser is used.
+    Every call is answered with the responses recorded for the same call (target, method and arguments) in recorded order,
+    the last response being repeated once they run out. Also provides a virtual clock, so that waits don't really sleep."""
+
+    def __init__(self, path_to_archive):
+        """Load recording from given archive"""
+        super().__init__("driver", self)
+        with gzip.open(path_to_archive, 'rt', encoding = 'utf-8') as f:
+            archive = json.load(f)
+        self._values = archive["values"]
+        self._responses = {}
+        self._properties = set()
+        for key, value_index in archive["calls"]:
+            self._responses.setdefault(key, deque()).append(value_index)
+            call = json.loads(key)
+            if len(call) == 2:
+                self._properties.add(tuple(call))
+        self._last_responses = {}
+        self._now = 0.0
+
+    def _respond(self, key):
+        """Returns (or raises) next recorded response of given call"""
+        responses = self._responses.get(key)
+        if responses:
+            self._last_responses[key] = responses.popleft()
+        elif key not in self._last_responses:
+            raise ReplayError(f"No recorded response for {key}")
+        return self._decode_value(self._values[self._last_responses[key]])
+
+    def _decode_value(self, value):
+        if isinstance(value, list):
+            return [self._decode_value(item) for item in value]
+        if isinstance(value, dict):
+            if "__element__" in value:
+                return _ReplayProxy(f"element:{value['__element__']}", self)
+            if "__object__" in value:
+                return _ReplayProxy(value["__object__"], self)
+            if "__exception__" in value:
+                exception_name, message = value["__exception__"]
+                raise getattr(selenium.common.exceptions, exception_name, ReplayError)(message)
+            return {k: self._decode_value(v) for k, v in value.items()}
+        return value
+
+    def _encode_value(self, value):
+        """Returns archive form of given argument (replayed elements replaced by references)"""
+        if isinstance(value, _ReplayProxy):
+            return {"__element__": int(value._target.split(':')[1])} if value._target.startswith("element:") else {"__object__": value._target}
+        if isinstance(value, (list, tuple)):
+            return [self._encode_value(item) for item in value]
+        if isinstance(value, dict):
+            return {str(k): self._encode_value(v) for k, v in value.items()}
+        return value
+
+    def quit(self):
+        """Nothing to quit during replay"""
+
+    def sleep(self, seconds):
+        """Advances virtual clock by given seconds instead of sleeping"""
+        self._now += seconds
+
+    def monotonic(self):
+        """Returns virtual clock time"""
+        return self._now
+
+    def disable_sleeps(self, slooh_web_parser_obj):
+        """Makes given parser wait on the virtual clock, so that replayed runs don't sleep"""
+        slooh_web_parser_obj.DEFAULT_DRIVER_SLEEP = 0
+        slooh_web_parser_obj.waiter.sleep = self.sleep
+        slooh_web_parser_obj.waiter.clock = self.monotonic
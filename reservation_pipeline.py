@@ -0,0 +1,120 @@
+from collections import deque
+import time
+
+class MissionReservationPipeline():
+    """Class that reserves missions for candidate objects in order, prefetching missions pages of the next few candidates
+    in background browser tabs while the current booking completes. Stops as soon as active missions quota is reached.
+    Active missions count is tracked by the pipeline, as tabs prefetched before earlier bookings show a stale count."""
+
+    def __init__(self, slooh_web_parser_obj, prefetch_count = 3, max_active_missions = 5):
+        """Initialize required variables"""
+        self.slooh_web_parser_obj = slooh_web_parser_obj
+        self.logger = slooh_web_parser_obj.logger
+        # number of background tabs (0 books every candidate in the current tab)
+        self.prefetch_count = max(0, prefetch_count)
+        self.max_active_missions = max_active_missions
+        self.on_result = None
+
+    def run(self, object_urls, on_result = None):
+        """Reserves missions for objects with given urls till active missions quota is reached.
+        Returns list of results, one per object tried - dict with 'object_url', 'booked', 'active_missions',
+        'prefetch_seconds' (time spent loading in background before booking started) and 'booking_seconds'.
+        If given, 'on_result' is called with every result as soon as the object has been tried."""
+        self.on_result = on_result
+        if(not self.slooh_web_parser_obj.login()):
+            self.logger.debug("Not logged in before trying to book missions.")
+            return []
+        results = self._run_pipelined(object_urls)
+        for result in results:
+            self.logger.debug(f"Mission {'booked' if result['booked'] else 'not booked'} for object url - {result['object_url']} "
+                              f"(prefetch {result['prefetch_seconds']}s, booking {result['booking_seconds']}s).")
+        booked_count = sum(1 for result in results if result["booked"])
+        self.logger.debug(f"Mission reservation complete. {str(booked_count)} missions booked for {str(len(results))} objects tried.")
+        return results
+
+    def _run_pipelined(self, object_urls):
+        """Reserves missions with missions pages of the next 'prefetch_count' objects loading in background tabs.
+        Candidates which were not prefetched (all of them, if 'prefetch_count' is 0) are loaded in the current tab."""
+        driver = self.slooh_web_parser_obj.driver
+        main_window = driver.current_window_handle
+        candidates = iter(object_urls)
+        prefetched = deque()
+        results = []
+        # active missions count shown by the first missions page, and missions booked since
+        first_active_mission_count = None
+        booked_count = 0
+        try:
+            self._prefetch(prefetched, candidates)
+            while True:
+                if prefetched:
+                    object_url, window, opened_at = prefetched.popleft()
+                else:
+                    object_url, window, opened_at = next(candidates, None), None, time.monotonic()
+                    if object_url is None:
+                        break
+                # keep next candidates loading while current booking is done
+                self._prefetch(prefetched, candidates)
+                start_time = time.monotonic()
+                try:
+                    if window is not None:
+                        driver.switch_to.window(window)
+                    else:
+                        driver.get(self.slooh_web_parser_obj.get_mission_url(object_url))
+                    mission_booking_status, active_mission_count = self.slooh_web_parser_obj._reserve_mission_on_loaded_page(object_url)
+                except Exception as err:
+                    self.logger.debug(f"Mission booking failed for object url - {object_url} - {str(err)}")
+                    mission_booking_status, active_mission_count = False, 0
+                # count shown by a prefetched page doesn't include missions booked after it was loaded
+                if(first_active_mission_count is None and active_mission_count > 0):
+                    first_active_mission_count = active_mission_count - (1 if mission_booking_status else 0)
+                booked_count += 1 if mission_booking_status else 0
+                active_mission_count = max(active_mission_count, (first_active_mission_count or 0) + booked_count)
+                self._add_result(results, self._create_result(object_url, mission_booking_status, active_mission_count,
+                                                              start_time - opened_at, time.monotonic() - start_time))
+                if window is not None:
+                    self._close_window(driver, window, main_window)
+                # stop as soon as active missions quota is reached
+                if(active_mission_count >= self.max_active_missions):
+                    break
+        finally:
+            # close tabs prefetched for candidates which were not needed
+            for object_url, window, opened_at in prefetched:
+                self._close_window(driver, window, main_window)
+        return results
+
+    def _prefetch(self, prefetched, candidates):
+        """Open missions pages of next candidates in background tabs till 'prefetch_count' pages are prefetched"""
+        driver = self.slooh_web_parser_obj.driver
+        while len(prefetched) < self.prefetch_count:
+            object_url = next(candidates, None)
+            if object_url is None:
+                return
+            existing_windows = set(driver.window_handles)
+            driver.execute_script("window.open(arguments[0], '_blank');", self.slooh_web_parser_obj.get_mission_url(object_url))
+            new_windows = [window for window in driver.window_handles if window not in existing_windows]
+            prefetched.append((object_url, new_windows[0], time.monotonic()))
+
+    def _add_result(self, results, result):
+        """Add result of an object tried, notifying 'on_result' callback (if any)"""
+        results.append(result)
+        if self.on_result is not None:
+            self.on_result(result)
+
+    @staticmethod
+    def _close_window(driver, window, main_window):
+        """Close given tab and switch back to main window"""
+        try:
+            driver.switch_to.window(window)
+            driver.close()
+        finally:
+            driver.switch_to.window(main_window)
+
+    @staticmethod
+    def _create_result(object_url, mission_booking_status, active_mission_count, prefetch_seconds, booking_seconds):
+        return {
+            "object_url": object_url,
+            "booked": mission_booking_status,
+            "active_missions": active_mission_count,
+            "prefetch_seconds": round(prefetch_seconds, 2),
+            "booking_seconds": round(booking_seconds, 2),
+        }
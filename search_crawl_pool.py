@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from page_waiter import PageWaiter
+from search_tree_extractor import extract_grandparent_tree
+
+# javascript heap cap (MB) of crawl drivers if driver factory doesn't cap it
+DEFAULT_MAX_JS_HEAP_MB = 512
+# grand-parents crawled by a driver before it is recycled, if its page doesn't report javascript heap usage
+MAX_GRANDPARENTS_PER_DRIVER = 20
+
+class SearchCrawlPool():
+    """Class that crawls grand-parents in search window in parallel using a pool of headless chrome drivers.
+    Grand-parents are sharded across workers by index, each worker owning one driver."""
+
+    def __init__(self, driver_factory, logger, workers = 2, max_js_heap_mb = None, max_retries = 2,
+                 dashboard_url = "https://slooh.com/newDashboard", page_timeout = 30):
+        """Initialize required variables. Drivers are created by given driver factory, always headless and with capped javascript heap
+        ('max_js_heap_mb' if given, else the factory's cap, if set, else DEFAULT_MAX_JS_HEAP_MB). The cap is also the recycle threshold -
+        a driver is recycled once the javascript heap of its page nears it. This is not the memory of the chrome process, which isn't measured.
+        Drivers whose page doesn't report heap usage are recycled after every MAX_GRANDPARENTS_PER_DRIVER grand-parents instead."""
+        self.max_js_heap_mb = max_js_heap_mb or driver_factory.max_js_heap_mb or DEFAULT_MAX_JS_HEAP_MB
+        self.driver_factory = driver_factory.with_options(headless = True, max_js_heap_mb = self.max_js_heap_mb)
+        self.logger = logger
+        self.workers = workers
+        self.max_retries = max_retries
+        self.dashboard_url = dashboard_url
+        self.page_timeout = page_timeout
+        self.waiter = PageWaiter(logger)
+        self.on_grandparent = None
+        self.known_fingerprints = None
+
+    def crawl(self, on_start = None, on_grandparent = None, known_fingerprints = None):
+        """Crawls all grand-parents in search window.
+        If given, 'on_start' is called with the number of grand-parents and returns indexes of grand-parents to skip (e.g. already
+        crawled by an earlier crawl), and 'on_grandparent' is called (from worker threads) with index and tree of every grand-parent
+        as soon as it is crawled. 'known_fingerprints' are passed on to 'extract_grandparent_tree' to skip unchanged parents.
+        Returns dict of grand-parent index to grand-parent tree (see 'extract_grandparent_tree').
+        Grand-parents which could not be crawled even after retries are left out."""
+        # find number of grand-parents using the first worker's driver
+        driver = self._create_driver(0)
+        try:
+            grandparents_len = self._open_search_window(driver)
+        except Exception:
+            self._quit_driver(driver)
+            raise
+        skip_indexes = set(on_start(grandparents_len)) if on_start else set()
+        self.on_grandparent = on_grandparent
+        self.known_fingerprints = known_fingerprints
+        grandparent_indexes = [i for i in range(grandparents_len) if i not in skip_indexes]
+        self.logger.debug(f"Crawling {str(len(grandparent_indexes))}/{str(grandparents_len)} grand-parents using {str(self.workers)} workers")
+
+        # shard grand-parents by index across workers, first worker reuses the driver created above
+        shards = [grandparent_indexes[worker::self.workers] for worker in range(self.workers)]
+        drivers = [driver] + [None] * (self.workers - 1)
+        with ThreadPoolExecutor(max_workers = self.workers) as executor:
+            shard_results = list(executor.map(self._crawl_shard, range(self.workers), shards, drivers))
+
+        # merge results from all workers
+        grandparent_trees = {}
+        for shard_result in shard_results:
+            grandparent_trees.update(shard_result)
+        return grandparent_trees
+
+    def _crawl_shard(self, worker, grandparent_indexes, driver):
+        """Crawls grand-parents at given indexes using given worker's driver, recreating the driver if it crashes or its page nears
+        the javascript heap cap. Returns dict of grand-parent index to grand-parent tree."""
+        grandparent_trees = {}
+        # grand-parents crawled by current driver
+        driver_grandparents = 0
+        try:
+            for i in grandparent_indexes:
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        # (re)create driver and open search window if required
+                        if driver is None:
+                            driver = self._create_driver(worker)
+                            driver_grandparents = 0
+                            self._open_search_window(driver)
+                        grandparent_trees[i] = extract_grandparent_tree(driver, i, known_fingerprints = self.known_fingerprints)
+                        for error in grandparent_trees[i]["errors"]:
+                            self.logger.debug(f"Unable to extract object info for grand-parent - {str(i)} & {error}")
+                        if self.on_grandparent is not None:
+                            self.on_grandparent(i, grandparent_trees[i])
+                        driver_grandparents += 1
+                        # recycle driver once its page nears the javascript heap cap
+                        if self._should_recycle(driver, driver_grandparents):
+                            self.logger.debug(f"Driver reached javascript heap recycle threshold after grand-parent - {str(i)}. Recycling driver.")
+                            self._quit_driver(driver)
+                            driver = None
+                        break
+                    except Exception as err:
+                        self.logger.debug(f"Crawling grand-parent - {str(i)} failed (attempt {str(attempt + 1)}) - {str(err)}")
+                        self._quit_driver(driver)
+                        driver = None
+        finally:
+            self._quit_driver(driver)
+        return grandparent_trees
+
+    def _create_driver(self, worker):
+        """Creates headless chrome driver with capped javascript heap for given worker (each worker has its own disk cache)"""
+        return self.driver_factory.create_driver(cache_subdir = f"crawl_worker_{str(worker)}")
+
+    def _open_search_window(self, driver):
+        """Loads dashboard and opens search window. Returns number of grand-parents in search window."""
+        driver.get(self.dashboard_url)
+        self.waiter.wait_for_class(driver, "dashboard", "icon-search", self.page_timeout)
+        driver.find_element_by_class_name("icon-search").click()
+        grandparents = self.waiter.wait_for_class(driver, "search results", "search-results-grandparent", self.page_timeout)
+        if not grandparents:
+            raise Exception("Could not open search window")
+        return len(grandparents)
+
+    def _should_recycle(self, driver, driver_grandparents):
+        """Returns True if javascript heap used by the page of given driver exceeds 90% of javascript heap cap.
+        If the page doesn't report heap usage, returns True once given grand-parents crawled by the driver reach MAX_GRANDPARENTS_PER_DRIVER."""
+        try:
+            used_js_heap = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null;")
+        except Exception:
+            used_js_heap = None
+        if used_js_heap is None:
+            return driver_grandparents >= MAX_GRANDPARENTS_PER_DRIVER
+        return used_js_heap > 0.9 * self.max_js_heap_mb * 1024 * 1024
+
+    @staticmethod
+    def _quit_driver(driver):
+        """Quits given driver ignoring errors (e.g. if it has already crashed)"""
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
@@ -0,0 +1,83 @@
+# script run inside the browser to expand a grand-parent in search window along with all its parents and
+# return grand-parent -> parent -> item name/href structure in a single round-trip.
+# every parent is fingerprinted by the item count shown in its collapsed label (e.g. 'Galaxies (12)') - the items themselves
+# are only rendered once the parent is expanded. parents whose fingerprint is known are not expanded, parents without a count
+# in their label can't be known to be unchanged, so they are always expanded.
+EXTRACT_GRANDPARENT_SCRIPT = """
+const grandparentIndex = arguments[0];
+const expandTimeoutMs = arguments[1];
+const knownFingerprints = arguments[2] || {};
+const done = arguments[arguments.length - 1];
+const byClass = className => Array.from(document.getElementsByClassName(className));
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+const fingerprint = label => {
+    const itemCount = label.match(/[(\\[](\\d+)[)\\]]$/);
+    return itemCount ? 'items:' + itemCount[1] : null;
+};
+const waitFor = async check => {
+    const start = Date.now();
+    while (Date.now() - start < expandTimeoutMs) {
+        const value = check();
+        if (value) return value;
+        await sleep(50);
+    }
+    return check();
+};
+(async () => {
+    const grandparent = byClass('search-results-grandparent')[grandparentIndex];
+    const tree = {name: grandparent.innerText.trim(), parents: [], errors: []};
+    const knownParentFingerprints = knownFingerprints[tree.name] || {};
+    // expand grand-parent
+    grandparent.querySelector('.icon-plus').click();
+    await waitFor(() => byClass('search-results-parent').length);
+    const parentsCount = byClass('search-results-parent').length;
+    for (let j = 0; j < parentsCount; j++) {
+        try {
+            const parent = byClass('search-results-parent')[j];
+            if (!parent.innerHTML.includes('icon-plus')) continue;
+            const parentName = parent.innerText.trim();
+            const parentFingerprint = fingerprint(parentName);
+            // skip parent if its item count hasn't changed since it was last crawled
+            if (parentFingerprint && knownParentFingerprints[parentName] === parentFingerprint) {
+                tree.parents.push({name: parentName, fingerprint: parentFingerprint, skipped: true, items: []});
+                continue;
+            }
+            // expand items under current parent
+            parent.querySelector('.icon-plus').click();
+            const items = await waitFor(() => { const found = byClass('search-results-item'); return found.length ? found : null; }) || [];
+            tree.parents.push({
+                name: parentName,
+                fingerprint: parentFingerprint,
+                items: items.map(item => {
+                    const link = item.querySelector('a');
+                    return {name: item.innerText.trim(), href: link ? link.href : null};
+                })
+            });
+            // minimize current parent
+            const minimize = byClass('search-results-parent')[j].querySelector('.icon-minus');
+            if (minimize) minimize.click();
+            await waitFor(() => !byClass('search-results-item').length);
+        } catch (err) {
+            tree.errors.push('parent - ' + j + ' : ' + err);
+        }
+    }
+    // minimize grand-parent
+    const minimize = byClass('search-results-grandparent')[grandparentIndex].querySelector('.icon-minus');
+    if (minimize) minimize.click();
+    await waitFor(() => !byClass('search-results-parent').length);
+    done(tree);
+})().catch(err => done({error: String(err)}));
+"""
+
+def extract_grandparent_tree(driver, grandparent_index, expand_timeout = 5, script_timeout = 600, known_fingerprints = None):
+    """Expands grand-parent at given index in the (already open) search window using a single script call.
+    Returns dict {"name": grand-parent name, "parents": [{"name": parent name, "fingerprint": item count shown in parent label (None if not shown),
+    "items": [{"name": item name, "href": object url}]}], "errors": [errors for individual parents]}.
+    Parents whose fingerprint matches the one in 'known_fingerprints' (grand-parent name -> parent name -> fingerprint)
+    are not expanded - they are returned with 'skipped' set and no items.
+    Raises an exception if the grand-parent could not be expanded."""
+    driver.set_script_timeout(script_timeout)
+    tree = driver.execute_async_script(EXTRACT_GRANDPARENT_SCRIPT, grandparent_index, int(expand_timeout * 1000), known_fingerprints or {})
+    if "error" in tree:
+        raise Exception(tree["error"])
+    return tree
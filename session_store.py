@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import json
+import os
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:     # session persistence is disabled if cryptography is not installed
+    Fernet = None
+
+class SessionStore():
+    """Class that persists authenticated browser session (cookies + local/session storage) in a local encrypted file.
+    File is encrypted with a key derived from given secret (e.g. account password)."""
+
+    SALT_SIZE = 16
+    KEY_DERIVATION_ITERATIONS = 200000
+    # cookie fields accepted by webdriver 'add_cookie'
+    COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry")
+    DUMP_STORAGE_SCRIPT = """
+        const dump = storage => Object.fromEntries(Array.from({length: storage.length}, (_, i) => [storage.key(i), storage.getItem(storage.key(i))]));
+        return {local_storage: dump(window.localStorage), session_storage: dump(window.sessionStorage)};
+    """
+    RESTORE_STORAGE_SCRIPT = """
+        for (const [key, value] of Object.entries(arguments[0])) window.localStorage.setItem(key, value);
+        for (const [key, value] of Object.entries(arguments[1])) window.sessionStorage.setItem(key, value);
+    """
+
+    def __init__(self, path_to_session_file, secret):
+        """Initialize required variables"""
+        self.path_to_session_file = path_to_session_file
+        self.secret = secret
+
+    def is_available(self):
+        """Returns True if session encryption is supported (cryptography package is installed)"""
+        return Fernet is not None
+
+    def save(self, driver):
+        """Saves cookies and web storage of the page currently loaded in given driver"""
+        session = driver.execute_script(self.DUMP_STORAGE_SCRIPT)
+        session["cookies"] = driver.get_cookies()
+        salt = os.urandom(self.SALT_SIZE)
+        token = self._get_fernet(salt).encrypt(json.dumps(session).encode())
+        # write session file atomically, readable only by current user
+        temp_path = self.path_to_session_file + '.tmp'
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+            f.write(salt + token)
+        os.replace(temp_path, self.path_to_session_file)
+
+    def load(self):
+        """Returns saved session, or None if no session is saved or it could not be decrypted"""
+        if not os.path.exists(self.path_to_session_file):
+            return None
+        with open(self.path_to_session_file, 'rb') as f:
+            data = f.read()
+        try:
+            return json.loads(self._get_fernet(data[:self.SALT_SIZE]).decrypt(data[self.SALT_SIZE:]))
+        except (InvalidToken, ValueError):
+            return None
+
+    def restore(self, driver, origin_url):
+        """Restores saved session into given driver. 'origin_url' should be a lightweight page on the site's origin
+        (cookies and web storage can only be set for the currently loaded origin).
+        Returns True if a saved session was restored, False otherwise."""
+        session = self.load()
+        if session is None:
+            return False
+        driver.get(origin_url)
+        for cookie in session["cookies"]:
+            cookie = {field: cookie[field] for field in self.COOKIE_FIELDS if field in cookie}
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            driver.add_cookie(cookie)
+        driver.execute_script(self.RESTORE_STORAGE_SCRIPT, session["local_storage"], session["session_storage"])
+        return True
+
+    def clear(self):
+        """Deletes saved session"""
+        if os.path.exists(self.path_to_session_file):
+            os.remove(self.path_to_session_file)
+
+    def _get_fernet(self, salt):
+        """Returns cipher keyed with key derived from secret and given salt"""
+        key = hashlib.pbkdf2_hmac('sha256', self.secret.encode(), salt, self.KEY_DERIVATION_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(key))
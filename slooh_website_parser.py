@@ -1,6 +1,15 @@
-from selenium import webdriver
 from selenium.webdriver.common.action_chains import ActionChains
 from datetime import datetime
+from page_waiter import PageWaiter
+from search_tree_extractor import extract_grandparent_tree
+from search_crawl_pool import SearchCrawlPool
+from session_store import SessionStore
+from driver_factory import DriverFactory
+from page_archive import PageArchive
+from crawl_checkpoint import CrawlCheckpoint
+from data_lock import data_lock
+from collections import Counter
+from ephemeris import parse_coordinates
 import time
 import logging
 import os
@@ -10,11 +19,17 @@ import getpass
 
 username = getpass.getuser()
 
+# object info fields written by the catalog crawl (other fields, e.g. coordinates, are written by other stages)
+CRAWLED_OBJECT_INFO_FIELDS = ("object_url", "parent", "grandparent")
+
 class SloohWebsiteParser():
     """Class that contains methods to handle https://slooh.com/ parsing using selenium"""
 
-    def __init__(self, email, password, chrome_driver_path):
-        """Initialize required variables"""        
+    def __init__(self, email, password, chrome_driver_path, catalog_store = None, crawl_workers = 1, session_file = None, driver = None,
+                 driver_factory = None, delta_feed = None):
+        """Initialize required variables. If 'driver' is given (e.g. a replay driver), it is used instead of creating one.
+        Drivers are created by 'driver_factory' (default headless, resource light browser profile).
+        If 'delta_feed' is given, objects added/modified by catalog crawls are appended to it."""
         # code to setup logging obj
         self.logger = logging.getLogger("SloohWebsiteParser")
         self.logger.setLevel(level=logging.DEBUG)
@@ -28,45 +43,92 @@ class SloohWebsiteParser():
         fileh.setFormatter(formatter)
         self.logger.addHandler(fileh)
 
-        # create selenium driver obj
-        self.driver = webdriver.Chrome(executable_path = chrome_driver_path)
+        # create selenium driver obj (unless one is given)
+        self.driver_factory = driver_factory if driver_factory is not None else DriverFactory(chrome_driver_path)
+        self.driver = driver if driver is not None else self._create_driver(chrome_driver_path)
         
         # set required variables
+        self.json_object_info_filepath = 'slooh_object_info.json'
+        # raw photo roll pages are stored in a content addressed archive (legacy raw info file is imported into it on first use)
+        self.photo_roll_archive_path = 'photo_roll_archive'
+        self.photo_roll_raw_info_filepath = 'photo_roll_info.txt'
         self.login_url = "https://slooh.com/guestDashboard"
+        self.session_origin_url = "https://slooh.com/robots.txt"
         self.new_dashboard_url = "https://slooh.com/newDashboard"
         self.is_logged_in = False
         self.email = email
         self.password = password
         self.DEFAULT_DRIVER_SLEEP = 0.5
+        # maximum time (in seconds) to wait for each page to become ready
+        self.PAGE_TIMEOUTS = {
+            "dashboard": 30,
+            "login_form": 10,
+            "login": 30,
+            "session_check": 15,
+            "menu": 5,
+            "search": 15,
+            "photo_roll": 60,
+            "photo_roll_page": 15,
+            "missions": 60,
+            "mission_cards": 15,
+            "mission_booking": 15,
+            "mission_quota": 30,
+            "object_page": 15,
+        }
+        # waiter used to wait for page readiness conditions
+        self.waiter = PageWaiter(self.logger)
+        # optional SQLite catalog store, object info json file is exported from it when objects are added/modified
+        self.catalog_store = catalog_store
+        # optional append-only log of objects added/modified
+        self.delta_feed = delta_feed
+        # pages crawled and objects added/modified so far (read by instrumentation to derive per stage rates)
+        self.counts = Counter()
+        # number of headless drivers used to crawl search window in parallel
+        self.chrome_driver_path = chrome_driver_path
+        self.crawl_workers = crawl_workers
+        # optional store used to persist authenticated session across runs (encrypted using account password)
+        self.session_store = None
+        if session_file is not None:
+            self.session_store = SessionStore(session_file, password)
+            if not self.session_store.is_available():
+                self.logger.debug("Session persistence disabled as 'cryptography' package is not installed.")
+                self.session_store = None
+
+    def _create_driver(self, chrome_driver_path):
+        """Create selenium driver obj used for parsing"""
+        return self.driver_factory.create_driver(cache_subdir = "parser")
 
     def login(self):
         """Try to login into slooh website. Return True if login is successful, False otherwise."""
         # if already logged in, return True
         if(self.is_logged_in):
             return True
+        # else if a persisted session is still valid, reuse it
+        if(self.session_store is not None and self._restore_session()):
+            return True
         # else if not already logged in, try to login
         try:
             #load slooh website
             self.logger.debug("Trying to load slooh")
             self.driver.get(self.login_url)
-            time.sleep(12)
-
+            self.waiter.wait_for_class(self.driver, "guest dashboard", "button-list", self.PAGE_TIMEOUTS["dashboard"], min_count = 2)
             
             #click sign-in btn
             self.driver.find_elements_by_class_name("button-list")[1].click()
-            time.sleep(1)
+            self.waiter.wait_for_name(self.driver, "login form", "username", self.PAGE_TIMEOUTS["login_form"])
 
             #login
             self.logger.debug("Trying to login to slooh")
             self.driver.find_element_by_name("username").send_keys(self.email)
             self.driver.find_element_by_name("pwd").send_keys(self.password)
             self.driver.find_elements_by_xpath("//form//button")[0].click()
-            time.sleep(15)
+            self.waiter.wait_for_class(self.driver, "profile card", "profile-card-main", self.PAGE_TIMEOUTS["login"])
             
             # profile-card is found, return True as login is successful
             if(self.driver.find_element_by_class_name("profile-card-main")):
                 self.logger.debug("Login success")
                 self.is_logged_in = True
+                self.save_session()
                 return True
             # else if profile-card is not found, raise exception as login is failed
             else:
@@ -83,16 +145,20 @@ class SloohWebsiteParser():
                 # load homepage
                 self.logger.debug("Trying to logout")
                 self.driver.get(self.new_dashboard_url)
-                time.sleep(12)
+                self.waiter.wait_for_class(self.driver, "dashboard", "right-menu", self.PAGE_TIMEOUTS["dashboard"])
                 
                 # click on right-menu 
                 right_menu_btns = self.driver.find_element_by_class_name("right-menu").find_elements_by_tag_name("button")
                 right_menu_btns[-1].click()
-                time.sleep(self.DEFAULT_DRIVER_SLEEP)
+                self.waiter.wait_for_class(self.driver, "right menu", "open", self.PAGE_TIMEOUTS["menu"])
                 
                 # click on logout
                 menu_items = self.driver.find_element_by_class_name("open").find_elements_by_class_name("primary-button")
                 menu_items[-1].click()
+                self.is_logged_in = False
+                # persisted session is no longer valid after logout
+                if(self.session_store is not None):
+                    self.session_store.clear()
                 
                 # TODO : Validate logout
                 self.logger.debug("Logout successful")
@@ -104,135 +170,359 @@ class SloohWebsiteParser():
             self.logger.debug(f"Logout failed - {str(err)}")
             return False
         
-    def search_parser(self):
-        """Parses object info from search option in website. 
-        Return boolean indicating whether parsing is successful or not."""
-        json_object_info_filepath = 'slooh_object_info.json'
+    def _restore_session(self):
+        """Try to restore persisted session and validate it by loading dashboard. Return True if session is valid, False otherwise."""
         try:
-            # load homepage
-            self.logger.debug("Trying to extract object info from search option")
+            if(not self.session_store.restore(self.driver, self.session_origin_url)):
+                return False
+            # session is valid if profile card appears on dashboard
             self.driver.get(self.new_dashboard_url)
-            time.sleep(12)
-            
-            # click on search icon
-            self.driver.find_element_by_class_name("icon-search").click()
-            time.sleep(3)
-            
-            json_data = {}
+            if(self.waiter.wait_for_class(self.driver, "profile card", "profile-card-main", self.PAGE_TIMEOUTS["session_check"])):
+                self.logger.debug("Restored persisted session")
+                self.is_logged_in = True
+                return True
+            self.logger.debug("Persisted session has expired")
+            self.driver.delete_all_cookies()
+        except Exception as err:
+            self.logger.debug(f"Restoring persisted session failed - {str(err)}")
+        return False
+    
+    def save_session(self):
+        """Persist current authenticated session (if session persistence is enabled). Return True if session is saved, False otherwise."""
+        if(self.session_store is None or not self.is_logged_in):
+            return False
+        try:
+            self.session_store.save(self.driver)
+            return True
+        except Exception as err:
+            self.logger.debug(f"Saving session failed - {str(err)}")
+            return False
+        
+    def close(self):
+        """Close browser used for parsing"""
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+        
+    def log_wait_summary(self):
+        """Logs count, total duration and timeouts of page readiness waits done so far."""
+        for wait_name, (wait_count, total_elapsed, timeouts) in self.waiter.get_wait_summary().items():
+            self.logger.debug(f"Waited for {wait_name} {str(wait_count)} times - {total_elapsed:.1f}s in total, {str(timeouts)} timeouts.")
+        
+    def search_parser(self, script_extraction = True, resume = True, differential = False, max_fingerprint_age_days = 7):
+        """Parses object info from search option in website. 
+        If 'script_extraction' is True, each grand-parent is expanded and extracted using a single script call
+        (by a pool of 'crawl_workers' headless drivers, if more than one worker is configured),
+        else each parent/item is expanded and read using separate driver calls.
+        Progress is checkpointed after every grand-parent - if 'resume' is True, an earlier crawl which failed halfway is resumed.
+        If 'differential' is True (script extraction only), parents whose item count shown in their label hasn't changed since
+        they were crawled (within last 'max_fingerprint_age_days' days) are not expanded. Parents without a count are always expanded.
+        Return boolean indicating whether parsing is successful or not (False if any grand-parent could not be crawled -
+        its progress is kept, so that the next crawl resumes it)."""
+        crawl_checkpoint = CrawlCheckpoint(self.json_object_info_filepath, max_fingerprint_age_days)
+        known_fingerprints = crawl_checkpoint.get_known_fingerprints() if differential else None
+        try:
+            json_data = self._load_object_info()
             object_infos_modified = 0
             object_infos_added = 0
-            # load existing json data
-            if os.path.exists(json_object_info_filepath):
-                with open(json_object_info_filepath, 'r') as f:
-                    json_data = json.load(f)
+            missing_grandparents = []
             
-            # extract grand-parents in search window
-            grandparents = self.driver.find_elements_by_class_name("search-results-grandparent")    
-            grandparents_len = len(grandparents)
-            for i in range(grandparents_len):
-                elem = self.driver.find_elements_by_class_name("search-results-grandparent")[i]
-                grandparent_name = elem.text.strip()
-                # expand current grand-parent
-                elem.find_element_by_class_name("icon-plus").click()
-                # expand parents under current grand-parent                               
-                parents = self.driver.find_elements_by_class_name("search-results-parent")          
-                parents_len = len(parents)
-                for j in range(parents_len):
-                    # log debug info once for every 10 parent processing is done
-                    if(j % 10 == 0):
-                        self.logger.debug("Currently extracting grand-parent - " + str(i) + "/" + str(grandparents_len) + ", " +
-                                            "parent - " + str(j) + "/" + str(parents_len))
-                    try:
-                        # scroll to current parent
-                        self.driver.execute_script("arguments[0].scrollIntoView();", self.driver.find_elements_by_class_name("search-results-parent")[j])
-                        time.sleep(self.DEFAULT_DRIVER_SLEEP // 2)
-                        if "icon-plus" in self.driver.find_elements_by_class_name("search-results-parent")[j].get_attribute("innerHTML"):                
-                            elem = self.driver.find_elements_by_class_name("search-results-parent")[j]
-                            parent_name = elem.text.strip()
-                            # expand items under current parent
-                            elem.find_element_by_class_name("icon-plus").click()                    
-                            items = self.driver.find_elements_by_class_name("search-results-item")
-                            # for each item in items under cirrent parent
-                            for item in items:
-                                # scroll to current item
-                                self.driver.execute_script("arguments[0].scrollIntoView();", item)
-                                time.sleep(self.DEFAULT_DRIVER_SLEEP // 2)
-                                # extract object name
-                                object_name = item.text.strip()
-                                # if object name already exists in json data
-                                if object_name in json_data:
-                                    is_object_modified = False
-                                    # if current parent name is not present in the object info
-                                    if parent_name not in json_data[object_name]["parent"]:
-                                        # add parent name in object info
-                                        json_data[object_name]["parent"].append(parent_name)        
-                                        is_object_modified = True
-                                    # if current grand-parent name is not present in the object info
-                                    if grandparent_name not in json_data[object_name]["grandparent"]:
-                                        # add grand-parent name in object info
-                                        json_data[object_name]["grandparent"].append(grandparent_name)  
-                                        is_object_modified = True
-                                    # if parent/grandparent has been modified above, increment 'is_object_modified' counter
-                                    if(is_object_modified):
-                                        object_infos_modified += 1
-                                # else if object name does not exist in json data
-                                else:
-                                    # add new object to the json data along with object info
-                                    object_url = item.find_element_by_tag_name('a').get_attribute('href')
-                                    json_data[object_name] = {
-                                        "object_url": object_url,
-                                        "parent": [parent_name],
-                                        "grandparent": [grandparent_name],
-                                    }
-                                    # Increment 'object_infos_added' counter
-                                    object_infos_added += 1
-                            # minimize current parent
-                            self.driver.find_elements_by_class_name("search-results-parent")[j].find_element_by_class_name("icon-minus").click()
-                    except Exception as err:
-                        self.logger.debug(f"Unable to extract object info for grand-parent - {str(i)} & parent - {str(j)} : - {str(err)}")
-                # minimize current grand-parent        
-                self.driver.find_elements_by_class_name("search-results-grandparent")[i].find_element_by_class_name("icon-minus").click()
+            # if multiple crawl workers are configured, crawl grand-parents in parallel and merge them in search window order
+            if(script_extraction and self.crawl_workers > 1):
+                self.logger.debug("Trying to extract object info from search option using crawl pool")
+                search_crawl_pool = SearchCrawlPool(self.driver_factory, self.logger, workers = self.crawl_workers,
+                                                    dashboard_url = self.new_dashboard_url, page_timeout = self.PAGE_TIMEOUTS["dashboard"])
+                completed_grandparents = {}
+                grandparents_count = []
+                def start_crawl(grandparents_len):
+                    grandparents_count.append(grandparents_len)
+                    completed_grandparents.update(crawl_checkpoint.start(grandparents_len, resume))
+                    return completed_grandparents.keys()
+                grandparent_trees = search_crawl_pool.crawl(on_start = start_crawl, on_grandparent = crawl_checkpoint.add_grandparent,
+                                                            known_fingerprints = known_fingerprints)
+                for grandparent_tree in grandparent_trees.values():
+                    self._count_crawled_tree(grandparent_tree)
+                grandparent_trees.update(completed_grandparents)
+                # grand-parents which failed even after retries are left out by the crawl pool
+                missing_grandparents = [i for i in range(grandparents_count[0]) if i not in grandparent_trees]
+                for i in sorted(grandparent_trees):
+                    if grandparent_trees[i] is not None:
+                        objects_added, objects_modified = self._merge_grandparent_tree(json_data, grandparent_trees[i])
+                        object_infos_added += objects_added
+                        object_infos_modified += objects_modified
+            else:
+                # load homepage
+                self.logger.debug("Trying to extract object info from search option")
+                self.driver.get(self.new_dashboard_url)
+                self.waiter.wait_for_class(self.driver, "dashboard", "icon-search", self.PAGE_TIMEOUTS["dashboard"])
+                
+                # click on search icon
+                self.driver.find_element_by_class_name("icon-search").click()
+                self.waiter.wait_for_class(self.driver, "search results", "search-results-grandparent", self.PAGE_TIMEOUTS["search"])
+                
+                # extract grand-parents in search window
+                grandparents = self.driver.find_elements_by_class_name("search-results-grandparent")    
+                grandparents_len = len(grandparents)
+                completed_grandparents = crawl_checkpoint.start(grandparents_len, resume)
+                if(completed_grandparents):
+                    self.logger.debug(f"Resuming earlier crawl with {str(len(completed_grandparents))} grand-parents already crawled")
+                for i in range(grandparents_len):
+                    # grand-parents crawled by an earlier crawl are merged from checkpoint (or have already been saved)
+                    if i in completed_grandparents:
+                        objects_added, objects_modified = (0, 0) if completed_grandparents[i] is None else self._merge_grandparent_tree(json_data, completed_grandparents[i])
+                    elif(script_extraction):
+                        self.logger.debug("Currently extracting grand-parent - " + str(i) + "/" + str(grandparents_len))
+                        grandparent_tree = extract_grandparent_tree(self.driver, i, known_fingerprints = known_fingerprints)
+                        for error in grandparent_tree["errors"]:
+                            self.logger.debug(f"Unable to extract object info for grand-parent - {str(i)} & {error}")
+                        crawl_checkpoint.add_grandparent(i, grandparent_tree)
+                        self._count_crawled_tree(grandparent_tree)
+                        objects_added, objects_modified = self._merge_grandparent_tree(json_data, grandparent_tree)
+                    else:
+                        self.logger.debug("Currently extracting grand-parent - " + str(i) + "/" + str(grandparents_len))
+                        objects_added, objects_modified = self._extract_grandparent_with_clicks(json_data, i)
+                        self.counts["grandparents_crawled"] += 1
+                        # objects are merged directly, so they are saved before grand-parent is checkpointed
+                        if self.catalog_store is None:
+                            self._save_object_info(json_data, objects_added, objects_modified)
+                        else:
+                            self.catalog_store.commit()
+                        crawl_checkpoint.add_grandparent(i)
+                    object_infos_added += objects_added
+                    object_infos_modified += objects_modified
+                    # commit objects extracted under current grand-parent as a single batch (along with their deltas)
+                    if self.catalog_store is not None:
+                        self.catalog_store.commit()
+                        if self.delta_feed is not None:
+                            self.delta_feed.commit()
             
             # save updted json data to file
-            with open(json_object_info_filepath, 'w') as f:
-                json.dump(json_data, f, indent = 4)
+            self._save_object_info(json_data, object_infos_added, object_infos_modified)
+            self.counts["objects_added"] += object_infos_added
+            self.counts["objects_modified"] += object_infos_modified
+            # keep progress if any grand-parent is missing, so that the next crawl resumes it
+            if(missing_grandparents):
+                crawl_checkpoint.close()
+                self.logger.debug(f"Object extraction incomplete. {str(object_infos_added)} new objects found. {str(object_infos_modified)} objects modified. "
+                                  f"Grand-parents {', '.join(str(i) for i in missing_grandparents)} could not be crawled.")
+                return False
+            crawl_checkpoint.finish()
             self.logger.debug(f"Object extraction complete. {str(object_infos_added)} new objects found. {str(object_infos_modified)} objects modified.")
             return True
         except Exception as err:
+            crawl_checkpoint.close()
+            if self.delta_feed is not None:
+                self.delta_feed.discard()
             self.logger.debug(f"Object extraction failed - {str(err)}")
             return False
+    
+    def _load_object_info(self):
+        """Returns existing object info json data (empty if catalog store is used, as objects are merged into the store)"""
+        json_data = {}
+        if self.catalog_store is None and os.path.exists(self.json_object_info_filepath):
+            with open(self.json_object_info_filepath, 'r') as f:
+                json_data = json.load(f)
+        return json_data
+    
+    def _save_object_info(self, json_data, object_infos_added, object_infos_modified):
+        """Saves object info json data to file (exported from catalog store only if any object was added/modified).
+        Object info is locked while it is saved - fields/objects written to the file by other stages since it was loaded are kept.
+        Object changes merged so far are then appended to delta feed (if used)."""
+        with data_lock(self.json_object_info_filepath):
+            if self.catalog_store is None:
+                self._merge_saved_object_info(json_data)
+                temp_path = self.json_object_info_filepath + '.tmp'
+                with open(temp_path, 'w') as f:
+                    json.dump(json_data, f, indent = 4)
+                os.replace(temp_path, self.json_object_info_filepath)
+            else:
+                self.catalog_store.commit()
+                if(object_infos_added or object_infos_modified or not os.path.exists(self.json_object_info_filepath)):
+                    self.catalog_store.export_object_info(self.json_object_info_filepath)
+        if self.delta_feed is not None:
+            self.delta_feed.commit()
+    
+    def _merge_saved_object_info(self, json_data):
+        """Merges object info currently saved in file into json data - fields not written by the crawl are taken from the file,
+        as are objects missing from json data."""
+        saved_json_data = self._load_object_info()
+        for object_name, saved_info in saved_json_data.items():
+            if object_name not in json_data:
+                json_data[object_name] = saved_info
+                continue
+            for field, value in saved_info.items():
+                if field not in CRAWLED_OBJECT_INFO_FIELDS:
+                    json_data[object_name][field] = value
+
+    def _count_crawled_tree(self, grandparent_tree):
+        """Counts grand-parent and parents crawled in given grand-parent tree (None if grand-parent could not be crawled)"""
+        if grandparent_tree is None:
+            return
+        self.counts["grandparents_crawled"] += 1
+        for parent in grandparent_tree["parents"]:
+            self.counts["parents_skipped" if parent.get("skipped") else "parents_crawled"] += 1
+
+    def _merge_grandparent_tree(self, json_data, grandparent_tree):
+        """Merges objects in grand-parent -> parent -> item structure (see 'extract_grandparent_tree') into json data.
+        Returns (objects added, objects modified)."""
+        objects_added = objects_modified = 0
+        skipped_parents_count = sum(1 for parent in grandparent_tree["parents"] if parent.get("skipped"))
+        if(skipped_parents_count):
+            self.logger.debug(f"{str(skipped_parents_count)} unchanged parents skipped under grand-parent - {grandparent_tree['name']}")
+        for parent in grandparent_tree["parents"]:
+            for item in parent["items"]:
+                merge_status = self._merge_object_info(json_data, item["name"], parent["name"], grandparent_tree["name"], lambda: item["href"])
+                if(merge_status == "added"):
+                    objects_added += 1
+                elif(merge_status == "modified"):
+                    objects_modified += 1
+        return objects_added, objects_modified
+    
+    def _extract_grandparent_with_clicks(self, json_data, i):
+        """Expands grand-parent at given index in search window and merges objects under it into json data,
+        expanding/reading each parent and item using separate driver calls.
+        Returns (objects added, objects modified)."""
+        object_infos_modified = 0
+        object_infos_added = 0
+        elem = self.driver.find_elements_by_class_name("search-results-grandparent")[i]
+        grandparent_name = elem.text.strip()
+        # expand current grand-parent
+        elem.find_element_by_class_name("icon-plus").click()
+        # expand parents under current grand-parent                               
+        parents = self.driver.find_elements_by_class_name("search-results-parent")          
+        parents_len = len(parents)
+        for j in range(parents_len):
+            # log debug info once for every 10 parent processing is done
+            if(j % 10 == 0):
+                self.logger.debug("Currently extracting grand-parent - " + str(i) + ", " +
+                                    "parent - " + str(j) + "/" + str(parents_len))
+            try:
+                # scroll to current parent
+                self.driver.execute_script("arguments[0].scrollIntoView();", self.driver.find_elements_by_class_name("search-results-parent")[j])
+                time.sleep(self.DEFAULT_DRIVER_SLEEP // 2)
+                if "icon-plus" in self.driver.find_elements_by_class_name("search-results-parent")[j].get_attribute("innerHTML"):                
+                    elem = self.driver.find_elements_by_class_name("search-results-parent")[j]
+                    parent_name = elem.text.strip()
+                    self.counts["parents_crawled"] += 1
+                    # expand items under current parent
+                    elem.find_element_by_class_name("icon-plus").click()                    
+                    items = self.driver.find_elements_by_class_name("search-results-item")
+                    # for each item in items under cirrent parent
+                    for item in items:
+                        # scroll to current item
+                        self.driver.execute_script("arguments[0].scrollIntoView();", item)
+                        time.sleep(self.DEFAULT_DRIVER_SLEEP // 2)
+                        # extract object name
+                        object_name = item.text.strip()
+                        # merge object into json data (object url is extracted only for new objects)
+                        merge_status = self._merge_object_info(json_data, object_name, parent_name, grandparent_name,
+                                                               lambda: item.find_element_by_tag_name('a').get_attribute('href'))
+                        if(merge_status == "added"):
+                            object_infos_added += 1
+                        elif(merge_status == "modified"):
+                            object_infos_modified += 1
+                    # minimize current parent
+                    self.driver.find_elements_by_class_name("search-results-parent")[j].find_element_by_class_name("icon-minus").click()
+            except Exception as err:
+                self.logger.debug(f"Unable to extract object info for grand-parent - {str(i)} & parent - {str(j)} : - {str(err)}")
+        # minimize current grand-parent        
+        self.driver.find_elements_by_class_name("search-results-grandparent")[i].find_element_by_class_name("icon-minus").click()
+        return object_infos_added, object_infos_modified
+            
+    def _merge_object_info(self, json_data, object_name, parent_name, grandparent_name, get_object_url):
+        """Merges object found under given parent/grandparent into json data (or catalog store, if used).
+        'get_object_url' is called to extract object url only if object is new.
+        Returns 'added' if object is new, 'modified' if parent/grandparent were added to existing object, None otherwise.
+        Added/modified objects are recorded in delta feed (if used)."""
+        object_url = None
+        if self.catalog_store is not None:
+            if self.catalog_store.has_object(object_name):
+                merge_status = self.catalog_store.upsert_object(object_name, None, parent_name, grandparent_name)
+            else:
+                object_url = get_object_url()
+                merge_status = self.catalog_store.upsert_object(object_name, object_url, parent_name, grandparent_name)
+        else:
+            merge_status = self._merge_object_info_into_json(json_data, object_name, parent_name, grandparent_name, get_object_url)
+            object_url = json_data[object_name]["object_url"] if merge_status == "added" else None
+        if merge_status is not None and self.delta_feed is not None:
+            object_delta = {"parent": parent_name, "grandparent": grandparent_name}
+            if object_url is not None:
+                object_delta["object_url"] = object_url
+            self.delta_feed.add("object", merge_status, object_name, object_delta)
+        return merge_status
+
+    def _merge_object_info_into_json(self, json_data, object_name, parent_name, grandparent_name, get_object_url):
+        """Merges object found under given parent/grandparent into json data. Returns merge status (see '_merge_object_info')."""
+        # if object name already exists in json data
+        if object_name in json_data:
+            is_object_modified = False
+            # if current parent name is not present in the object info
+            if parent_name not in json_data[object_name]["parent"]:
+                # add parent name in object info
+                json_data[object_name]["parent"].append(parent_name)        
+                is_object_modified = True
+            # if current grand-parent name is not present in the object info
+            if grandparent_name not in json_data[object_name]["grandparent"]:
+                # add grand-parent name in object info
+                json_data[object_name]["grandparent"].append(grandparent_name)  
+                is_object_modified = True
+            # if parent/grandparent has been modified above, return 'modified'
+            return "modified" if is_object_modified else None
+        # else if object name does not exist in json data
+        else:
+            # add new object to the json data along with object info
+            json_data[object_name] = {
+                "object_url": get_object_url(),
+                "parent": [parent_name],
+                "grandparent": [grandparent_name],
+            }
+            return "added"
             
-    def photo_roll_parser(self):
+    def photo_roll_parser(self, known_photo_urls = None, full_recrawl = False):
         """Parses photos info from photo roll page. 
+        If 'known_photo_urls' is given, parsing stops at the first page which contains only known photos
+        (photo roll is ordered newest first), unless 'full_recrawl' is True.
         Returns boolean indicating whether parsing is successful or not."""
         # if login is successful, proceed to parse photo roll
         if(self.login()):
+            # page archive is opened once the photo roll has loaded
+            page_archive = None
             try:
                 # load phot roll page
                 self.logger.debug("Trying to parse photo roll")
                 self.driver.get("https://slooh.com/my-pictures/photo-roll")
-                time.sleep(30)
+                self.waiter.wait_for_class(self.driver, "photo roll", "next", self.PAGE_TIMEOUTS["photo_roll"])
                 
                 # extract next btn element
                 next_elem = self.driver.find_element_by_class_name("next")
                 page = 1
                 retry_count = 0
                 
-                # open output file for writing
-                f = open('photo_roll_info.txt', 'a')
+                # open page archive for writing
+                page_archive = PageArchive(self.photo_roll_archive_path, self.photo_roll_raw_info_filepath)
                 while "active" in next_elem.get_attribute('class'):
                     try:
                         # log current page info once every 20 pages
                         if(page % 20 == 1):
                             self.logger.debug("Parsing page - " + str(page))
                         
-                        # write raw photos info from current page in html format to the output file
-                        f.write(self.driver.find_elements_by_class_name("undefined")[-1].get_attribute("innerHTML") + '\n')
-                        time.sleep(self.DEFAULT_DRIVER_SLEEP)
+                        page_elem = self.driver.find_elements_by_class_name("undefined")[-1]
+                        # stop once a page with only already ingested photos is reached
+                        if(known_photo_urls and not full_recrawl):
+                            page_photo_urls = self._extract_page_photo_urls(page_elem)
+                            if(page_photo_urls and all(url in known_photo_urls for url in page_photo_urls)):
+                                self.logger.debug(f"Page - {str(page)} contains only known photos. Stopping photo roll parsing.")
+                                break
+                        # archive raw photos info from current page in html format (stored once if the same page was captured before)
+                        page_html = page_elem.get_attribute("innerHTML")
+                        page_archive.add_page(page_html)
+                        self.counts["photo_roll_pages_crawled"] += 1
                         
-                        # go to next page
+                        # go to next page and wait till its photos replace the current ones
                         next_elem.click()
-                        time.sleep(self.DEFAULT_DRIVER_SLEEP * 8)
+                        self.waiter.wait_until("photo roll page",
+                                               lambda: self.driver.find_elements_by_class_name("undefined")[-1].get_attribute("innerHTML") != page_html,
+                                               self.PAGE_TIMEOUTS["photo_roll_page"])
                         # extract next btn element from next page
                         next_elem = self.driver.find_element_by_class_name("next")
                         page += 1
@@ -240,11 +530,11 @@ class SloohWebsiteParser():
                         # if more than 5 excpetions occur during photo roll parsing, raise an excpetion and abort
                         if(retry_count == 5):
                             raise Exception("Photo roll parsing failed even after 5 tries!!")
-                        # else, increment retry count and wait for 30s before trying again
+                        # else, increment retry count and wait for next btn before trying again
                         retry_count += 1
                         self.logger.debug("Excpetion during photo roll parsing. Retrying again.. (Retry count - " + str(retry_count) + ").")
-                        time.sleep(30)
-                        # currently assuming next element always appears after 30s wait.. need to handle scenario (albeit rare) where it doesn't appear
+                        self.waiter.wait_for_class(self.driver, "photo roll", "next", self.PAGE_TIMEOUTS["photo_roll"])
+                        # if next btn doesn't appear even after the wait, below raises an exception and parsing is aborted
                         next_elem = self.driver.find_element_by_class_name("next")
                         page += 1
                 self.logger.debug("Photo roll parsing complete.")
@@ -252,86 +542,138 @@ class SloohWebsiteParser():
             except Exception as err:
                 self.logger.debug(f"Photo roll parsing failed - {str(err)}")
                 return False
-            # close the output file finally
+            # close the page archive (if opened) finally
             finally:
-                f.close()
+                if page_archive is not None:
+                    page_archive.close()
         # else if login fails, return False
         else:
             self.logger.debug("Not logged in before parsing photo roll.")
             return False
     
+    def _extract_page_photo_urls(self, page_elem):
+        """Returns list of photo urls in given photo roll page element."""
+        # read style attribute of photo link of every list item with a heading in a single call
+        photo_styles = self.driver.execute_script(
+            "return Array.from(arguments[0].querySelectorAll('li'))"
+            ".filter(li => li.querySelector('h3') && li.querySelector('a'))"
+            ".map(li => li.querySelector('a').getAttribute('style') || '');", page_elem)
+        photo_urls = []
+        for photo_style in photo_styles:
+            photo_url = re.search('(http.*)\"', photo_style)
+            if(photo_url):
+                photo_urls.append(photo_url.group(1))
+        return photo_urls
+    
     def reserve_mission_using_object_url(self, object_url):
-        """Parses photos info from photo roll page. 
-        Returns boolean indicating whether parsing is successful or not."""
+        """Reserves mission (where object altitude is the highest) for object with given url.
+        Returns (boolean indicating whether mission booking is successful or not, active missions count)."""
         # if login is successful, proceed to reseve mission using given object url
         if(self.login()):
             # load mission page using given object url
             self.logger.debug(f"Trying to book mission using {object_url}")
-            mission_url = object_url + "/missions"
-            active_missions = 0
-            self.driver.get(mission_url)
-            time.sleep(30)
-            
-            # if no redirects happen i.e. mission url is loaded successfully
-            if(self.driver.current_url == mission_url):
-                # extract active missions
-                active_missions_text = self.driver.find_element_by_class_name("title-bg").find_element_by_tag_name('h2').text
-                active_missions = int(re.search('\d+', active_missions_text).group())
-                # if active missions are 5 or more, return 'False' (mission booking failed) and active missions count
-                if(active_missions >= 5):
-                    return False, active_missions
-                
-                # if active missions are less than five, proceed to book mission
-                try:
-                    # extract divs corresponding to all avaialbel missions
-                    missions_available = self.driver.find_elements_by_class_name("mission-card-container")
-                    mission_to_choose = max_altitude =  0
-                    # try to extract missions where object altitude is at the highest
-                    try:
-                        for mission in range(len(missions_available)):
-                            mission_descs = missions_available[mission].find_elements_by_class_name("details-text")
-                            for desc in mission_descs:
-                                desc_text = desc.text
-                                if "Altitude" in desc_text:
-                                    object_altitude = int(re.search(r'\d+', desc_text))
-                                    if object_altitude > max_altitude:
-                                        max_altitude = object_altitude
-                                        mission_to_choose = mission
-                    # if mission where object altitude is maximum could not be found, choose first available mission
-                    except Exception as err:
-                        mission_to_choose = 0
-                        self.logger.debug(f"Unable to extract object altitudes - {str(err)}. Choosing first available mission.")
-                    
-                    # reserve the above selected mission for given object
-                    missions_available[mission_to_choose].find_element_by_tag_name("button").click()
-                    time.sleep(10)
-                    self.driver.find_element_by_class_name("featured-objects-modal").find_element_by_tag_name("button").click()
-                    time.sleep(10)
-                    # if mission booking is not successfult, return False (mission booking failed) and active missions count
-                    if "Congratulations" not in self.driver.find_element_by_class_name("my-5").text:
-                        return False, active_missions
-                    else:
-                        self.logger.debug(f"Mission booked successfully for object url - {object_url}.")
-                except:
-                    return False, active_missions
-            # if mission url is not loaded correctly, return False (mission booking failed) and active missions count using 'get_active_missions'
-            else:
-                return False, self.get_active_missions_count()
-
-            # Assume everything went well and return True (mission booking successfult) and active missions count incremented by 1
-            return True, active_missions + 1
+            self.driver.get(self.get_mission_url(object_url))
+            return self._reserve_mission_on_loaded_page(object_url)
         # else if login fails, return False (mission boooking failed) and -1 (active missions count)
         else:
             self.logger.debug("Not logged in before trying to book mission.")
             return False, -1
+    
+    def extract_objects_coordinates(self, object_urls):
+        """Extracts coordinates shown in object pages of objects with given urls.
+        Returns dict of object url to (right ascension, declination) in degrees for every object tried (None if coordinates
+        could not be found, so that the lookup can be recorded and not repeated every run)."""
+        object_coordinates = {}
+        for object_url in object_urls:
+            object_coordinates[object_url] = None
+            try:
+                object_coordinates[object_url] = self.get_object_coordinates(object_url)
+                if(object_coordinates[object_url] is None):
+                    self.logger.debug(f"Coordinates not found for object url - {object_url}")
+            except Exception as err:
+                self.logger.debug(f"Coordinates extraction failed for object url - {object_url} - {str(err)}")
+        return object_coordinates
+    
+    def get_object_coordinates(self, object_url):
+        """Returns (right ascension, declination) in degrees shown in object page with given url (None if not found)"""
+        self.driver.get(object_url)
+        self.waiter.wait_until("object page", lambda: parse_coordinates(self.driver.find_element_by_tag_name("body").text),
+                               self.PAGE_TIMEOUTS["object_page"])
+        return parse_coordinates(self.driver.find_element_by_tag_name("body").text)
+    
+    def get_mission_url(self, object_url):
+        """Returns url of missions page of object with given url"""
+        return object_url + "/missions"
+    
+    def _reserve_mission_on_loaded_page(self, object_url):
+        """Reserves mission for given object using its missions page already loaded (or loading) in the current window.
+        Returns (boolean indicating whether mission booking is successful or not, active missions count)."""
+        mission_url = self.get_mission_url(object_url)
+        active_missions = 0
+        # wait till either missions page header is loaded or a redirect happens
+        self.waiter.wait_until("missions page",
+                               lambda: self.driver.current_url != mission_url or self.driver.find_elements_by_class_name("title-bg"),
+                               self.PAGE_TIMEOUTS["missions"])
         
+        # if no redirects happen i.e. mission url is loaded successfully
+        if(self.driver.current_url == mission_url):
+            # extract active missions
+            active_missions_text = self.driver.find_element_by_class_name("title-bg").find_element_by_tag_name('h2').text
+            active_missions = int(re.search('\d+', active_missions_text).group())
+            # if active missions are 5 or more, return 'False' (mission booking failed) and active missions count
+            if(active_missions >= 5):
+                return False, active_missions
+            
+            # if active missions are less than five, proceed to book mission
+            try:
+                # extract divs corresponding to all avaialbel missions
+                self.waiter.wait_for_class(self.driver, "mission cards", "mission-card-container", self.PAGE_TIMEOUTS["mission_cards"])
+                missions_available = self.driver.find_elements_by_class_name("mission-card-container")
+                mission_to_choose = max_altitude =  0
+                # try to extract missions where object altitude is at the highest
+                try:
+                    for mission in range(len(missions_available)):
+                        mission_descs = missions_available[mission].find_elements_by_class_name("details-text")
+                        for desc in mission_descs:
+                            desc_text = desc.text
+                            if "Altitude" in desc_text:
+                                object_altitude = int(re.search(r'\d+', desc_text).group())
+                                if object_altitude > max_altitude:
+                                    max_altitude = object_altitude
+                                    mission_to_choose = mission
+                # if mission where object altitude is maximum could not be found, choose first available mission
+                except Exception as err:
+                    mission_to_choose = 0
+                    self.logger.debug(f"Unable to extract object altitudes - {str(err)}. Choosing first available mission.")
+                
+                # reserve the above selected mission for given object
+                missions_available[mission_to_choose].find_element_by_tag_name("button").click()
+                self.waiter.wait_for_class(self.driver, "booking modal", "featured-objects-modal", self.PAGE_TIMEOUTS["mission_booking"])
+                self.driver.find_element_by_class_name("featured-objects-modal").find_element_by_tag_name("button").click()
+                self.waiter.wait_until("booking confirmation",
+                                       lambda: any("Congratulations" in elem.text for elem in self.driver.find_elements_by_class_name("my-5")),
+                                       self.PAGE_TIMEOUTS["mission_booking"])
+                # if mission booking is not successfult, return False (mission booking failed) and active missions count
+                if "Congratulations" not in self.driver.find_element_by_class_name("my-5").text:
+                    return False, active_missions
+                else:
+                    self.logger.debug(f"Mission booked successfully for object url - {object_url}.")
+            except:
+                return False, active_missions
+        # if mission url is not loaded correctly, return False (mission booking failed) and active missions count using 'get_active_missions'
+        else:
+            return False, self.get_active_missions_count()
+
+        # Assume everything went well and return True (mission booking successfult) and active missions count incremented by 1
+        return True, active_missions + 1
+    
     def get_active_missions_count(self):
         # if login is successful, proceed to extract active missions count
         if(self.login()):
             try:
                 # load slooh1000 page where active missions count is available
                 self.driver.get("https://slooh.com/missions/bySlooh1000")
-                time.sleep(10)
+                self.waiter.wait_for_class(self.driver, "mission quota", "mission-quota-text", self.PAGE_TIMEOUTS["mission_quota"])
                 
                 # extract and return active missions count
                 mission_quota = self.driver.find_element_by_class_name("mission-quota-text").text
@@ -0,0 +1,12 @@
+import os
+import sys
+import pytest
+
+# modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(autouse = True)
+def work_dir(tmp_path, monkeypatch):
+    """Run every test in an empty directory, as parsers/utilities write their logs and data files to the working directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
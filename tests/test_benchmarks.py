@@ -0,0 +1,23 @@
+from benchmarks.run import parse_photo_roll_archive_incremental_scenario, parse_photo_roll_incremental_scenario
+import hashlib
+import os
+import pytest
+
+def snapshot_state():
+    """Hashes of every file in the working directory (benchmark output and backups included)"""
+    state = {}
+    for dir_path, _, file_names in os.walk('.'):
+        for file_name in file_names:
+            if not file_name.endswith('.log'):
+                with open(os.path.join(dir_path, file_name), 'rb') as f:
+                    state[os.path.join(dir_path, file_name)] = hashlib.sha256(f.read()).hexdigest()
+    return state
+
+@pytest.mark.parametrize("create_run", [parse_photo_roll_incremental_scenario, parse_photo_roll_archive_incremental_scenario])
+def test_incremental_scenarios_repeat_the_same_work(create_run):
+    run = create_run(200)
+    state = snapshot_state()
+    # every repeat starts from (and restores) the same raw photo roll, photos info and checkpoint
+    for _ in range(3):
+        run()
+        assert snapshot_state() == state
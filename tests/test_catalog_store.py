@@ -0,0 +1,14 @@
+from catalog_store import CatalogStore
+
+def create_photo_info(photo_url):
+    return {"photo_url": photo_url, "photo_desc": ["Captured by slooh"]}
+
+def test_photo_already_stored_under_another_object_adds_nothing():
+    catalog_store = CatalogStore('catalog.db')
+    assert catalog_store.add_photo("Messier 31", ["Messier 31", "M31"], create_photo_info("https://slooh.com/photo/1")) == (1, 1)
+    assert catalog_store.add_photo("Andromeda Galaxy", ["Andromeda Galaxy"], create_photo_info("https://slooh.com/photo/1")) == (0, 0)
+    assert catalog_store.add_photo("Messier 31", ["Messier 31", "M31"], create_photo_info("https://slooh.com/photo/1")) == (0, 0)
+    assert catalog_store.add_photo("Messier 31", ["Messier 31", "M31"], create_photo_info("https://slooh.com/photo/2")) == (0, 1)
+    assert catalog_store.get_photos_info() == {"Messier 31": {"object_names": ["Messier 31", "M31"], "photos": [
+        create_photo_info("https://slooh.com/photo/1"), create_photo_info("https://slooh.com/photo/2")]}}
+    catalog_store.close()
@@ -0,0 +1,43 @@
+from catalog_store import CatalogStore
+from utilities import Utilities
+from datetime import datetime, timedelta
+import json
+
+NOW = datetime(2026, 1, 15, 10, 0, 0)
+
+def write_object_info():
+    with open('slooh_object_info.json', 'w') as f:
+        json.dump({name: {"object_url": f"https://slooh.com/{name}", "parent": ["Galaxies"], "grandparent": ["Deep Sky"]}
+                   for name in ("M31", "M33", "M51")}, f)
+
+def test_failed_lookups_are_skipped_till_they_are_stale():
+    write_object_info()
+    util_obj = Utilities()
+    util_obj.update_object_coordinates('slooh_object_info.json', {"https://slooh.com/M31": (10.68, 41.27), "https://slooh.com/M33": None},
+                                       now = NOW)
+    assert util_obj.extract_object_coordinates('slooh_object_info.json') == {"https://slooh.com/M31": (10.68, 41.27)}
+    assert util_obj.extract_urls_with_failed_coordinate_lookups('slooh_object_info.json', 7, now = NOW + timedelta(days = 6)) == {"https://slooh.com/M33"}
+    assert util_obj.extract_urls_with_failed_coordinate_lookups('slooh_object_info.json', 7, now = NOW + timedelta(days = 8)) == set()
+
+    # a later successful lookup replaces the failure
+    util_obj.update_object_coordinates('slooh_object_info.json', {"https://slooh.com/M33": (23.46, 30.66)}, now = NOW + timedelta(days = 8))
+    with open('slooh_object_info.json', 'r') as f:
+        assert json.load(f)["M33"] == {"object_url": "https://slooh.com/M33", "parent": ["Galaxies"], "grandparent": ["Deep Sky"],
+                                       "coordinates": [23.46, 30.66]}
+
+def test_failed_lookups_are_kept_in_catalog_store():
+    write_object_info()
+    catalog_store = CatalogStore('catalog.db')
+    catalog_store.import_object_info('slooh_object_info.json')
+    util_obj = Utilities(catalog_store)
+    util_obj.update_object_coordinates('slooh_object_info.json', {"https://slooh.com/M31": (10.68, 41.27), "https://slooh.com/M33": None},
+                                       now = NOW)
+    assert util_obj.extract_urls_with_failed_coordinate_lookups('slooh_object_info.json', 7, now = NOW) == {"https://slooh.com/M33"}
+
+    # exported failures are imported back into a new store
+    other_catalog_store = CatalogStore('other_catalog.db')
+    other_catalog_store.import_object_info('slooh_object_info.json')
+    assert other_catalog_store.get_object_info() == catalog_store.get_object_info()
+    assert other_catalog_store.get_object_info()["M33"]["coordinates_checked_at"] == "2026-01-15T10:00:00"
+    catalog_store.close()
+    other_catalog_store.close()
@@ -0,0 +1,53 @@
+from delta_feed import DeltaFeed, iter_deltas
+import threading
+
+def test_feeds_appending_to_same_file_assign_unique_sequence_numbers():
+    first_feed = DeltaFeed('deltas.jsonl')
+    second_feed = DeltaFeed('deltas.jsonl')
+    first_feed.add("object", "added", "Mars", {})
+    first_feed.commit()
+    second_feed.add("object", "added", "Venus", {})
+    second_feed.add("object", "added", "Jupiter", {})
+    second_feed.commit()
+    first_feed.add("photo", "added", "https://slooh.com/photo/1", {})
+    first_feed.commit()
+    assert [(entry["seq"], entry["key"]) for entry, _ in iter_deltas('deltas.jsonl')] == \
+        [(1, "Mars"), (2, "Venus"), (3, "Jupiter"), (4, "https://slooh.com/photo/1")]
+
+def test_concurrent_commits_assign_unique_sequence_numbers():
+    def append_entries(worker):
+        delta_feed = DeltaFeed('deltas.jsonl')
+        for i in range(50):
+            delta_feed.add("object", "added", f"{str(worker)}-{str(i)}", {})
+            delta_feed.commit()
+    threads = [threading.Thread(target = append_entries, args = (worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [entry["seq"] for entry, _ in iter_deltas('deltas.jsonl')] == list(range(1, 201))
+
+def test_partial_last_line_is_skipped_by_readers_and_dropped_by_next_feed():
+    delta_feed = DeltaFeed('deltas.jsonl')
+    delta_feed.add("object", "added", "Mars", {})
+    delta_feed.add("object", "added", "Venus", {})
+    delta_feed.commit()
+    # process was killed while writing the third entry
+    with open('deltas.jsonl', 'a') as f:
+        f.write('{"seq": 3, "at": "2026-01-15T10:00:00", "kind": "obj')
+    assert [entry["key"] for entry, _ in iter_deltas('deltas.jsonl')] == ["Mars", "Venus"]
+    _, offset = list(iter_deltas('deltas.jsonl'))[-1]
+
+    delta_feed = DeltaFeed('deltas.jsonl')
+    assert delta_feed.last_seq == 2
+    delta_feed.add("object", "added", "Jupiter", {})
+    delta_feed.commit()
+    # consumers continue from their last offset
+    assert [(entry["seq"], entry["key"]) for entry, _ in iter_deltas('deltas.jsonl', offset)] == [(3, "Jupiter")]
+
+def test_discarded_entries_are_not_appended():
+    delta_feed = DeltaFeed('deltas.jsonl')
+    delta_feed.add("photo", "added", "https://slooh.com/photo/1", {})
+    delta_feed.discard()
+    assert delta_feed.commit() == 0
+    assert list(iter_deltas('deltas.jsonl')) == []
@@ -0,0 +1,58 @@
+from ephemeris import TELESCOPE_SITES, get_slot_times, get_sun_altitudes, parse_coordinates, rank_candidates
+from datetime import datetime, timezone
+import math
+
+# slot times during a january night at the canary islands site
+JULIAN_DATES = get_slot_times(datetime(2026, 1, 15, 12, 0, tzinfo = timezone.utc).timestamp())
+LATITUDE, LONGITUDE = TELESCOPE_SITES["canary_islands"]
+
+CANDIDATES = [
+    ("https://slooh.com/polaris", (37.95, 89.26)),      # circumpolar, but always just below 30 degrees
+    ("https://slooh.com/unknown1", None),
+    ("https://slooh.com/equator", (90.0, 0.0)),
+    ("https://slooh.com/zenith", (90.0, 28.3)),
+    ("https://slooh.com/south", (90.0, -70.0)),         # never rises
+    ("https://slooh.com/unknown2", None),
+    ("https://slooh.com/evening", (0.0, 10.0)),         # sets during the night
+    ("https://slooh.com/morning", (200.0, 10.0)),       # rises during the night
+]
+
+def get_altitude(ra, dec, julian_date):
+    """Altitude (degrees) of a single object at a single time, computed without numpy"""
+    local_sidereal_time = (280.46061837 + 360.98564736629 * (julian_date - 2451545.0) + LONGITUDE) % 360
+    hour_angle = math.radians(local_sidereal_time - ra)
+    sin_altitude = (math.sin(math.radians(dec)) * math.sin(math.radians(LATITUDE)) +
+                    math.cos(math.radians(dec)) * math.cos(math.radians(LATITUDE)) * math.cos(hour_angle))
+    return math.degrees(math.asin(sin_altitude))
+
+def rank_one_by_one(candidates, min_altitude, max_sun_altitude = -12):
+    """Ranking computed one object and one slot at a time"""
+    dark_julian_dates = [julian_date for julian_date, sun_altitude in zip(JULIAN_DATES, get_sun_altitudes(LATITUDE, LONGITUDE, JULIAN_DATES))
+                         if sun_altitude < max_sun_altitude]
+    max_altitudes = {object_url: max(get_altitude(*coordinates, julian_date) for julian_date in dark_julian_dates)
+                     for object_url, coordinates in candidates if coordinates is not None}
+    observable_object_urls = sorted((object_url for object_url in max_altitudes if max_altitudes[object_url] >= min_altitude),
+                                    key = lambda object_url: -max_altitudes[object_url])
+    return observable_object_urls + [object_url for object_url, coordinates in candidates if coordinates is None]
+
+def test_candidates_are_ranked_by_highest_altitude_during_dark_slots():
+    ranked_object_urls = rank_candidates(CANDIDATES, min_altitude = 30, julian_dates = JULIAN_DATES)
+    assert ranked_object_urls == rank_one_by_one(CANDIDATES, min_altitude = 30)
+    assert ranked_object_urls[0] == "https://slooh.com/zenith"
+    # objects with unknown coordinates follow, in given order
+    assert ranked_object_urls[-2:] == ["https://slooh.com/unknown1", "https://slooh.com/unknown2"]
+    assert "https://slooh.com/polaris" not in ranked_object_urls
+    assert "https://slooh.com/south" not in ranked_object_urls
+    # lower altitude cap keeps more objects
+    assert rank_candidates(CANDIDATES, min_altitude = 0, julian_dates = JULIAN_DATES) == rank_one_by_one(CANDIDATES, min_altitude = 0)
+
+def test_only_unknown_candidates_are_returned_without_dark_slots():
+    # sun is never below -90 degrees
+    assert rank_candidates(CANDIDATES, max_sun_altitude = -90, julian_dates = JULIAN_DATES) == ["https://slooh.com/unknown1", "https://slooh.com/unknown2"]
+
+def test_coordinates_are_parsed_from_object_page_text():
+    ra, dec = parse_coordinates("Right Ascension: 00h 42m 44.3s Declination: +41° 16′ 9″")
+    assert math.isclose(ra, 10.684583, abs_tol = 1e-5)
+    assert math.isclose(dec, 41.269167, abs_tol = 1e-5)
+    assert parse_coordinates("RA 05:35:17 Dec −05 23 28")[1] < 0
+    assert parse_coordinates("Orion Nebula") is None
@@ -0,0 +1,49 @@
+from instrumentation import Instrumentation
+from collections import Counter
+import os
+import threading
+
+class CountingStage():
+    """Stand-in for slooh/utilities objects, counting pages crawled and objects added"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+def test_stage_counts_and_rates_are_summarized():
+    source = CountingStage()
+    source.counts["photo_roll_pages_crawled"] = 5
+    instrumentation = Instrumentation("all")
+    # only counts of the stage itself are recorded
+    with instrumentation.stage("photo_roll", count_sources = (source,)):
+        source.counts["photo_roll_pages_crawled"] += 3
+        source.counts["photos_added"] += 12
+    instrumentation.spans["stage.photo_roll"][1] = 2.0
+    summary = instrumentation.get_summary()
+    assert summary["counters"] == {"photo_roll.photo_roll_pages_crawled": 3, "photo_roll.photos_added": 12}
+    assert summary["rates"] == {"photo_roll.photo_roll_pages_crawled_per_second": 1.5, "photo_roll.photos_added_per_second": 6.0}
+
+    instrumentation.write_prometheus_textfile('slooh_all.prom')
+    with open('slooh_all.prom', 'r') as f:
+        assert 'slooh_event_rate{run="all",event="photo_roll.photos_added_per_second"} 6.0\n' in f.read()
+
+def test_overlapping_stages_are_profiled_one_at_a_time():
+    first_instrumentation = Instrumentation("catalog", 'profiles')
+    second_instrumentation = Instrumentation("photo_roll", 'profiles')
+    first_stage_started = threading.Event()
+    second_stage_done = threading.Event()
+    def run_first_stage():
+        with first_instrumentation.stage("catalog"):
+            first_stage_started.set()
+            second_stage_done.wait(5)
+    thread = threading.Thread(target = run_first_stage)
+    thread.start()
+    first_stage_started.wait(5)
+    with second_instrumentation.stage("photo_roll"):
+        pass
+    second_stage_done.set()
+    thread.join()
+
+    assert os.path.exists(os.path.join('profiles', 'catalog.prof'))
+    assert not os.path.exists(os.path.join('profiles', 'photo_roll.prof'))
+    assert second_instrumentation.counters == {"profiles_skipped": 1}
+    assert "stage.photo_roll" in second_instrumentation.spans
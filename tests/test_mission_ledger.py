@@ -0,0 +1,56 @@
+from mission_ledger import MissionLedger
+from datetime import datetime, timedelta
+import os
+
+NOW = datetime(2026, 1, 15, 10, 0, 0)
+
+def test_missions_move_from_booked_to_completed_or_expired():
+    mission_ledger = MissionLedger('missions.json', expiry_days = 7)
+    mission_ledger.add_booked_mission("https://slooh.com/M31", now = NOW - timedelta(days = 8))
+    mission_ledger.add_booked_mission("https://slooh.com/M42", now = NOW - timedelta(days = 2))
+    mission_ledger.add_booked_mission("https://slooh.com/M45", now = NOW - timedelta(days = 1))
+    assert mission_ledger.get_booked_object_urls() == {"https://slooh.com/M31", "https://slooh.com/M42", "https://slooh.com/M45"}
+
+    # only booked missions can be completed
+    assert mission_ledger.complete_missions(["https://slooh.com/M42", "https://slooh.com/M1"], now = NOW) == 1
+    assert mission_ledger.expire_missions(now = NOW) == 1
+    assert mission_ledger.missions["https://slooh.com/M31"]["state"] == MissionLedger.EXPIRED
+    assert mission_ledger.missions["https://slooh.com/M42"] == {"state": MissionLedger.COMPLETED, "booked_at": "2026-01-13T10:00:00",
+                                                                "updated_at": "2026-01-15T10:00:00"}
+    assert mission_ledger.get_booked_object_urls() == {"https://slooh.com/M45"}
+    # completed/expired missions stay so
+    assert mission_ledger.complete_missions(["https://slooh.com/M31"], now = NOW) == 0
+    assert mission_ledger.expire_missions(now = NOW + timedelta(days = 30)) == 1
+    assert mission_ledger.missions["https://slooh.com/M42"]["state"] == MissionLedger.COMPLETED
+
+def test_compact_drops_only_missions_done_before_retention_period():
+    mission_ledger = MissionLedger('missions.json', retention_days = 30)
+    mission_ledger.add_booked_mission("https://slooh.com/M31", now = NOW - timedelta(days = 60))
+    mission_ledger.add_booked_mission("https://slooh.com/M42", now = NOW - timedelta(days = 60))
+    mission_ledger.add_booked_mission("https://slooh.com/M45", now = NOW - timedelta(days = 60))
+    mission_ledger.complete_missions(["https://slooh.com/M42"], now = NOW - timedelta(days = 31))
+    mission_ledger.complete_missions(["https://slooh.com/M45"], now = NOW - timedelta(days = 29))
+
+    assert mission_ledger.compact(now = NOW) == 1
+    # booked missions are never dropped, however old
+    assert set(mission_ledger.missions) == {"https://slooh.com/M31", "https://slooh.com/M45"}
+    assert mission_ledger.compact(now = NOW) == 0
+
+def test_ledger_is_saved_and_loaded():
+    mission_ledger = MissionLedger('missions.json')
+    mission_ledger.add_booked_mission("https://slooh.com/M31")
+    mission_ledger.save()
+    assert not os.path.exists('missions.json.tmp')
+    assert MissionLedger('missions.json').get_booked_object_urls() == {"https://slooh.com/M31"}
+
+def test_legacy_active_missions_are_migrated():
+    with open('active_missions.txt', 'w') as f:
+        f.write("https://slooh.com/M31\n\nhttps://slooh.com/M42\n")
+    modified_at = NOW - timedelta(days = 3)
+    os.utime('active_missions.txt', (modified_at.timestamp(), modified_at.timestamp()))
+
+    mission_ledger = MissionLedger('missions.json', 'active_missions.txt')
+    assert mission_ledger.get_booked_object_urls() == {"https://slooh.com/M31", "https://slooh.com/M42"}
+    assert mission_ledger.missions["https://slooh.com/M31"]["booked_at"] == "2026-01-12T10:00:00"
+    # legacy missions expire relative to when the file was last written
+    assert mission_ledger.expire_missions(now = NOW + timedelta(days = 5)) == 2
@@ -0,0 +1,35 @@
+from object_name_index import ObjectNameIndex
+import random
+
+def substring_scan(names, object_name):
+    """Matching done by the index before it was introduced"""
+    return any(name.upper() in object_name.upper() for name in names)
+
+def test_matches_same_object_names_as_substring_scan():
+    rng = random.Random(0)
+    # small alphabet, so that names overlap and share prefixes/suffixes
+    alphabet = "MNGC1230 -"
+    for _ in range(200):
+        names = ["".join(rng.choice(alphabet + alphabet.lower()) for _ in range(rng.randint(1, 5))) for _ in range(rng.randint(1, 8))]
+        object_name_index = ObjectNameIndex(names)
+        for _ in range(20):
+            object_name = "".join(rng.choice(alphabet + alphabet.lower()) for _ in range(rng.randint(0, 12)))
+            assert object_name_index.matches(object_name) == substring_scan(names, object_name), (names, object_name)
+
+def test_matches_catalog_names():
+    object_name_index = ObjectNameIndex.from_photos_info({
+        "Messier 13": {"object_names": ["Messier 13", "M13", "NGC 6205"]},
+        "Jupiter": {"object_names": ["Jupiter"]},
+    })
+    assert len(object_name_index) == 4
+    assert object_name_index.matches("M13 - Hercules Cluster")
+    assert object_name_index.matches("jupiter")
+    assert object_name_index.matches("NGC 6205")
+    # names sharing a prefix with an indexed name, without containing one
+    assert not object_name_index.matches("M1")
+    assert not object_name_index.matches("NGC 620")
+    assert not object_name_index.matches("Saturn")
+
+def test_empty_index_and_empty_name():
+    assert not ObjectNameIndex().matches("M31")
+    assert ObjectNameIndex([""]).matches("M31")
@@ -0,0 +1,58 @@
+from benchmarks.check_parser_backends import EDGE_CASE_PAGES, parse_with_reference
+from benchmarks.generators import generate_photo_roll
+from html_parser_backends import get_available_backends
+from page_archive import PageArchive
+from selenium.common.exceptions import NoSuchElementException
+from slooh_website_parser import SloohWebsiteParser
+from utilities import Utilities
+import pytest
+
+@pytest.fixture
+def photo_roll(work_dir):
+    """Synthetic photo roll capture along with hand written edge case pages (some with line breaks inside the page)"""
+    generate_photo_roll('photo_roll_info.txt', 1000)
+    with open('photo_roll_info.txt', 'a') as f:
+        f.write('\n'.join(EDGE_CASE_PAGES) + '\n')
+    return parse_with_reference('photo_roll_info.txt')
+
+def read_photos_info():
+    with open('photos_info.json', 'r') as f:
+        return f.read()
+
+@pytest.mark.parametrize("backend_name", get_available_backends())
+def test_backends_match_whole_capture_parse(photo_roll, backend_name):
+    assert Utilities(html_parser_backend = backend_name).parse_photo_roll_raw_info('photo_roll_info.txt')
+    assert read_photos_info() == photo_roll
+
+def test_parallel_parse_matches_whole_capture_parse(photo_roll):
+    assert Utilities().parse_photo_roll_raw_info('photo_roll_info.txt', workers = 2)
+    assert read_photos_info() == photo_roll
+
+def test_archived_capture_matches_whole_capture_parse(photo_roll):
+    PageArchive('photo_roll_archive', 'photo_roll_info.txt').close()
+    assert Utilities().parse_photo_roll_archive('photo_roll_archive')
+    assert read_photos_info() == photo_roll
+
+def test_incremental_parse_of_page_with_line_breaks(work_dir):
+    with open('photo_roll_info.txt', 'w') as f:
+        f.write(EDGE_CASE_PAGES[0] + '\n')
+    assert Utilities().parse_photo_roll_raw_info('photo_roll_info.txt', incremental = True)
+    # page with a line break inside it is appended and parsed as a whole
+    with open('photo_roll_info.txt', 'a') as f:
+        f.write(EDGE_CASE_PAGES[3] + '\n')
+    assert Utilities().parse_photo_roll_raw_info('photo_roll_info.txt', incremental = True)
+    assert read_photos_info() == parse_with_reference('photo_roll_info.txt')
+    assert '"Sun"' in read_photos_info()
+
+class PhotoRollWithoutNextButtonDriver():
+    def get(self, url):
+        pass
+
+    def find_element_by_class_name(self, class_name):
+        raise NoSuchElementException(f"no {class_name} element")
+
+def test_photo_roll_parser_fails_cleanly_if_photo_roll_does_not_load(monkeypatch):
+    slooh_web_parser_obj = SloohWebsiteParser("email", "password", None, driver = PhotoRollWithoutNextButtonDriver())
+    monkeypatch.setattr(slooh_web_parser_obj, "login", lambda: True)
+    monkeypatch.setattr(slooh_web_parser_obj.waiter, "wait_for_class", lambda *args: None)
+    assert slooh_web_parser_obj.photo_roll_parser() is False
@@ -0,0 +1,154 @@
+from record_replay_driver import RecordingDriver, ReplayDriver, ReplayError
+from page_archive import PageArchive
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.remote.webelement import WebElement
+from slooh_website_parser import SloohWebsiteParser
+import json
+import os
+import pytest
+
+PHOTO_ROLL_PAGES = [
+    f'<ul><li><h3>Messier {str(i)}</h3><p>Captured by slooh</p><a style="background-image: url(&quot;https://slooh.com/photo/{str(i)}&quot;)"></a></li></ul>'
+    for i in range(1, 5)
+]
+
+class FakeElement(WebElement):
+    """Element answering attribute reads/clicks with given functions"""
+
+    def __init__(self, element_id, attributes = None, on_click = None):
+        super().__init__(None, element_id)
+        self.attributes = attributes or {}
+        self.on_click = on_click
+
+    def get_attribute(self, name):
+        return self.attributes[name]()
+
+    def click(self):
+        self.on_click()
+
+class FakePhotoRollDriver():
+    """Driver showing a paged photo roll. The next button shows up only after a few polls and the page element goes stale once."""
+
+    def __init__(self):
+        self.page = 0
+        self.next_button_polls = 0
+        self.page_reads = 0
+        self.next_button = FakeElement("next", {"class": lambda: "next active" if self.page < len(PHOTO_ROLL_PAGES) - 1 else "next"}, self.click_next)
+        self.page_element = FakeElement("page", {"innerHTML": lambda: PHOTO_ROLL_PAGES[self.page]})
+
+    def click_next(self):
+        self.page += 1
+
+    def get(self, url):
+        self.page = 0
+
+    def find_elements_by_class_name(self, class_name):
+        if(class_name == "next"):
+            self.next_button_polls += 1
+            return [self.next_button] if self.next_button_polls > 2 else []
+        if(class_name == "undefined"):
+            self.page_reads += 1
+            if(self.page_reads == 4):
+                raise StaleElementReferenceException("element is not attached to the page document")
+            return [self.page_element]
+        return []
+
+    def find_element_by_class_name(self, class_name):
+        if(class_name == "next"):
+            return self.next_button
+        raise NoSuchElementException(f"Unable to locate element: .{class_name}")
+
+    def quit(self):
+        pass
+
+class FakeSearchDriver():
+    """Driver showing a search window with two grand-parents, each extracted by a script call"""
+
+    def __init__(self):
+        self.search_icon = FakeElement("icon-search", on_click = lambda: None)
+        self.grandparents = [FakeElement(f"grandparent{str(i)}") for i in range(2)]
+
+    def get(self, url):
+        pass
+
+    def find_elements_by_class_name(self, class_name):
+        return {"icon-search": [self.search_icon], "search-results-grandparent": self.grandparents}.get(class_name, [])
+
+    def find_element_by_class_name(self, class_name):
+        return self.search_icon
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def execute_async_script(self, script, grandparent_index, expand_timeout, known_fingerprints):
+        name = ["Solar System", "Deep Sky"][grandparent_index]
+        return {"name": name, "parents": [{"name": f"{name} parent", "fingerprint": None,
+                                           "items": [{"name": f"{name} object", "href": f"https://slooh.com/object/{str(grandparent_index)}"}]}],
+                "errors": []}
+
+    def quit(self):
+        pass
+
+def create_parser(driver, monkeypatch):
+    slooh_web_parser_obj = SloohWebsiteParser("email", "password", None, driver = driver)
+    monkeypatch.setattr(slooh_web_parser_obj, "login", lambda: True)
+    return slooh_web_parser_obj
+
+def record(driver, monkeypatch, parse):
+    """Runs given parse function with given fake driver wrapped in a recording driver. Returns (parse result, archive path)."""
+    recording_driver = RecordingDriver(driver, os.path.abspath('run.json.gz'))
+    slooh_web_parser_obj = create_parser(recording_driver, monkeypatch)
+    slooh_web_parser_obj.waiter.sleep = lambda seconds: None
+    result = parse(slooh_web_parser_obj)
+    recording_driver.quit()
+    return result, os.path.abspath('run.json.gz')
+
+def replay(path_to_archive, monkeypatch, parse, work_dir):
+    """Runs given parse function against given recording in given directory. Returns (parse result, replay driver)."""
+    os.makedirs(work_dir)
+    monkeypatch.chdir(work_dir)
+    replay_driver = ReplayDriver(path_to_archive)
+    slooh_web_parser_obj = create_parser(replay_driver, monkeypatch)
+    replay_driver.disable_sleeps(slooh_web_parser_obj)
+    return parse(slooh_web_parser_obj), replay_driver
+
+def read_archived_pages(path_to_archive_dir):
+    with PageArchive(path_to_archive_dir) as page_archive:
+        return [raw_page for raw_page, _ in page_archive.iter_pages()]
+
+def test_recorded_photo_roll_crawl_replays_with_the_same_output(monkeypatch, work_dir):
+    parse = lambda slooh_web_parser_obj: slooh_web_parser_obj.photo_roll_parser()
+    recorded_result, path_to_archive = record(FakePhotoRollDriver(), monkeypatch, parse)
+    recorded_pages = read_archived_pages('photo_roll_archive')
+    # the stale page read (an exception) while waiting for the second page is polled again, last page has no active next button
+    assert recorded_result is True and recorded_pages == PHOTO_ROLL_PAGES[:3]
+
+    replayed_result, replay_driver = replay(path_to_archive, monkeypatch, parse, work_dir / "replay")
+    assert replayed_result == recorded_result
+    assert read_archived_pages('photo_roll_archive') == recorded_pages
+    # waits for the next button ran on the virtual clock
+    assert replay_driver.monotonic() > 0
+
+def test_recorded_catalog_crawl_replays_with_the_same_output(monkeypatch, work_dir):
+    parse = lambda slooh_web_parser_obj: slooh_web_parser_obj.search_parser()
+    recorded_result, path_to_archive = record(FakeSearchDriver(), monkeypatch, parse)
+    with open('slooh_object_info.json', 'r') as f:
+        recorded_object_info = json.load(f)
+    assert recorded_result is True and set(recorded_object_info) == {"Solar System object", "Deep Sky object"}
+
+    replayed_result, _ = replay(path_to_archive, monkeypatch, parse, work_dir / "replay")
+    assert replayed_result == recorded_result
+    with open('slooh_object_info.json', 'r') as f:
+        assert json.load(f) == recorded_object_info
+
+def test_exceptions_are_replayed_and_unrecorded_calls_fail(monkeypatch):
+    recording_driver = RecordingDriver(FakePhotoRollDriver(), 'run.json.gz')
+    with pytest.raises(NoSuchElementException):
+        recording_driver.find_element_by_class_name("icon-search")
+    recording_driver.quit()
+
+    replay_driver = ReplayDriver('run.json.gz')
+    with pytest.raises(NoSuchElementException, match = "icon-search"):
+        replay_driver.find_element_by_class_name("icon-search")
+    with pytest.raises(ReplayError):
+        replay_driver.find_element_by_class_name("next")
@@ -0,0 +1,78 @@
+from reservation_pipeline import MissionReservationPipeline
+import logging
+
+class FakeSwitchTo():
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, window):
+        self.driver.current_window_handle = window
+
+class FakeDriver():
+    """Driver with just the tab handling used by the pipeline"""
+
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.current_window_handle = "main"
+        self.switch_to = FakeSwitchTo(self)
+        self.urls = {"main": None}
+        self.loaded_at_booking = {}
+
+    def execute_script(self, script, url):
+        window = f"tab{len(self.urls)}"
+        self.window_handles.append(window)
+        self.urls[window] = url
+
+    def get(self, url):
+        self.urls[self.current_window_handle] = url
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+class FakeParser():
+    """Parser whose missions pages always show the active missions count from before the run (like prefetched tabs)"""
+
+    def __init__(self, active_missions_before_run, max_active_missions = 5):
+        self.logger = logging.getLogger("FakeParser")
+        self.driver = FakeDriver()
+        self.active_missions_before_run = active_missions_before_run
+        self.max_active_missions = max_active_missions
+        self.booked = []
+
+    def login(self):
+        return True
+
+    def get_mission_url(self, object_url):
+        return object_url + "/missions"
+
+    def _reserve_mission_on_loaded_page(self, object_url):
+        assert self.driver.urls[self.driver.current_window_handle] == self.get_mission_url(object_url)
+        # site refuses bookings over the quota, although the page shows a stale count
+        if self.active_missions_before_run + len(self.booked) >= self.max_active_missions:
+            return False, self.active_missions_before_run
+        self.booked.append(object_url)
+        return True, self.active_missions_before_run + 1
+
+def test_stops_at_quota_although_prefetched_pages_show_stale_count():
+    slooh_web_parser_obj = FakeParser(active_missions_before_run = 2)
+    object_urls = [f"https://slooh.com/object/{i}" for i in range(10)]
+    results = MissionReservationPipeline(slooh_web_parser_obj, prefetch_count = 3).run(object_urls)
+    assert [result["booked"] for result in results] == [True, True, True]
+    assert [result["active_missions"] for result in results] == [3, 4, 5]
+    # tabs of candidates which were not needed are closed
+    assert slooh_web_parser_obj.driver.window_handles == ["main"]
+
+def test_books_in_current_tab_without_prefetch():
+    slooh_web_parser_obj = FakeParser(active_missions_before_run = 3)
+    object_urls = [f"https://slooh.com/object/{i}" for i in range(10)]
+    results = MissionReservationPipeline(slooh_web_parser_obj, prefetch_count = 0).run(object_urls)
+    assert slooh_web_parser_obj.booked == object_urls[:2]
+    assert results[-1]["active_missions"] == 5
+    assert slooh_web_parser_obj.driver.window_handles == ["main"]
+
+def test_tries_every_candidate_below_quota():
+    slooh_web_parser_obj = FakeParser(active_missions_before_run = 0, max_active_missions = 100)
+    object_urls = [f"https://slooh.com/object/{i}" for i in range(4)]
+    results = MissionReservationPipeline(slooh_web_parser_obj, prefetch_count = 2, max_active_missions = 100).run(object_urls)
+    assert [result["object_url"] for result in results] == object_urls
+    assert results[-1]["active_missions"] == 4
@@ -0,0 +1,122 @@
+from search_tree_extractor import EXTRACT_GRANDPARENT_SCRIPT
+from slooh_website_parser import SloohWebsiteParser
+from driver_factory import DriverFactory
+import search_crawl_pool
+import json
+import logging
+import os
+import shutil
+import subprocess
+import pytest
+
+# minimal search window DOM - items are rendered only while their parent is expanded
+DOM_MOCK = """
+const script = new Function(process.argv[1]);
+const data = JSON.parse(process.argv[2]);
+const knownFingerprints = JSON.parse(process.argv[3]);
+let openGrandparent = -1, openParent = -1;
+const button = fn => ({click: () => setTimeout(fn, 5)});
+global.document = {getElementsByClassName(className) {
+    if (className === 'search-results-grandparent') {
+        return data.map((grandparent, i) => ({innerText: grandparent.name, querySelector: q => q === '.icon-plus' ?
+            button(() => { openGrandparent = i; }) : button(() => { openGrandparent = -1; })}));
+    }
+    if (className === 'search-results-parent') {
+        return openGrandparent < 0 ? [] : data[openGrandparent].parents.map((parent, j) => ({
+            innerText: parent.label, innerHTML: '<span>' + parent.label + '</span><i class="' + (openParent === j ? 'icon-minus' : 'icon-plus') + '"></i>',
+            querySelector: q => q === '.icon-plus' ? button(() => { openParent = j; }) : (openParent === j ? button(() => { openParent = -1; }) : null)}));
+    }
+    return (openGrandparent < 0 || openParent < 0) ? [] : data[openGrandparent].parents[openParent].items.map(name => ({
+        innerText: name, querySelector: () => ({href: 'https://slooh.com/object/' + name})}));
+}};
+script(0, 200, knownFingerprints, tree => console.log(JSON.stringify(tree)));
+"""
+
+def run_script(data, known_fingerprints = None):
+    output = subprocess.run(["node", "-e", DOM_MOCK, EXTRACT_GRANDPARENT_SCRIPT, json.dumps(data), json.dumps(known_fingerprints or {})],
+                            capture_output = True, text = True, check = True, timeout = 30).stdout
+    return json.loads(output)
+
+@pytest.mark.skipif(shutil.which("node") is None, reason = "node is not installed")
+def test_parents_are_skipped_only_while_item_count_in_label_is_unchanged():
+    data = [{"name": "Solar System", "parents": [
+        {"label": "Planets (2)", "items": ["Mars", "Venus"]},
+        {"label": "Moons", "items": ["Moon"]},
+    ]}]
+    tree = run_script(data)
+    assert [parent["fingerprint"] for parent in tree["parents"]] == ["items:2", None]
+    known_fingerprints = {"Solar System": {parent["name"]: parent["fingerprint"] for parent in tree["parents"]}}
+
+    # a new item under a parent without a count is still found
+    data[0]["parents"][1]["items"].append("Phobos")
+    tree = run_script(data, known_fingerprints)
+    assert tree["parents"][0]["skipped"] and tree["parents"][0]["items"] == []
+    assert [item["name"] for item in tree["parents"][1]["items"]] == ["Moon", "Phobos"]
+
+    # parent whose count changed is expanded again
+    data[0]["parents"][0] = {"label": "Planets (3)", "items": ["Mars", "Venus", "Jupiter"]}
+    tree = run_script(data, known_fingerprints)
+    assert not tree["parents"][0].get("skipped")
+    assert len(tree["parents"][0]["items"]) == 3
+
+def create_tree(name):
+    return {"name": name, "parents": [{"name": "P", "fingerprint": None, "items": [{"name": f"{name} object", "href": f"https://slooh.com/{name}"}]}],
+            "errors": []}
+
+def test_crawl_with_missing_grandparent_fails_and_is_resumed(monkeypatch):
+    crawled_indexes = []
+    def crawl(self, on_start = None, on_grandparent = None, known_fingerprints = None):
+        skip_indexes = set(on_start(3))
+        trees = {}
+        for i in range(3):
+            # grand-parent 1 fails on the first crawl
+            if i in skip_indexes or (i == 1 and not crawled_indexes):
+                continue
+            trees[i] = create_tree(f"G{i}")
+            on_grandparent(i, trees[i])
+        crawled_indexes.append(sorted(trees))
+        return trees
+    monkeypatch.setattr(search_crawl_pool.SearchCrawlPool, "crawl", crawl)
+    slooh_web_parser_obj = SloohWebsiteParser("email", "password", None, crawl_workers = 2, driver = object())
+
+    assert slooh_web_parser_obj.search_parser() is False
+    assert os.path.exists('slooh_object_info.json.crawl')
+    with open('slooh_object_info.json', 'r') as f:
+        assert set(json.load(f)) == {"G0 object", "G2 object"}
+
+    # next crawl only crawls the missing grand-parent, and completes
+    assert slooh_web_parser_obj.search_parser() is True
+    assert crawled_indexes == [[0, 2], [1]]
+    assert not os.path.exists('slooh_object_info.json.crawl')
+    with open('slooh_object_info.json', 'r') as f:
+        assert set(json.load(f)) == {"G0 object", "G1 object", "G2 object"}
+    # grand-parents merged from the checkpoint are not counted as crawled again
+    assert slooh_web_parser_obj.counts == {"grandparents_crawled": 3, "parents_crawled": 3, "objects_added": 3, "objects_modified": 0}
+
+class HeapSizeDriver():
+    def __init__(self, used_js_heap_mb):
+        self.used_js_heap_mb = used_js_heap_mb
+
+    def execute_script(self, script):
+        # None if page doesn't report heap usage (performance.memory is chrome only)
+        return None if self.used_js_heap_mb is None else self.used_js_heap_mb * 1024 * 1024
+
+def test_crawl_drivers_use_heap_cap_of_driver_factory():
+    logger = logging.getLogger("test")
+    search_crawl_pool_obj = search_crawl_pool.SearchCrawlPool(DriverFactory(None, max_js_heap_mb = 2048), logger)
+    assert search_crawl_pool_obj.driver_factory.max_js_heap_mb == 2048
+    assert search_crawl_pool_obj.driver_factory.headless
+    assert not search_crawl_pool_obj._should_recycle(HeapSizeDriver(1024), 1)
+    assert search_crawl_pool_obj._should_recycle(HeapSizeDriver(1900), 1)
+    # pool default applies only if the factory doesn't cap the heap
+    search_crawl_pool_obj = search_crawl_pool.SearchCrawlPool(DriverFactory(None, headless = False), logger)
+    assert search_crawl_pool_obj.driver_factory.max_js_heap_mb == search_crawl_pool.DEFAULT_MAX_JS_HEAP_MB
+    assert search_crawl_pool_obj._should_recycle(HeapSizeDriver(1024), 1)
+
+def test_drivers_without_heap_usage_are_recycled_after_fixed_number_of_grandparents():
+    search_crawl_pool_obj = search_crawl_pool.SearchCrawlPool(DriverFactory(None), logging.getLogger("test"))
+    # drivers whose page reports heap usage (even zero) are recycled only near the cap
+    assert not search_crawl_pool_obj._should_recycle(HeapSizeDriver(0), search_crawl_pool.MAX_GRANDPARENTS_PER_DRIVER)
+    assert not search_crawl_pool_obj._should_recycle(HeapSizeDriver(None), search_crawl_pool.MAX_GRANDPARENTS_PER_DRIVER - 1)
+    assert search_crawl_pool_obj._should_recycle(HeapSizeDriver(None), search_crawl_pool.MAX_GRANDPARENTS_PER_DRIVER)
+    assert search_crawl_pool_obj._should_recycle(object(), search_crawl_pool.MAX_GRANDPARENTS_PER_DRIVER)
@@ -0,0 +1,46 @@
+from job_scheduler import JobScheduler
+from slooh_website_parser import SloohWebsiteParser
+from utilities import Utilities
+import search_crawl_pool
+import json
+import threading
+import time
+
+def test_coordinates_added_during_catalog_crawl_are_kept(monkeypatch):
+    with open('slooh_object_info.json', 'w') as f:
+        json.dump({"Mars": {"object_url": "https://slooh.com/Mars", "parent": ["Planets"], "grandparent": ["Solar System"]}}, f)
+    def crawl(self, on_start = None, on_grandparent = None, known_fingerprints = None):
+        on_start(1)
+        # reservations stage adds coordinates while the catalog is being crawled
+        Utilities().update_object_coordinates('slooh_object_info.json', {"https://slooh.com/Mars": (10.5, -4.25)})
+        tree = {"name": "Solar System", "parents": [{"name": "Moons", "fingerprint": None,
+                                                     "items": [{"name": "Mars", "href": "https://slooh.com/Mars"}]}], "errors": []}
+        on_grandparent(0, tree)
+        return {0: tree}
+    monkeypatch.setattr(search_crawl_pool.SearchCrawlPool, "crawl", crawl)
+    slooh_web_parser_obj = SloohWebsiteParser("email", "password", None, crawl_workers = 2, driver = object())
+
+    assert slooh_web_parser_obj.search_parser() is True
+    with open('slooh_object_info.json', 'r') as f:
+        object_info = json.load(f)
+    assert object_info["Mars"] == {"object_url": "https://slooh.com/Mars", "parent": ["Planets", "Moons"], "grandparent": ["Solar System"],
+                                   "coordinates": [10.5, -4.25]}
+
+def test_job_waits_for_run_of_job_it_depends_on():
+    events = []
+    photo_roll_started = threading.Event()
+    def photo_roll():
+        photo_roll_started.set()
+        time.sleep(0.2)
+        events.append("photo_roll")
+    job_scheduler = JobScheduler()
+    job_scheduler.add_job("photo_roll", photo_roll, every_minutes = 60)
+    job_scheduler.add_job("reservations", lambda: events.append("reservations"), every_minutes = 60, depends_on = ["photo_roll"])
+
+    job_scheduler._start_job("photo_roll", 0)
+    photo_roll_started.wait(5)
+    assert job_scheduler.run_now("reservations") is True
+    assert events == ["photo_roll", "reservations"]
+    # without a photo roll run in progress, reservations run right away
+    assert job_scheduler.run_now("reservations") is True
+    assert events == ["photo_roll", "reservations", "reservations"]
@@ -1,12 +1,65 @@
-from bs4 import BeautifulSoup
+from object_name_index import ObjectNameIndex
+from html_parser_backends import iter_photo_elements, resolve_backend_name
+from page_archive import PageArchive, iter_raw_info_pages
+from data_lock import data_lock
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, deque
+from datetime import datetime, timedelta
 import os
 import logging
 import json
 import re
 
+MESSIER_NUMBER_PATTERN = re.compile(r'\d+')
+PHOTO_URL_PATTERN = re.compile('(http.*)\"')
+
+def parse_photo_roll_page(raw_page, html_parser_backend = "html.parser"):
+    """Parses given raw photo roll page in html format using given html parser backend.
+    Returns (list of (primary object name, object names, photo info) for every photo in the page, list of parsing error messages)."""
+    photo_records = []
+    errors = []
+    # for each li element with a heading (which contains photo info)
+    for heading, photo_style, photo_desc in iter_photo_elements(raw_page, html_parser_backend):
+        try:
+            # extract object info for the current photo
+            object_names_in_heading = [x.strip() for x in heading.split('(')]
+            object_name_primary = object_names_in_heading[0]
+            object_names = [object_name_primary]
+            if("Messier" in object_name_primary):
+                object_names.append("M" + MESSIER_NUMBER_PATTERN.search(object_name_primary).group())
+            if(len(object_names_in_heading) > 1):
+                secondary_names = [x.strip() for x in object_names_in_heading[1].strip(')').split('/')]
+                if len(secondary_names) > 1:
+                    if "NGC" in secondary_names[0] and "NGC" not in secondary_names[1]:
+                        secondary_names[1] = "NGC " + secondary_names[1]
+                object_names += secondary_names
+            
+            # extract photo url for the current photo
+            photo_url = PHOTO_URL_PATTERN.search(photo_style).group(1)
+            # extract photo description for the current photo
+            curr_photo_info = {
+                "photo_url": photo_url,
+                "photo_desc": {}
+            }
+            for desc in photo_desc:
+                curr_desc = [x.strip() for x in desc.split(':', 1)]
+                if(len(curr_desc) > 1):
+                    curr_photo_info["photo_desc"][curr_desc[0]] = curr_desc[1]
+                else:
+                    curr_photo_info["photo_desc"]["Date"] = curr_desc[0]
+            photo_records.append((object_name_primary, object_names, curr_photo_info))
+        except Exception as err:
+            errors.append(f"Could not parse photo info from {heading} - {str(err)}")
+    return photo_records, errors
+
+def parse_photo_roll_pages(raw_pages, html_parser_backend = "html.parser"):
+    """Parses given batch of raw photo roll pages (in a worker process). Returns list of parse_photo_roll_page results."""
+    return [parse_photo_roll_page(raw_page, html_parser_backend) for raw_page in raw_pages]
+
 class Utilities():
     """Class that contains utility methods to handle commonly used functions"""
-    def __init__(self):
+    def __init__(self, catalog_store = None, html_parser_backend = "auto", delta_feed = None):
         # code to setup logging obj
         self.logger = logging.getLogger("Utilities")
         self.logger.setLevel(level=logging.DEBUG)
@@ -18,102 +71,348 @@ class Utilities():
         formatter = logging.Formatter("%(asctime)s;%(levelname)s;%(message)s", "%Y-%m-%d %H:%M:%S")
         fileh.setFormatter(formatter)
         self.logger.addHandler(fileh)
+        
+        # cache of object name index built from photos info file, reused across calls while the file is unchanged
+        self.object_name_index = None
+        self.object_name_index_key = None
+        
+        # optional SQLite catalog store, photos info json file is exported from it when photos are added
+        self.catalog_store = catalog_store
+        
+        # html parser used for photo roll pages ('auto' picks the fastest installed one - selectolax, lxml or html.parser)
+        self.html_parser_backend = resolve_backend_name(html_parser_backend)
+        
+        # optional append-only log of photos added by photo roll parsing
+        self.delta_feed = delta_feed
+        # pages parsed and photos/objects added so far (read by instrumentation to derive per stage rates)
+        self.counts = Counter()
     
-    def parse_photo_roll_raw_info(self, path_to_photo_roll_raw_info):
+    def parse_photo_roll_raw_info(self, path_to_photo_roll_raw_info, incremental = False, workers = 1):
         """Parses individual photo info from raw photo roll data in html format.
+        Raw photo roll data is read one page at a time. If 'incremental' is True, only pages appended
+        after the byte offset recorded in the checkpoint file next to photos info json file are parsed.
+        If 'workers' > 1, pages are parsed in that many processes and merged (in page order) in this process.
         Returns boolean indicating whether photo roll data parsing is successful or not."""
         json_photos_info_path = 'photos_info.json'
-        # if given path to raw photots info exits, proceed to parse it
+        checkpoint_path = json_photos_info_path + '.checkpoint'
+        # if given path to raw photots info exits, proceed to parse it (photos info is locked from load till save)
         if(os.path.exists(path_to_photo_roll_raw_info)):
-            with open(path_to_photo_roll_raw_info, 'r') as f:
-                raw_info = f.read()
-            new_objects_added = 0
-            new_photos_added = 0
-            json_photos_info = {}
-            # if output file path exits, extract existing json photos info
-            if(os.path.exists(json_photos_info_path)):
-                with open(json_photos_info_path, 'r') as f:
-                    try:
-                        json_photos_info = json.load(f)
-                    # if output file parsing fails, assume no initial info
-                    except:
-                        json_photos_info = {}
-                        self.logger.debug("Loading data from existing photo roll json info file failed. Assuming no initial info.")
-            try:
-                # extract list of li elements which contain photo info
-                self.logger.debug("Starting photo roll raw info file parsing.")
-                soup = BeautifulSoup(raw_info, "html.parser")
-                list_elements = soup.find_all("li")
-                
-                # for each li element
-                for list_element in list_elements:
-                    # extract photo heading
-                    heading = list_element.find('h3')
-                    # if heading is present
-                    if(heading):
-                        try:
-                            # extract object info for the current photo
-                            object_names_in_heading = [x.strip() for x in heading.text.split('(')]
-                            object_name_primary = object_names_in_heading[0]
-                            object_names = [object_name_primary]
-                            if("Messier" in object_name_primary):
-                                object_names.append("M" + re.search(r'\d+', object_name_primary).group())
-                            if(len(object_names_in_heading) > 1):
-                                secondary_names = [x.strip() for x in object_names_in_heading[1].strip(')').split('/')]
-                                if len(secondary_names) > 1:
-                                    if "NGC" in secondary_names[0] and "NGC" not in secondary_names[1]:
-                                        secondary_names[1] = "NGC " + secondary_names[1]
-                                object_names += secondary_names
-                            
-                            # extract photo url for the current photo
-                            photo_url = re.search('(http.*)\"',list_element.find('a').get('style')).group(1)
-                            # extract photo description for the current photo
-                            photo_desc = list_element.find_all('p')
-                            curr_photo_info = {
-                                "photo_url": photo_url,
-                                "photo_desc": {}
-                            }
-                            for desc in photo_desc:
-                                curr_desc = [x.strip() for x in desc.text.split(':', 1)]
-                                if(len(curr_desc) > 1):
-                                    curr_photo_info["photo_desc"][curr_desc[0]] = curr_desc[1]
-                                else:
-                                    curr_photo_info["photo_desc"]["Date"] = curr_desc[0]
-                            
-                            # if any photos already present for the current object
-                            if object_name_primary in json_photos_info:
-                                # add current photo to the object if it doesn't already exist
-                                if curr_photo_info not in json_photos_info[object_name_primary]["photos"]:
-                                    json_photos_info[object_name_primary]["photos"].append(curr_photo_info)
-                                    new_photos_added += 1
-                            # else if no photos are present for the current object
-                            else:
-                                # add current object along with current photo
-                                json_photos_info[object_name_primary] = {
-                                    "object_names": object_names,
-                                    "photos": [curr_photo_info]
-                                }
-                                new_photos_added += 1
-                                new_objects_added += 1
-                        except Exception as err:
-                            self.logger.debug(f"Could not parse photo info from {str(heading)} - {str(err)}")
-                
-                # write final photos info to output file
-                with open(json_photos_info_path, 'w') as f:
-                    json.dump(json_photos_info, f, indent = 4)
-                self.logger.debug(f"Photo roll raw info file parsing complete. {str(new_photos_added)} new photos added. {str(new_objects_added)} new objects added.")
-                return True
-            # if any error occurs while parsing individual photos, return True and log successfully extracted photos count till now.
-            except Exception as err:
-                self.logger.debug(f"Photo roll raw info file parsing could not be completed successfully - {str(err)}. {str(new_photos_added)} new photos added. {str(new_objects_added)} new objects added.")
-                return True
+            with data_lock(json_photos_info_path):
+                json_photos_info = self._load_photos_info(json_photos_info_path)
+                # in incremental mode, resume from the last checkpoint
+                start_offset = 0
+                if(incremental and (self.catalog_store.has_photos() if self.catalog_store else json_photos_info)):
+                    start_offset = self._load_photo_roll_checkpoint(checkpoint_path, path_to_photo_roll_raw_info)
+                # parse photo info from each page appended since the start offset
+                self.logger.debug(f"Starting photo roll raw info file parsing from byte offset {str(start_offset)}.")
+                end_offsets = self._ingest_photo_roll_pages(json_photos_info, json_photos_info_path,
+                                                            self._iter_photo_roll_pages(path_to_photo_roll_raw_info, start_offset), workers)
+                # record checkpoint only after photos info has been saved
+                if end_offsets is not None:
+                    self._save_photo_roll_checkpoint(checkpoint_path, path_to_photo_roll_raw_info, end_offsets[-1] if end_offsets else start_offset)
+            return True
         # else if given path to raw photots info does not exit, return False
         else:
             self.logger.debug("Photo roll raw info file doesn't exist!!")
             return False
+    
+    def parse_photo_roll_archive(self, path_to_photo_roll_archive, incremental = False, workers = 1):
+        """Parses individual photo info from raw photo roll pages stored in page archive (see PageArchive).
+        If 'incremental' is True, pages whose hashes were already processed (recorded next to photos info json file) are skipped.
+        If 'workers' > 1, pages are parsed in that many processes and merged (in page order) in this process.
+        Returns boolean indicating whether photo roll data parsing is successful or not."""
+        json_photos_info_path = 'photos_info.json'
+        processed_pages_path = json_photos_info_path + '.pages'
+        # if page archive exists, proceed to parse it (photos info is locked from load till save)
+        if(os.path.exists(os.path.join(path_to_photo_roll_archive, 'index.jsonl'))):
+            page_archive = PageArchive(path_to_photo_roll_archive)
+            with data_lock(json_photos_info_path):
+                json_photos_info = self._load_photos_info(json_photos_info_path)
+                # in incremental mode, skip already processed pages
+                processed_page_hashes = set()
+                if(incremental and (self.catalog_store.has_photos() if self.catalog_store else json_photos_info)):
+                    processed_page_hashes = self._load_processed_page_hashes(processed_pages_path)
+                self.logger.debug(f"Starting photo roll archive parsing. {str(len(page_archive) - len(processed_page_hashes & page_archive.entries.keys()))} new pages.")
+                page_hashes = self._ingest_photo_roll_pages(json_photos_info, json_photos_info_path,
+                                                            page_archive.iter_pages(processed_page_hashes), workers)
+                # record processed pages only after photos info has been saved
+                if page_hashes is not None:
+                    self._save_processed_page_hashes(processed_pages_path, processed_page_hashes.union(page_hashes))
+            return True
+        # else if page archive does not exist, return False
+        else:
+            self.logger.debug("Photo roll archive doesn't exist!!")
+            return False
+    
+    def _load_photos_info(self, json_photos_info_path):
+        """Returns existing json photos info (empty if catalog store is used or file doesn't exist)"""
+        json_photos_info = {}
+        # if output file path exits (and no catalog store is used), extract existing json photos info
+        if(self.catalog_store is None and os.path.exists(json_photos_info_path)):
+            with open(json_photos_info_path, 'r') as f:
+                try:
+                    json_photos_info = json.load(f)
+                # if output file parsing fails, assume no initial info
+                except:
+                    json_photos_info = {}
+                    self.logger.debug("Loading data from existing photo roll json info file failed. Assuming no initial info.")
+        return json_photos_info
+    
+    def _ingest_photo_roll_pages(self, json_photos_info, json_photos_info_path, pages, workers = 1):
+        """Parses given (raw page html, page position) pages and merges their photos into photos info, which is then saved.
+        New photos are then appended to delta feed (if used).
+        Returns list of positions of the pages ingested (None if ingestion could not be completed)."""
+        new_objects_added = 0
+        new_photos_added = 0
+        page_positions = []
+        try:
+            # all photos are added to the catalog store (if any) in a single transaction
+            with (self.catalog_store.transaction() if self.catalog_store else nullcontext()):
+                for photo_records, page_position in self._iter_parsed_photo_roll_pages(pages, workers):
+                    for photo_record in photo_records:
+                        objects_added, photos_added = self._merge_photo_record(json_photos_info, photo_record)
+                        new_objects_added += objects_added
+                        new_photos_added += photos_added
+                        if(photos_added and self.delta_feed is not None):
+                            object_name_primary, object_names, curr_photo_info = photo_record
+                            self.delta_feed.add("photo", "added", curr_photo_info["photo_url"],
+                                                {"object_name": object_name_primary, "object_names": object_names, "photo": curr_photo_info})
+                    page_positions.append(page_position)
+            
+            # atomically write final photos info to output file, as other stages may read it meanwhile
+            # (exported from catalog store only if new photos were added)
+            if(self.catalog_store is None):
+                temp_path = json_photos_info_path + '.tmp'
+                with open(temp_path, 'w') as f:
+                    json.dump(json_photos_info, f, indent = 4)
+                os.replace(temp_path, json_photos_info_path)
+            elif(new_photos_added or not os.path.exists(json_photos_info_path)):
+                self.catalog_store.export_photos_info(json_photos_info_path)
+            if self.delta_feed is not None:
+                self.delta_feed.commit()
+            self.counts["photo_roll_pages_parsed"] += len(page_positions)
+            self.counts["photos_added"] += new_photos_added
+            self.counts["photo_objects_added"] += new_objects_added
+            self.logger.debug(f"Photo roll parsing complete. {str(len(page_positions))} pages parsed. {str(new_photos_added)} new photos added. {str(new_objects_added)} new objects added.")
+            return page_positions
+        # if any error occurs while parsing individual photos, log successfully extracted photos count till now.
+        except Exception as err:
+            if self.delta_feed is not None:
+                self.delta_feed.discard()
+            self.logger.debug(f"Photo roll parsing could not be completed successfully - {str(err)}. {str(new_photos_added)} new photos added. {str(new_objects_added)} new objects added.")
+            return None
+    
+    def _iter_photo_roll_pages(self, path_to_photo_roll_raw_info, start_offset = 0):
+        """Yields (raw page html, byte offset after the page) for every page of raw photo roll data from given offset
+        (pages are written one per line, but may contain line breaks themselves)."""
+        with open(path_to_photo_roll_raw_info, 'rb') as f:
+            yield from iter_raw_info_pages(f, start_offset)
+    
+    def _load_photo_roll_checkpoint(self, checkpoint_path, path_to_photo_roll_raw_info):
+        """Returns byte offset in raw photo roll data till which pages have already been parsed (0 if unknown)."""
+        if(os.path.exists(checkpoint_path)):
+            try:
+                with open(checkpoint_path, 'r') as f:
+                    checkpoint = json.load(f)
+                # checkpoint is valid only for the same raw info file and if the file has not been truncated since
+                if(checkpoint["raw_info_path"] == os.path.abspath(path_to_photo_roll_raw_info) and
+                        checkpoint["offset"] <= os.path.getsize(path_to_photo_roll_raw_info)):
+                    return checkpoint["offset"]
+                self.logger.debug("Photo roll checkpoint doesn't match raw info file. Parsing from the beginning.")
+            except Exception as err:
+                self.logger.debug(f"Loading photo roll checkpoint failed - {str(err)}. Parsing from the beginning.")
+        return 0
+    
+    def _save_photo_roll_checkpoint(self, checkpoint_path, path_to_photo_roll_raw_info, offset):
+        """Records byte offset in raw photo roll data till which pages have been parsed."""
+        with open(checkpoint_path, 'w') as f:
+            json.dump({"raw_info_path": os.path.abspath(path_to_photo_roll_raw_info), "offset": offset}, f)
+    
+    def _load_processed_page_hashes(self, processed_pages_path):
+        """Returns set of hashes of archived photo roll pages already parsed (empty if unknown)."""
+        if(os.path.exists(processed_pages_path)):
+            try:
+                with open(processed_pages_path, 'r') as f:
+                    return set(json.load(f))
+            except Exception as err:
+                self.logger.debug(f"Loading processed photo roll pages failed - {str(err)}. Parsing all pages.")
+        return set()
+    
+    def _save_processed_page_hashes(self, processed_pages_path, page_hashes):
+        """Records hashes of archived photo roll pages which have been parsed."""
+        temp_path = processed_pages_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(sorted(page_hashes), f)
+        os.replace(temp_path, processed_pages_path)
+    
+    def _parse_photo_roll_page(self, raw_page):
+        """Parses given raw photo roll page in html format.
+        Returns list of (primary object name, object names, photo info) for every photo in the page."""
+        photo_records, errors = parse_photo_roll_page(raw_page, self.html_parser_backend)
+        for error in errors:
+            self.logger.debug(error)
+        return photo_records
+    
+    def _iter_parsed_photo_roll_pages(self, pages, workers = 1, pages_per_batch = 16):
+        """Yields (photo records of page, page position) for every given (raw page html, page position) page, in order.
+        If 'workers' > 1, batches of pages are parsed in that many processes (with a bounded number of batches in flight)."""
+        if(workers <= 1):
+            for raw_page, page_position in pages:
+                yield self._parse_photo_roll_page(raw_page), page_position
+            return
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            batches_in_flight = deque()
+            while True:
+                # keep every worker busy (and a batch queued for each), without reading the whole capture into memory
+                while len(batches_in_flight) < 2 * workers:
+                    batch = [page for _, page in zip(range(pages_per_batch), pages)]
+                    if not batch:
+                        break
+                    raw_pages, page_positions = zip(*batch)
+                    batches_in_flight.append((executor.submit(parse_photo_roll_pages, raw_pages, self.html_parser_backend), page_positions))
+                if not batches_in_flight:
+                    return
+                future, page_positions = batches_in_flight.popleft()
+                for (photo_records, errors), page_position in zip(future.result(), page_positions):
+                    for error in errors:
+                        self.logger.debug(error)
+                    yield photo_records, page_position
+    
+    def _merge_photo_record(self, json_photos_info, photo_record):
+        """Merges given photo record into photos info json data (or catalog store, if used).
+        Returns (new objects added, new photos added)."""
+        object_name_primary, object_names, curr_photo_info = photo_record
+        if(self.catalog_store is not None):
+            return self.catalog_store.add_photo(object_name_primary, object_names, curr_photo_info)
+        # if any photos already present for the current object
+        if object_name_primary in json_photos_info:
+            # add current photo to the object if it doesn't already exist
+            if curr_photo_info not in json_photos_info[object_name_primary]["photos"]:
+                json_photos_info[object_name_primary]["photos"].append(curr_photo_info)
+                return 0, 1
+            return 0, 0
+        # else if no photos are present for the current object
+        else:
+            # add current object along with current photo
+            json_photos_info[object_name_primary] = {
+                "object_names": object_names,
+                "photos": [curr_photo_info]
+            }
+            return 1, 1
         
-    def extract_urls_to_objects_with_no_photos(self, path_to_object_info_json_file, path_to_photos_json_file):
-        """Parses photos info + object info and returns urls to objects with no photos."""
+    def extract_known_photo_urls(self, path_to_photos_json_file):
+        """Parses photos info and returns set of urls to all photos already ingested."""
+        known_photo_urls = set()
+        # if photos info file exists, extract photo urls of every object
+        if(os.path.exists(path_to_photos_json_file)):
+            try:
+                with open(path_to_photos_json_file, 'r') as f:
+                    photo_info = json.load(f)
+                for photos_obj in photo_info.values():
+                    for photo in photos_obj["photos"]:
+                        known_photo_urls.add(photo["photo_url"])
+            # if photos info file parsing fails, assume no known photos
+            except Exception as err:
+                self.logger.debug(f"Unable to extract known photo urls - {str(err)}")
+        return known_photo_urls
+    
+    def extract_object_coordinates(self, path_to_object_info_json_file):
+        """Parses object info and returns dict of object url to (right ascension, declination) in degrees
+        for every object whose coordinates have been captured."""
+        object_coordinates = {}
+        if(os.path.exists(path_to_object_info_json_file)):
+            try:
+                with open(path_to_object_info_json_file, 'r') as f:
+                    object_info = json.load(f)
+                for info in object_info.values():
+                    if info.get("coordinates") is not None:
+                        object_coordinates[info["object_url"]] = tuple(info["coordinates"])
+            # if object info file parsing fails, assume no coordinates are known
+            except Exception as err:
+                self.logger.debug(f"Unable to extract object coordinates - {str(err)}")
+        return object_coordinates
+    
+    def extract_urls_with_failed_coordinate_lookups(self, path_to_object_info_json_file, retry_after_days = 7, now = None):
+        """Parses object info and returns set of urls to objects whose coordinates could not be found in their object page
+        less than 'retry_after_days' days ago (their pages are not visited again till then)."""
+        failed_lookup_urls = set()
+        retry_after = timedelta(days = retry_after_days)
+        now = now or datetime.now()
+        if(os.path.exists(path_to_object_info_json_file)):
+            try:
+                with open(path_to_object_info_json_file, 'r') as f:
+                    object_info = json.load(f)
+                for info in object_info.values():
+                    if(info.get("coordinates") is None and "coordinates_checked_at" in info and
+                            now - datetime.fromisoformat(info["coordinates_checked_at"]) < retry_after):
+                        failed_lookup_urls.add(info["object_url"])
+            # if object info file parsing fails, assume no lookups failed
+            except Exception as err:
+                self.logger.debug(f"Unable to extract failed coordinate lookups - {str(err)}")
+        return failed_lookup_urls
+    
+    def update_object_coordinates(self, path_to_object_info_json_file, object_coordinates, now = None):
+        """Adds given object coordinates (dict of object url to (right ascension, declination) in degrees, or None if coordinates
+        could not be found) to object info (and catalog store, if used). Failed lookups are recorded with the time they were made.
+        Object info is locked while it is updated, as the catalog stage may save it meanwhile."""
+        if not object_coordinates:
+            return
+        checked_at = (now or datetime.now()).isoformat(timespec = "seconds")
+        with data_lock(path_to_object_info_json_file):
+            if(self.catalog_store is not None):
+                with self.catalog_store.transaction():
+                    for object_url, coordinates in object_coordinates.items():
+                        if coordinates is None:
+                            self.catalog_store.set_failed_coordinate_lookup(object_url, checked_at)
+                        else:
+                            self.catalog_store.set_object_coordinates(object_url, *coordinates)
+                self.catalog_store.export_object_info(path_to_object_info_json_file)
+            else:
+                with open(path_to_object_info_json_file, 'r') as f:
+                    object_info = json.load(f)
+                for info in object_info.values():
+                    if info["object_url"] not in object_coordinates:
+                        continue
+                    coordinates = object_coordinates[info["object_url"]]
+                    if coordinates is None:
+                        info["coordinates"] = None
+                        info["coordinates_checked_at"] = checked_at
+                    else:
+                        info["coordinates"] = list(coordinates)
+                        info.pop("coordinates_checked_at", None)
+                temp_path = path_to_object_info_json_file + '.tmp'
+                with open(temp_path, 'w') as f:
+                    json.dump(object_info, f, indent = 4)
+                os.replace(temp_path, path_to_object_info_json_file)
+        found_count = sum(1 for coordinates in object_coordinates.values() if coordinates is not None)
+        self.logger.debug(f"Coordinates of {str(found_count)} objects added to object info. {str(len(object_coordinates) - found_count)} lookups failed.")
+    
+    def _get_object_name_index(self, path_to_photos_json_file):
+        """Returns name index of all photographed objects (rebuilt only if photos info file has changed since last call)."""
+        photo_info_stat = os.stat(path_to_photos_json_file)
+        object_name_index_key = (os.path.abspath(path_to_photos_json_file), photo_info_stat.st_mtime_ns, photo_info_stat.st_size)
+        if self.object_name_index_key != object_name_index_key:
+            photo_info = {}
+            with open(path_to_photos_json_file, 'r') as f:
+                photo_info = json.load(f)
+            self.object_name_index = ObjectNameIndex.from_photos_info(photo_info)
+            self.object_name_index_key = object_name_index_key
+            self.logger.debug(f"Object name index built with {str(len(self.object_name_index))} names.")
+        return self.object_name_index
+    
+    def extract_urls_to_objects_with_photos(self, path_to_object_info_json_file, path_to_photos_json_file, object_urls):
+        """Parses photos info + object info and returns those of given object urls whose objects have photos."""
+        if(not object_urls or not os.path.exists(path_to_object_info_json_file) or not os.path.exists(path_to_photos_json_file)):
+            return []
+        with open(path_to_object_info_json_file, 'r') as f:
+            object_info = json.load(f)
+        object_name_index = self._get_object_name_index(path_to_photos_json_file)
+        return [info["object_url"] for obj, info in object_info.items() if info["object_url"] in object_urls and object_name_index.matches(obj)]
+    
+    def extract_urls_to_objects_with_no_photos(self, path_to_object_info_json_file, path_to_photos_json_file, exclude_urls = None):
+        """Parses photos info + object info and returns urls to objects with no photos.
+        Objects whose urls are in 'exclude_urls' (e.g. objects with missions already booked) are skipped."""
+        exclude_urls = exclude_urls or set()
         
         # if both object info file and photo info file exists
         if(os.path.exists(path_to_object_info_json_file) and os.path.exists(path_to_photos_json_file)):
@@ -121,23 +420,18 @@ class Utilities():
             object_info = {}
             with open(path_to_object_info_json_file, 'r') as f:
                 object_info = json.load(f)
-            # extract photo info
-            photo_info = {}
-            with open(path_to_photos_json_file, 'r') as f:
-                photo_info = json.load(f)
             
-            object_names_from_object_info = list(object_info.keys())
+            # build (or reuse) name index of all photographed objects
+            object_name_index = self._get_object_name_index(path_to_photos_json_file)
+            
             urls_to_objects_with_no_photos = []
-            # for each object in object info
-            for obj in object_names_from_object_info:
-                is_obj_found = False
+            # for each object in object info (other than excluded ones)
+            for obj in object_info:
+                if object_info[obj]["object_url"] in exclude_urls:
+                    continue
                 # check if any photo exist for the current object (check photos with any of the possible object names)
-                for photos_obj in photo_info.keys():
-                    for name in photo_info[photos_obj]["object_names"]:
-                        if name.upper() in obj.upper():
-                            is_obj_found = True
-                # f no photo is found, append current object url to the list of urls to the objects with no photos
-                if not is_obj_found:
+                # if no photo is found, append current object url to the list of urls to the objects with no photos
+                if not object_name_index.matches(obj):
                     urls_to_objects_with_no_photos.append(object_info[obj]["object_url"])
             self.logger.debug(f"{str(len(urls_to_objects_with_no_photos))} objects found without any photos.") 
             return urls_to_objects_with_no_photos